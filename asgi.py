@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+ASGI entry point (async serving mode)
+
+Upload dibaca di event loop; decode dan inferensi di thread pool.
+Contoh:
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT --workers 2
+    gunicorn asgi:app -k uvicorn.workers.UvicornWorker --workers 2
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_path = Path(__file__).parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from backend.asgi_app import create_asgi_app
+
+# Create application instance (Flask app tetap tersedia di wsgi.py)
+application = create_asgi_app()
+app = application
@@ -1,12 +1,13 @@
 # Flask Backend untuk Website Deteksi Penyakit Bawang Merah
 # Production-ready version
 
-from flask import Flask, request, jsonify, render_template, make_response, send_from_directory
+from flask import Flask, Response, request, jsonify, render_template, make_response, send_from_directory
 from flask_cors import CORS
 import os
 import random
 import json
 import hashlib
+import hmac
 from PIL import Image
 from werkzeug.utils import secure_filename
 import logging
@@ -14,15 +15,38 @@ from datetime import datetime, timedelta
 from functools import wraps
 import threading
 import sqlite3
+import time
+import uuid
 
 # Import custom modules (simplified version)
 try:
     from utils.image_processor import ImageProcessor
     from utils.disease_classifier import DiseaseClassifier
+    from utils.hash_index import PerceptualHashIndex
+    from utils.metrics import metrics
+    from utils.observation_store import ObservationStore
 except ImportError as e:
     print(f"Warning: Could not import some modules: {e}")
     ImageProcessor = None
     DiseaseClassifier = None
+    PerceptualHashIndex = None
+    metrics = None
+    ObservationStore = None
+
+# Katalog penyakit hanya butuh standard library
+from utils.disease_catalog import get_disease_catalog
+
+try:
+    from models import create_model, get_model_class
+    from models.model_registry import ModelRegistry, ModelManager
+    from models.cascade_model import InferenceCascade
+except ImportError as e:
+    print(f"Warning: Model registry not available: {e}")
+    create_model = None
+    get_model_class = None
+    InferenceCascade = None
+    ModelRegistry = None
+    ModelManager = None
 
 # Cache decorator for production
 def cache_control(max_age=3600):
@@ -37,14 +61,45 @@ def cache_control(max_age=3600):
         return decorated_function
     return decorator
 
+# Rentang confidence hasil simulasi (mode mock, sebelum model terlatih tersedia)
+MOCK_CONFIDENCE_RANGES = {
+    'healthy': (85, 95),
+    'purple_blotch': (75, 90),
+    'downy_mildew': (70, 88),
+    'leaf_blight': (72, 86),
+    'anthracnose': (68, 84)
+}
+MOCK_SEVERITIES = ('Ringan', 'Sedang', 'Berat')
+
+# Severity hasil model dari confidence (%): (batas bawah, label), dicek dari atas
+SEVERITY_BY_CONFIDENCE = ((85, 'Berat'), (70, 'Sedang'), (0, 'Ringan'))
+
+LIVENESS_BODY = b'{"status": "alive"}'
+
+# Batas panjang window untuk /api/plants/windows
+MIN_WINDOW_DAYS = 1
+MAX_WINDOW_DAYS = 365
+
+# Batas parameter TTA untuk /api/detect (tta_k = 0 berarti tanpa TTA)
+MAX_TTA_K = 16
+MAX_LATENCY_BUDGET_MS = 60000
+
 class OnionDiseaseAPI:
     def __init__(self):
         self.app = Flask(__name__)
-        self.setup_config()
-        self.setup_logging()
-        self.setup_database()
-        self.initialize_models()
-        self.setup_routes()
+        self.disease_catalog = get_disease_catalog()
+        self.history_writer = None  # diisi oleh asgi_app (penulisan history async)
+        self.started_at = time.time()
+        self.inflight_detections = 0
+        self._inflight_lock = threading.Lock()
+        
+        # Waktu tiap tahap inisialisasi (dilaporkan oleh --startup-profile)
+        self.startup_timings = {}
+        for step in (self.setup_config, self.setup_logging, self.setup_database,
+                     self.initialize_models, self.setup_routes):
+            start = time.perf_counter()
+            step()
+            self.startup_timings[step.__name__] = round((time.perf_counter() - start) * 1000, 2)
         
     def setup_config(self):
         """Konfigurasi aplikasi Flask"""
@@ -61,6 +116,28 @@ class OnionDiseaseAPI:
         # Application configurations
         self.app.config['APP_VERSION'] = '1.0.0'
         self.app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 31536000  # 1 year for static files
+        
+        # Near-duplicate lookup (perceptual hash)
+        self.app.config['PHASH_MAX_DISTANCE'] = int(os.environ.get('PHASH_MAX_DISTANCE', 6))
+        self.app.config['PHASH_REUSE_DEFAULT'] = os.environ.get('PHASH_REUSE_DEFAULT', 'false').lower() == 'true'
+        
+        # Model registry (hot-swap)
+        self.app.config['MODEL_REGISTRY_DIR'] = os.environ.get('MODEL_REGISTRY_DIR', 'model_registry')
+        self.app.config['MODEL_WATCH_INTERVAL'] = float(os.environ.get('MODEL_WATCH_INTERVAL', 0))
+        self.app.config['MODEL_BACKEND'] = os.environ.get('MODEL_BACKEND', 'cnn')  # lihat models.MODEL_BACKENDS
+        self.app.config['ADMIN_TOKEN'] = os.environ.get('ADMIN_TOKEN')
+        
+        # Cascade: classifier warna murah menjawab gambar yang jelas sebelum CNN
+        self.app.config['CASCADE_ENABLED'] = os.environ.get('CASCADE_ENABLED', 'true').lower() == 'true'
+        self.app.config['CASCADE_THRESHOLD'] = float(os.environ.get('CASCADE_THRESHOLD', 0.9))
+        
+        # Model temporal (RNNModel.export_numpy) untuk prediksi dari observasi harian, tanpa TensorFlow
+        self.app.config['SEQUENCE_MODEL_PATH'] = os.environ.get('SEQUENCE_MODEL_PATH', 'model_registry/rnn_weights.npz')
+        
+        # Readiness gagal jika antrian inferensi mencapai batas ini (traffic dialihkan ke instance lain)
+        self.app.config['READY_MAX_QUEUE_DEPTH'] = int(os.environ.get('READY_MAX_QUEUE_DEPTH', 16))
+        # Setelah batas ini (detik sejak start) model yang belum ter-load tidak lagi menahan readiness
+        self.app.config['READY_MODEL_TIMEOUT'] = float(os.environ.get('READY_MODEL_TIMEOUT', 90))
     
     def setup_logging(self):
         """Setup logging untuk debugging"""
@@ -78,6 +155,14 @@ class OnionDiseaseAPI:
         """Setup SQLite database untuk menyimpan history deteksi"""
         self.db_lock = threading.Lock()
         self.init_database()
+        
+        # Observasi harian per tanaman untuk model temporal
+        self.observation_store = None
+        if ObservationStore:
+            try:
+                self.observation_store = ObservationStore(self.app.config.get('DATABASE', 'database.db'))
+            except Exception as e:
+                self.logger.error(f"Error initializing observation store: {str(e)}")
     
     def init_database(self):
         """Inisialisasi database tables"""
@@ -93,10 +178,24 @@ class OnionDiseaseAPI:
                         image_hash TEXT,
                         user_agent TEXT,
                         ip_address TEXT,
-                        processing_time REAL
+                        processing_time REAL,
+                        phash TEXT,
+                        result_json TEXT,
+                        model_version TEXT
                     )
                 ''')
                 
+                # Migrasi database lama yang belum punya kolom baru
+                existing_columns = {row[1] for row in cursor.execute('PRAGMA table_info(detection_history)')}
+                for column in ('phash', 'result_json', 'model_version'):
+                    if column not in existing_columns:
+                        cursor.execute(f'ALTER TABLE detection_history ADD COLUMN {column} TEXT')
+                
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_detection_history_phash
+                    ON detection_history (phash)
+                ''')
+                
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS app_stats (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -131,6 +230,92 @@ class OnionDiseaseAPI:
             self.logger.error(f"Error initializing models: {str(e)}")
             self.image_processor = None
             self.disease_classifier = None
+        
+        self.initialize_hash_index()
+        self.initialize_model_manager()
+        self.initialize_sequence_model()
+    
+    def initialize_sequence_model(self):
+        """Load NumpyLSTMModel untuk /api/plants/predict (jika file bobot tersedia)"""
+        self.sequence_model = None
+        model_path = self.app.config['SEQUENCE_MODEL_PATH']
+        if not get_model_class or self.observation_store is None or not os.path.exists(model_path):
+            return
+        
+        try:
+            model = get_model_class('rnn_numpy').load(model_path)
+            feature_names = self.observation_store.feature_names
+            if model.feature_names and model.feature_names != feature_names:
+                raise ValueError(f"Model features {model.feature_names} do not match observation store {feature_names}")
+            if model.input_shape[1] != len(feature_names):
+                raise ValueError(f"Model expects {model.input_shape[1]} features, observation store has {len(feature_names)}")
+            self.sequence_model = model
+            self.logger.info(f"Sequence model loaded from {model_path}")
+        except Exception as e:
+            self.logger.error(f"Error loading sequence model: {str(e)}")
+    
+    def initialize_model_manager(self):
+        """Load model aktif dari registry di background (jika registry tersedia)"""
+        self.model_manager = None
+        if not ModelManager:
+            return
+        
+        try:
+            registry = ModelRegistry(self.app.config['MODEL_REGISTRY_DIR'])
+            if registry.active_version() is None:
+                self.logger.info("No model registry found, using simulated detection")
+                return
+            
+            self.model_manager = ModelManager(registry, model_factory=self.create_serving_model)
+            self.model_manager.load_active(background=True)
+            
+            if self.app.config['MODEL_WATCH_INTERVAL'] > 0:
+                self.model_manager.start_watcher(self.app.config['MODEL_WATCH_INTERVAL'])
+        except Exception as e:
+            self.logger.error(f"Error initializing model manager: {str(e)}")
+            self.model_manager = None
+    
+    def create_serving_model(self):
+        """Model untuk handle registry: CNN dibungkus InferenceCascade jika diaktifkan"""
+        backend = self.app.config['MODEL_BACKEND']
+        model = create_model(backend)
+        if backend == 'cnn' and self.app.config['CASCADE_ENABLED']:
+            model = InferenceCascade(model, threshold=self.app.config['CASCADE_THRESHOLD'])
+        return model
+    
+    def initialize_hash_index(self):
+        """Bangun index perceptual hash dari history deteksi yang tersimpan"""
+        self.hash_index = None
+        if not PerceptualHashIndex or not self.image_processor:
+            return
+        
+        try:
+            self.hash_index = PerceptualHashIndex(max_distance=self.app.config['PHASH_MAX_DISTANCE'])
+            with sqlite3.connect(self.app.config.get('DATABASE', 'database.db')) as conn:
+                rows = conn.execute('''
+                    SELECT id, phash, result_json FROM detection_history
+                    WHERE phash IS NOT NULL AND result_json IS NOT NULL
+                    ORDER BY id
+                ''')
+                for row_id, phash, result_json in rows:
+                    self.hash_index.add(int(phash, 16), {'id': row_id, 'result': json.loads(result_json)})
+            
+            self.logger.info(f"Perceptual hash index loaded: {len(self.hash_index)} entries")
+        except Exception as e:
+            self.logger.error(f"Error loading perceptual hash index: {str(e)}")
+            self.hash_index = None
+    
+    def find_near_duplicate(self, phash):
+        """Cari hasil deteksi sebelumnya untuk gambar yang mirip"""
+        if self.hash_index is None or phash is None:
+            return None
+        
+        match = self.hash_index.find_nearest(phash)
+        if match is None:
+            return None
+        
+        distance, _, entry = match
+        return distance, entry
     
     def setup_routes(self):
         """Setup routing untuk API endpoints"""
@@ -151,9 +336,15 @@ class OnionDiseaseAPI:
                 'endpoints': {
                     'detect': '/api/detect',
                     'health': '/api/health',
+                    'liveness': '/api/health/live',
+                    'readiness': '/api/health/ready',
                     'diseases': '/api/diseases',
                     'history': '/api/history',
-                    'stats': '/api/stats'
+                    'stats': '/api/stats',
+                    'metrics': '/api/metrics',
+                    'observations': '/api/plants/<plant_id>/observations',
+                    'windows': '/api/plants/windows',
+                    'plant_predictions': '/api/plants/predict'
                 }
             }
             return jsonify(response_data)
@@ -163,16 +354,47 @@ class OnionDiseaseAPI:
             return self.handle_disease_detection()
         
         @self.app.route('/api/health', methods=['GET'])
-        @cache_control(max_age=60)  # 1 minute cache
         def health_check():
             return jsonify({
                 'status': 'healthy',
                 'timestamp': datetime.now().isoformat(),
                 'version': self.app.config['APP_VERSION'],
-                'uptime': 'running',
-                'database': 'connected'
+                'uptime_seconds': round(time.time() - self.started_at, 1),
+                'liveness': '/api/health/live',
+                'readiness': '/api/health/ready'
             })
         
+        @self.app.route('/api/health/live', methods=['GET'])
+        def liveness_check():
+            # Sengaja tanpa I/O: hanya membuktikan proses masih melayani request
+            return LIVENESS_BODY, 200, {'Content-Type': 'application/json', 'Cache-Control': 'no-store'}
+        
+        @self.app.route('/api/health/ready', methods=['GET'])
+        def readiness_check():
+            return self.get_readiness()
+        
+        @self.app.route('/api/metrics', methods=['GET'])
+        def get_metrics():
+            if metrics is None:
+                return jsonify({'error': 'Metrics not available'}), 503
+            return jsonify(metrics.snapshot())
+        
+        @self.app.route('/api/admin/model', methods=['GET', 'POST'])
+        def admin_model():
+            return self.handle_model_admin()
+        
+        @self.app.route('/api/plants/<plant_id>/observations', methods=['GET', 'POST'])
+        def plant_observations(plant_id):
+            return self.handle_plant_observations(plant_id)
+        
+        @self.app.route('/api/plants/windows', methods=['GET', 'POST'])
+        def plant_windows():
+            return self.get_plant_windows()
+        
+        @self.app.route('/api/plants/predict', methods=['GET', 'POST'])
+        def plant_predictions():
+            return self.predict_plant_diseases()
+        
         @self.app.route('/api/diseases', methods=['GET'])
         @cache_control(max_age=3600)  # 1 hour cache
         def get_disease_info():
@@ -263,6 +485,154 @@ class OnionDiseaseAPI:
             
             return response
     
+    def handle_model_admin(self):
+        """Status model aktif (GET) atau aktifkan versi model lain (POST)"""
+        admin_token = self.app.config['ADMIN_TOKEN']
+        provided_token = request.headers.get('X-Admin-Token', '')
+        if not admin_token or not hmac.compare_digest(provided_token.encode('utf-8'), admin_token.encode('utf-8')):
+            return jsonify({'success': False, 'error': 'Forbidden'}), 403
+        
+        if self.model_manager is None:
+            return jsonify({'success': False, 'error': 'Model registry not configured'}), 404
+        
+        if request.method == 'GET':
+            return jsonify({
+                'success': True,
+                'status': self.model_manager.status(),
+                'versions': self.model_manager.registry.list_versions()
+            })
+        
+        version = (request.get_json(silent=True) or {}).get('version')
+        if not version:
+            return jsonify({'success': False, 'error': 'Missing version'}), 400
+        
+        try:
+            # Update manifest agar worker lain (via file watch) ikut swap
+            self.model_manager.registry.set_active(version)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 404
+        
+        self.model_manager.load_version_async(version)
+        self.logger.info(f"Model activation requested: {version}")
+        return jsonify({'success': True, 'message': f'Loading model version {version}'}), 202
+    
+    def handle_plant_observations(self, plant_id):
+        """Ambil (GET) atau simpan bulk (POST) observasi harian satu tanaman"""
+        if self.observation_store is None:
+            return jsonify({'success': False, 'error': 'Observation store not available'}), 503
+        
+        if request.method == 'GET':
+            limit = request.args.get('limit', '30').strip()
+            if not limit.isdigit() or int(limit) < 1:
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid limit',
+                    'message': 'limit harus bilangan bulat positif (maksimal 365)'
+                }), 400
+            
+            limit = min(int(limit), 365)
+            return jsonify({
+                'success': True,
+                'plant_id': plant_id,
+                'observations': self.observation_store.get_observations(plant_id, limit)
+            })
+        
+        payload = request.get_json(silent=True)
+        observations = payload.get('observations') if isinstance(payload, dict) else payload
+        if not isinstance(observations, list):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid payload',
+                'message': 'Kirim JSON list observasi atau {"observations": [...]}'
+            }), 400
+        
+        try:
+            written = self.observation_store.upsert(plant_id, observations)
+        except (ValueError, TypeError) as e:
+            return jsonify({'success': False, 'error': 'Invalid observation', 'message': str(e)}), 400
+        except Exception as e:
+            self.logger.error(f"Error saving observations: {str(e)}")
+            return jsonify({'success': False, 'error': 'Internal server error'}), 500
+        
+        return jsonify({'success': True, 'plant_id': plant_id, 'written': written})
+    
+    def parse_plant_window_request(self, default_days=7):
+        """
+        Baca plant_ids dan days dari query string (GET) atau JSON body (POST)
+        
+        Returns:
+            tuple: (plant_ids, days, None) atau (None, None, response error 400)
+        """
+        if request.method == 'POST':
+            payload = request.get_json(silent=True)
+            payload = payload if isinstance(payload, dict) else {}
+            plant_ids = payload.get('plant_ids', [])
+            days = payload.get('days', default_days)
+        else:
+            plant_ids = [pid for pid in request.args.get('ids', '').split(',') if pid]
+            days = request.args.get('days', default_days)
+        
+        if not isinstance(plant_ids, list) or not all(isinstance(pid, str) and pid for pid in plant_ids):
+            return None, None, (jsonify({
+                'success': False,
+                'error': 'Invalid plant_ids',
+                'message': 'plant_ids harus berupa list string'
+            }), 400)
+        
+        # Hanya integer (atau string angka dari query string); 7.5 / true / "abc" ditolak
+        if isinstance(days, str) and days.strip().lstrip('-').isdigit():
+            days = int(days)
+        if isinstance(days, bool) or not isinstance(days, int):
+            days = None
+        if days is None or not MIN_WINDOW_DAYS <= days <= MAX_WINDOW_DAYS:
+            return None, None, (jsonify({
+                'success': False,
+                'error': 'Invalid days',
+                'message': f'days harus bilangan bulat {MIN_WINDOW_DAYS}-{MAX_WINDOW_DAYS}'
+            }), 400)
+        
+        # Urutan dipertahankan, id duplikat hanya diproses sekali
+        return list(dict.fromkeys(plant_ids)), days, None
+    
+    def get_plant_windows(self):
+        """Window N hari terbaru untuk banyak tanaman sekaligus (siap untuk predict_sequence)"""
+        if self.observation_store is None:
+            return jsonify({'success': False, 'error': 'Observation store not available'}), 503
+        
+        plant_ids, days, error = self.parse_plant_window_request()
+        if error:
+            return error
+        
+        windows, ready_ids, incomplete_ids = self.observation_store.latest_windows(plant_ids, days)
+        return jsonify({
+            'success': True,
+            'days': days,
+            'features': self.observation_store.feature_names,
+            'plant_ids': ready_ids,
+            'incomplete': incomplete_ids,
+            'windows': windows.tolist()
+        })
+    
+    def predict_plant_diseases(self):
+        """Prediksi penyakit + trend per tanaman dari window observasi terbaru (NumpyLSTMModel)"""
+        if self.observation_store is None or self.sequence_model is None:
+            return jsonify({'success': False, 'error': 'Sequence model not available'}), 503
+        
+        # Panjang window ditentukan oleh model
+        sequence_length = self.sequence_model.input_shape[0]
+        plant_ids, _, error = self.parse_plant_window_request(default_days=sequence_length)
+        if error:
+            return error
+        
+        windows, ready_ids, incomplete_ids = self.observation_store.latest_windows(plant_ids, sequence_length)
+        predictions = self.sequence_model.predict_sequences(windows) if ready_ids else []
+        return jsonify({
+            'success': True,
+            'days': sequence_length,
+            'predictions': dict(zip(ready_ids, predictions)),
+            'incomplete': incomplete_ids
+        })
+    
     def allowed_file(self, filename):
         """Cek apakah file extension diizinkan"""
         return '.' in filename and \
@@ -272,6 +642,8 @@ class OnionDiseaseAPI:
         """Handle request deteksi penyakit"""
         filepath = None
         start_time = datetime.now()
+        with self._inflight_lock:
+            self.inflight_detections += 1
         
         try:
             # Validasi request
@@ -298,6 +670,10 @@ class OnionDiseaseAPI:
                     'message': 'Format file tidak didukung. Gunakan JPG, JPEG, atau PNG'
                 }), 400
             
+            tta_kwargs, error = self.parse_tta_request()
+            if error:
+                return error
+            
             # Generate image hash untuk tracking
             file_content = file.read()
             file.seek(0)  # Reset file pointer
@@ -309,7 +685,8 @@ class OnionDiseaseAPI:
                 filename = 'uploaded_image.jpg'
                 
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"{timestamp}_{filename}"
+            # Suffix unik: request paralel dalam detik yang sama tidak saling menimpa file
+            filename = f"{timestamp}_{uuid.uuid4().hex[:8]}_{filename}"
             filepath = os.path.join(self.app.config['UPLOAD_FOLDER'], filename)
             
             # Pastikan direktori upload ada
@@ -318,12 +695,40 @@ class OnionDiseaseAPI:
             file.save(filepath)
             self.logger.info(f"File saved: {filepath}")
             
-            # Proses gambar dan deteksi
-            result = self.process_image_detection(filepath)
+            # Perceptual hash untuk near-duplicate lookup
+            phash = None
+            if self.image_processor:
+                try:
+                    phash = self.image_processor.compute_perceptual_hash(filepath)
+                except Exception as e:
+                    self.logger.warning(f"Could not compute perceptual hash: {e}")
+            
+            reuse_param = request.form.get('reuse', request.args.get('reuse'))
+            reuse = self.app.config['PHASH_REUSE_DEFAULT'] if reuse_param is None \
+                else reuse_param.lower() in ('1', 'true', 'yes')
+            
+            # Hasil lama tidak dipakai ulang jika TTA diminta (jumlah varian bisa berbeda)
+            duplicate = self.find_near_duplicate(phash) if reuse and not tta_kwargs else None
+            if duplicate:
+                distance, entry = duplicate
+                # Hasil lama dipakai ulang; timestamp dan processing_time milik request ini
+                result = dict(entry['result'])
+                result['original_timestamp'] = result.get('timestamp')
+                result['timestamp'] = datetime.now().isoformat()
+                result['reused'] = True
+                result['reused_from'] = entry['id']
+                result['hamming_distance'] = distance
+                self.logger.info(f"Near-duplicate found (id={entry['id']}, distance={distance})")
+            else:
+                # Proses gambar dan deteksi
+                result = self.process_image_detection(filepath, **tta_kwargs)
             
             # Hitung processing time
             processing_time = (datetime.now() - start_time).total_seconds()
             result['processing_time'] = round(processing_time, 2)
+            if metrics is not None:
+                metrics.increment('detect.requests')
+                metrics.observe('detect', processing_time * 1000)
             
             # Simpan ke database
             self.save_detection_history(
@@ -332,7 +737,10 @@ class OnionDiseaseAPI:
                 image_hash=image_hash,
                 user_agent=request.headers.get('User-Agent', ''),
                 ip_address=request.remote_addr,
-                processing_time=processing_time
+                processing_time=processing_time,
+                model_version=result.get('model_version'),
+                phash=phash,
+                result=None if duplicate else result
             )
             
             return jsonify(result)
@@ -345,6 +753,9 @@ class OnionDiseaseAPI:
                 'message': 'Terjadi kesalahan saat memproses gambar. Silakan coba lagi.'
             }), 500
         finally:
+            with self._inflight_lock:
+                self.inflight_detections -= 1
+            
             # Hapus file sementara jika ada
             if filepath and os.path.exists(filepath):
                 try:
@@ -353,8 +764,39 @@ class OnionDiseaseAPI:
                 except Exception as e:
                     self.logger.warning(f"Could not remove temporary file: {e}")
     
-    def process_image_detection(self, image_path):
-        """Proses deteksi penyakit dari gambar"""
+    def parse_tta_request(self):
+        """
+        Baca tta_k dan latency_budget_ms dari form atau query string /api/detect
+
+        Returns:
+            tuple: (kwargs untuk model.predict, None) atau (None, response error 400).
+                   kwargs kosong jika TTA tidak diminta.
+        """
+        limits = {'tta_k': (0, MAX_TTA_K), 'latency_budget_ms': (1, MAX_LATENCY_BUDGET_MS)}
+        tta_kwargs = {}
+        
+        for name, (lower, upper) in limits.items():
+            value = request.form.get(name, request.args.get(name))
+            if value is None or value == '':
+                continue
+            
+            value = value.strip()
+            if not value.isdigit() or not lower <= int(value) <= upper:
+                return None, (jsonify({
+                    'success': False,
+                    'error': f'Invalid {name}',
+                    'message': f'{name} harus bilangan bulat {lower}-{upper}'
+                }), 400)
+            tta_kwargs[name] = int(value)
+        
+        if not tta_kwargs or tta_kwargs.get('tta_k') == 0:
+            return {}, None
+        
+        tta_kwargs['tta'] = True
+        return tta_kwargs, None
+    
+    def process_image_detection(self, image_path, **tta_kwargs):
+        """Proses deteksi penyakit dari gambar (tta_kwargs diteruskan ke model.predict)"""
         try:
             # Basic image validation
             try:
@@ -364,111 +806,28 @@ class OnionDiseaseAPI:
             except Exception as e:
                 self.logger.error(f"Error opening image: {e}")
             
-            # Generate random mock data untuk testing (variasi hasil)
-            diseases_mock = [
-                {
-                    'disease': 'Sehat',
-                    'confidence': round(random.uniform(85, 95), 1),
-                    'description': 'Tanaman bawang merah dalam kondisi sehat tanpa tanda-tanda penyakit.',
-                    'severity': 'Normal',
-                    'treatments': [
-                        'Lanjutkan perawatan rutin',
-                        'Monitoring berkala kondisi tanaman',
-                        'Pemupukan sesuai jadwal',
-                        'Penyiraman yang tepat'
-                    ],
-                    'prevention': [
-                        'Pertahankan kondisi optimal',
-                        'Monitoring rutin',
-                        'Sanitasi lahan',
-                        'Nutrisi seimbang'
-                    ]
-                },
-                {
-                    'disease': 'Bercak Ungu (Purple Blotch)',
-                    'confidence': round(random.uniform(75, 90), 1),
-                    'description': 'Penyakit yang disebabkan oleh jamur Alternaria porri. Ditandai dengan bercak-bercak ungu pada daun.',
-                    'severity': random.choice(['Ringan', 'Sedang', 'Berat']),
-                    'treatments': [
-                        'Semprot dengan fungisida berbahan aktif mankozeb',
-                        'Perbaiki drainase lahan untuk mengurangi kelembaban',
-                        'Buang dan musnahkan bagian tanaman yang terinfeksi',
-                        'Berikan jarak tanam yang cukup untuk sirkulasi udara'
-                    ],
-                    'prevention': [
-                        'Gunakan benih yang sehat dan bersertifikat',
-                        'Rotasi tanaman dengan tanaman non-allium',
-                        'Jaga kebersihan lahan dari sisa tanaman'
-                    ]
-                },
-                {
-                    'disease': 'Embun Bulu (Downy Mildew)',
-                    'confidence': round(random.uniform(70, 88), 1),
-                    'description': 'Penyakit yang menyebabkan lapisan putih keabu-abuan pada permukaan daun.',
-                    'severity': random.choice(['Ringan', 'Sedang', 'Berat']),
-                    'treatments': [
-                        'Aplikasi fungisida sistemik (metalaksil + mankozeb)',
-                        'Perbaiki ventilasi dan drainase',
-                        'Kurangi kelembaban dengan mulsa plastik',
-                        'Semprot pada pagi hari sebelum embun terbentuk'
-                    ],
-                    'prevention': [
-                        'Pilih varietas tahan penyakit',
-                        'Atur jarak tanam yang optimal',
-                        'Hindari penyiraman di sore hari',
-                        'Gunakan mulsa untuk mengurangi kelembaban tanah'
-                    ]
-                },
-                {
-                    'disease': 'Busuk Daun (Leaf Blight)',
-                    'confidence': round(random.uniform(72, 86), 1),
-                    'description': 'Penyakit jamur yang menyebabkan bercak putih kecil yang membesar dan mengering.',
-                    'severity': random.choice(['Ringan', 'Sedang', 'Berat']),
-                    'treatments': [
-                        'Fungisida berbahan aktif iprodion atau vinclozolin',
-                        'Buang daun yang terinfeksi',
-                        'Kurangi kelembaban daun',
-                        'Aplikasi pupuk berimbang'
-                    ],
-                    'prevention': [
-                        'Hindari luka mekanis pada tanaman',
-                        'Jaga kebersihan alat pertanian',
-                        'Monitoring cuaca dan kelembaban',
-                        'Aplikasi fungisida preventif'
-                    ]
-                },
-                {
-                    'disease': 'Antraknosa',
-                    'confidence': round(random.uniform(68, 84), 1),
-                    'description': 'Penyakit jamur yang menyebabkan bercak coklat dengan tepi gelap pada daun.',
-                    'severity': random.choice(['Ringan', 'Sedang', 'Berat']),
-                    'treatments': [
-                        'Fungisida berbahan aktif azoksistrobin',
-                        'Perbaiki drainase lahan',
-                        'Buang tanaman yang terinfeksi berat',
-                        'Aplikasi kapur untuk menetralkan pH tanah'
-                    ],
-                    'prevention': [
-                        'Gunakan benih bebas penyakit',
-                        'Rotasi tanaman 2-3 tahun',
-                        'Jaga pH tanah 6.0-7.0',
-                        'Hindari genangan air'
-                    ]
-                }
-            ]
+            # Gunakan model terlatih jika sudah di-load dari registry.
+            # Handle diambil sekali: swap di tengah request tidak mempengaruhi request ini.
+            handle = self.model_manager.current if self.model_manager else None
+            if handle is not None and self.image_processor and self.disease_classifier:
+                return self.run_model_inference(image_path, handle, **tta_kwargs)
             
-            # Pilih random disease untuk simulasi
-            selected_disease = random.choice(diseases_mock)
+            # Generate random mock data untuk testing (variasi hasil)
+            disease_key = random.choice(self.disease_catalog.class_order)
+            selected_disease = self.disease_catalog.by_key[disease_key]
+            confidence_low, confidence_high = MOCK_CONFIDENCE_RANGES[disease_key]
+            severity = 'Normal' if disease_key == 'healthy' else random.choice(MOCK_SEVERITIES)
             
             mock_result = {
                 'success': True,
-                'disease': selected_disease['disease'],
-                'confidence': selected_disease['confidence'],
+                'disease': selected_disease['name'],
+                'confidence': round(random.uniform(confidence_low, confidence_high), 1),
                 'description': selected_disease['description'],
-                'severity': selected_disease['severity'],
+                'severity': severity,
                 'treatments': selected_disease['treatments'],
                 'prevention': selected_disease['prevention'],
                 'timestamp': datetime.now().isoformat(),
+                'model_version': 'mock',
                 'note': '⚠️ Ini adalah hasil simulasi untuk testing. Model AI belum dilatih dengan dataset real.'
             }
             
@@ -478,39 +837,116 @@ class OnionDiseaseAPI:
             self.logger.error(f"Error processing image: {str(e)}")
             raise
     
-    def get_all_diseases(self):
-        """Return informasi semua penyakit bawang merah"""
-        diseases = {
-            'diseases': [
-                {
-                    'name': 'Bercak Ungu (Purple Blotch)',
-                    'pathogen': 'Alternaria porri',
-                    'symptoms': 'Bercak ungu pada daun, dapat menyebar ke seluruh tanaman',
-                    'conditions': 'Kelembaban tinggi, suhu 20-30°C'
-                },
-                {
-                    'name': 'Embun Bulu (Downy Mildew)',
-                    'pathogen': 'Peronospora destructor',
-                    'symptoms': 'Lapisan putih keabu-abuan pada permukaan daun',
-                    'conditions': 'Kelembaban sangat tinggi, suhu dingin'
-                },
-                {
-                    'name': 'Busuk Daun (Leaf Blight)',
-                    'pathogen': 'Botrytis squamosa',
-                    'symptoms': 'Bercak putih kecil yang membesar dan mengering',
-                    'conditions': 'Kelembaban tinggi, angin kencang'
-                },
-                {
-                    'name': 'Antraknosa',
-                    'pathogen': 'Colletotrichum gloeosporioides',
-                    'symptoms': 'Bercak coklat dengan tepi gelap pada daun',
-                    'conditions': 'Curah hujan tinggi, suhu hangat'
-                }
-            ]
+    def run_model_inference(self, image_path, handle, **tta_kwargs):
+        """Deteksi dengan model CNN dari registry"""
+        # Piksel [0, 255] seperti saat training; normalisasi ada di dalam graph model
+        image = self.image_processor.prepare_model_input(image_path)
+        prediction = handle.model.predict(image, **tta_kwargs)
+        disease_info = self.disease_catalog.get(prediction['predicted_class'])
+        
+        result = {
+            'success': True,
+            'disease': disease_info['name'],
+            'confidence': round(prediction['confidence'], 1),
+            'description': disease_info['description'],
+            'severity': self.severity_from_prediction(prediction),
+            'treatments': disease_info['treatments'],
+            'prevention': disease_info['prevention'],
+            'all_probabilities': prediction['all_probabilities'],
+            'timestamp': datetime.now().isoformat(),
+            'model_version': handle.version,
+            'inference_stage': prediction.get('stage', 'cnn')
         }
-        return jsonify(diseases)
+        
+        # Jumlah varian yang benar-benar dipakai (bisa dikurangi oleh latency_budget_ms)
+        if 'tta' in prediction:
+            result['tta'] = prediction['tta']
+        
+        return result
+    
+    @staticmethod
+    def severity_from_prediction(prediction):
+        """Label severity (sama dengan mode simulasi) dari kelas dan confidence prediksi"""
+        if prediction['predicted_class'] == 'healthy':
+            return 'Normal'
+        return next(label for threshold, label in SEVERITY_BY_CONFIDENCE if prediction['confidence'] >= threshold)
     
+    def get_readiness(self):
+        """
+        Readiness: model siap, antrian inferensi belum penuh
         
+        Returns 503 saat model masih loading/warmup (maksimal READY_MODEL_TIMEOUT)
+        atau antrian saturasi, sehingga load balancer mengalihkan traffic ke
+        instance yang sehat.
+        """
+        reasons = []
+        
+        # Status model: mode simulasi selalu siap; model registry siap setelah load + warmup.
+        # Jika load gagal atau melebihi READY_MODEL_TIMEOUT, deteksi memakai hasil simulasi:
+        # instance tetap ready (degraded) agar deploy tidak gagal selamanya.
+        if self.model_manager is None:
+            model_status = {'mode': 'mock', 'loaded': True, 'warm': True}
+        else:
+            status = self.model_manager.status()
+            loaded = status['active_version'] is not None
+            model_status = dict(status, mode='registry', loaded=loaded)
+            if not loaded:
+                timed_out = time.time() - self.started_at > self.app.config['READY_MODEL_TIMEOUT']
+                if status['loading_version'] and not timed_out:
+                    reasons.append('model_loading')
+                elif status['last_error'] or timed_out:
+                    model_status['mode'] = 'mock_fallback'
+                else:
+                    reasons.append('model_not_loaded')
+        
+        # Antrian inferensi: deteksi yang sedang berjalan + request ASGI yang menunggu executor.
+        # Worker sync (gunicorn default) hanya melayani satu request per proses, jadi probe ini
+        # tidak pernah melihat deteksi yang berjalan: load shedding hanya efektif untuk server
+        # yang concurrent (ASGI atau gunicorn --threads), ditandai dengan wsgi.multithread.
+        queue_measured = bool(request.environ.get('wsgi.multithread'))
+        asgi_inflight = metrics.gauge('asgi.inflight', 0) if metrics is not None else 0
+        queue_depth = max(self.inflight_detections, asgi_inflight)
+        max_queue_depth = self.app.config['READY_MAX_QUEUE_DEPTH']
+        if queue_depth >= max_queue_depth:
+            reasons.append('queue_saturated')
+        
+        detect_latency = metrics.latency('detect') if metrics is not None else {}
+        db_write_latency = metrics.latency('db.write') if metrics is not None else {}
+        
+        ready = not reasons
+        response = jsonify({
+            'status': 'ready' if ready else 'not_ready',
+            'reasons': reasons,
+            'timestamp': datetime.now().isoformat(),
+            'version': self.app.config['APP_VERSION'],
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'model': model_status,
+            'queue': {
+                'depth': queue_depth,
+                'max_depth': max_queue_depth,
+                'measured': queue_measured,
+                'inflight_detections': self.inflight_detections,
+                'asgi_inflight': asgi_inflight,
+                'history_pending': self.history_writer.pending if self.history_writer is not None else 0
+            },
+            'latency': {
+                'detect_p95_ms': detect_latency.get('p95_ms'),
+                'detect_count': detect_latency.get('count'),
+                'db_write_p95_ms': db_write_latency.get('p95_ms'),
+                'db_write_mean_ms': db_write_latency.get('mean_ms')
+            }
+        })
+        response.headers['Cache-Control'] = 'no-store'
+        return response, 200 if ready else 503
+    
+    def get_all_diseases(self):
+        """Return informasi semua penyakit bawang merah (body JSON sudah diserialisasi per bahasa)"""
+        lang = request.args.get('lang') or request.accept_languages.best_match(self.disease_catalog.languages)
+        response = Response(self.disease_catalog.json_body(lang), mimetype='application/json')
+        # Response publik di-cache: cache harus membedakan bahasa dari header Accept-Language
+        response.vary.add('Accept-Language')
+        return response
+    
     def get_user_history(self):
         """Stub: Return history deteksi (belum diimplementasikan)"""
         return jsonify({
@@ -523,17 +959,65 @@ class OnionDiseaseAPI:
             'message': 'Fitur statistik belum diimplementasikan'
         })
     
-    def save_detection_history(self, disease, confidence, image_hash, user_agent, ip_address, processing_time):
+    def save_detection_history(self, disease, confidence, image_hash, user_agent, ip_address, processing_time,
+                               model_version=None, phash=None, result=None):
         """Simpan record history deteksi ke database (stub/simple implementation)"""
+        record = {
+            'disease': disease,
+            'confidence': confidence,
+            'image_hash': image_hash,
+            'user_agent': user_agent,
+            'ip_address': ip_address,
+            'processing_time': processing_time,
+            'model_version': model_version,
+            'phash': phash,
+            'result': result
+        }
+        
+        # Mode ASGI: tulis di background writer, bukan di jalur request.
+        # Hash index di-update sekarang juga agar upload ulang langsung bisa di-reuse;
+        # id baris diisi oleh writer setelah batch ditulis.
+        if self.history_writer is not None:
+            if self.hash_index is not None and phash is not None and result is not None:
+                record['index_entry'] = {'id': None, 'result': result}
+                self.hash_index.add(phash, record['index_entry'])
+            self.history_writer.submit(record)
+            return
+        
+        self.write_detection_history([record])
+    
+    def write_detection_history(self, records):
+        """Tulis batch record history dalam satu transaksi"""
         try:
+            start = time.perf_counter()
             with sqlite3.connect(self.app.config.get('DATABASE', 'database.db')) as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO detection_history (disease, confidence, image_hash, user_agent, ip_address, processing_time)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (disease, confidence, image_hash, user_agent, ip_address, processing_time))
+                row_ids = []
+                for record in records:
+                    phash = record['phash']
+                    cursor.execute('''
+                        INSERT INTO detection_history (disease, confidence, image_hash, user_agent, ip_address, processing_time,
+                                                       phash, result_json, model_version)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', (record['disease'], record['confidence'], record['image_hash'], record['user_agent'],
+                          record['ip_address'], record['processing_time'],
+                          f'{phash:016x}' if phash is not None else None,
+                          json.dumps(record['result']) if record['result'] is not None else None,
+                          record['model_version']))
+                    row_ids.append(cursor.lastrowid)
                 conn.commit()
-                self.logger.info("Detection history saved")
+            
+            if metrics is not None:
+                metrics.observe('db.write', (time.perf_counter() - start) * 1000)
+            self.logger.info(f"Detection history saved ({len(records)} records)")
+            
+            # Hanya hasil inferensi asli yang masuk index (bukan hasil reuse)
+            if self.hash_index is not None:
+                for row_id, record in zip(row_ids, records):
+                    if 'index_entry' in record:
+                        record['index_entry']['id'] = row_id
+                    elif record['phash'] is not None and record['result'] is not None:
+                        self.hash_index.add(record['phash'], {'id': row_id, 'result': record['result']})
         except Exception as e:
             self.logger.error(f"Error saving detection history: {str(e)}")
     
@@ -0,0 +1,262 @@
+# ASGI Serving Mode untuk Website Deteksi Penyakit Bawang Merah
+# Route yang sama dengan Flask app (OnionDiseaseAPI), tetapi upload dibaca
+# di event loop sehingga koneksi lambat tidak menahan thread/worker
+#
+# Alur per request:
+#   1. Body di-stream dari client ke SpooledTemporaryFile di event loop
+#      (ribuan upload lambat hanya berupa coroutine yang menunggu data)
+#   2. Setelah body lengkap, Flask app dipanggil di thread pool executor:
+#      decode gambar dan inferensi berjalan di sana
+#   3. History deteksi ditulis oleh background writer (batch, thread DB sendiri);
+#      hash index near-duplicate tetap di-update langsung di jalur request
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from .app import LIVENESS_BODY, OnionDiseaseAPI, metrics
+
+SPOOL_MAX_MEMORY = 1024 * 1024  # Body > 1MB di-spool ke disk
+
+
+class AsyncHistoryWriter:
+    """
+    Penulis history deteksi di background
+
+    submit() aman dipanggil dari thread executor; record dikumpulkan di
+    asyncio.Queue lalu ditulis per batch di satu thread DB khusus,
+    jadi request tidak pernah menunggu SQLite.
+    """
+
+    def __init__(self, api, batch_size=100):
+        self.api = api
+        self.batch_size = batch_size
+        self.logger = logging.getLogger(__name__)
+        self.loop = None
+        self.queue = None
+        self._task = None
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='history-writer')
+
+    def start(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue()
+        self._task = loop.create_task(self._run())
+
+    def submit(self, record):
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, record)
+
+    @property
+    def pending(self):
+        return self.queue.qsize() if self.queue is not None else 0
+
+    async def _run(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                await self.loop.run_in_executor(self._db_executor, self.api.write_detection_history, batch)
+            except Exception as e:
+                self.logger.error(f"Error writing history batch: {str(e)}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def stop(self):
+        """Flush semua record yang tersisa lalu hentikan writer"""
+        if self._task is None:
+            return
+        await self.queue.join()
+        self._task.cancel()
+        self._db_executor.shutdown(wait=True)
+
+
+class AsyncOnionDiseaseAPI:
+    """
+    ASGI app di atas OnionDiseaseAPI
+
+    Flask app tetap menjadi satu-satunya definisi route; lapisan ini hanya
+    mengganti cara body dibaca (async) dan di mana handler dijalankan
+    (executor), jadi wsgi:app dan asgi:app selalu berperilaku sama.
+    """
+
+    def __init__(self, api=None, max_threads=None):
+        self.api = api or OnionDiseaseAPI()
+        self.flask_app = self.api.app
+        self.logger = logging.getLogger(__name__)
+        self.max_body_size = self.flask_app.config.get('MAX_CONTENT_LENGTH')
+
+        max_threads = max_threads or int(os.environ.get('ASGI_EXECUTOR_THREADS', min(32, (os.cpu_count() or 1) + 4)))
+        self.executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix='asgi-handler')
+        self.history_writer = AsyncHistoryWriter(self.api)
+
+        # Jumlah request /api/detect yang body-nya sudah lengkap dan menunggu/berjalan di executor
+        self.inflight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._handle_http(scope, receive, send)
+        else:
+            raise RuntimeError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.history_writer.start(asyncio.get_running_loop())
+                self.api.history_writer = self.history_writer
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.api.history_writer = None
+                await self.history_writer.stop()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _read_body(self, receive):
+        """Stream body ke file sementara; None jika client disconnect"""
+        body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return None, size
+
+            chunk = message.get('body', b'')
+            if chunk:
+                size += len(chunk)
+                if self.max_body_size and size > self.max_body_size:
+                    body.close()
+                    return False, size
+                body.write(chunk)
+
+            if not message.get('more_body', False):
+                body.seek(0)
+                return body, size
+
+    async def _handle_http(self, scope, receive, send):
+        if scope['path'] == '/api/health/live':
+            # Liveness dijawab langsung dari event loop, tanpa executor
+            await self._send_simple(send, 200, LIVENESS_BODY)
+            return
+
+        headers = scope.get('headers', [])
+        content_length = next((value for name, value in headers if name == b'content-length'), None)
+        if content_length is not None:
+            if not content_length.strip().isdigit():
+                await self._send_simple(send, 400, b'{"success": false, "error": "Invalid Content-Length"}')
+                return
+            content_length = int(content_length)
+        if self.max_body_size and content_length and content_length > self.max_body_size:
+            await self._send_simple(send, 413, b'{"success": false, "error": "File too large"}')
+            return
+
+        body, size = await self._read_body(receive)
+        if body is None:
+            return  # client sudah putus, tidak perlu diproses
+        if body is False:
+            await self._send_simple(send, 413, b'{"success": false, "error": "File too large"}')
+            return
+
+        environ = self._build_environ(scope, body, size)
+        loop = asyncio.get_running_loop()
+        # Hanya request deteksi yang dihitung sebagai antrian inferensi
+        counted = scope['path'] == '/api/detect'
+        if counted:
+            self._set_inflight(1)
+        try:
+            status, response_headers, chunks = await loop.run_in_executor(self.executor, self._call_wsgi, environ)
+        finally:
+            if counted:
+                self._set_inflight(-1)
+            body.close()
+
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in response_headers]
+        })
+        await send({'type': 'http.response.body', 'body': b''.join(chunks)})
+
+    def _set_inflight(self, delta):
+        self.inflight += delta
+        if metrics is not None:
+            metrics.set_gauge('asgi.inflight', self.inflight)
+
+    def _build_environ(self, scope, body, size):
+        """Environ WSGI (PEP 3333) dari scope ASGI"""
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        path = scope['path'].encode('utf-8').decode('latin-1')
+        root_path = scope.get('root_path', '')
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': root_path,
+            'PATH_INFO': path,
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'CONTENT_LENGTH': str(size),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False
+        }
+
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name == 'CONTENT_LENGTH':
+                continue
+            key = name if name == 'CONTENT_TYPE' else f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+
+        return environ
+
+    def _call_wsgi(self, environ):
+        """Jalankan Flask app (di thread executor) dan kumpulkan response"""
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = headers
+            return lambda data: chunks.append(data)
+
+        chunks = []
+        result = self.flask_app(environ, start_response)
+        try:
+            for chunk in result:
+                if chunk:
+                    chunks.append(chunk)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+        return response['status'], response['headers'], chunks
+
+    async def _send_simple(self, send, status, body):
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode()),
+                        (b'cache-control', b'no-store')]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+def create_asgi_app(api=None, max_threads=None):
+    return AsyncOnionDiseaseAPI(api, max_threads=max_threads)
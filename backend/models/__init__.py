@@ -1 +1,50 @@
-# Models package untuk AI/ML models
\ No newline at end of file
+# Models package untuk AI/ML models
+#
+# Model di-resolve secara lazy lewat factory: mengimport package ini tidak
+# mengimport TensorFlow. TF baru di-load saat backend berbasis TF dibuat.
+
+import importlib
+import sys
+
+# name -> (module relatif, nama class)
+MODEL_BACKENDS = {
+    'cnn': ('.cnn_model', 'CNNModel'),
+    'rnn': ('.rnn_model', 'RNNModel'),
+    'rnn_numpy': ('.numpy_lstm', 'NumpyLSTMModel'),
+    'color_features': ('.cascade_model', 'ColorFeatureClassifier')
+}
+
+# Atribut package yang di-load saat pertama diakses (PEP 562)
+_LAZY_ATTRIBUTES = {class_name: (module, class_name) for module, class_name in MODEL_BACKENDS.values()}
+_LAZY_ATTRIBUTES.update({
+    'ModelRegistry': ('.model_registry', 'ModelRegistry'),
+    'ModelManager': ('.model_registry', 'ModelManager'),
+    'InferenceCascade': ('.cascade_model', 'InferenceCascade'),
+    'StreamingRNN': ('.streaming_rnn', 'StreamingRNN')
+})
+
+
+def get_model_class(backend):
+    """Class model untuk nama backend (import modul hanya saat dipanggil)"""
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown model backend '{backend}'. Available: {', '.join(MODEL_BACKENDS)}")
+    module_name, class_name = MODEL_BACKENDS[backend]
+    return getattr(importlib.import_module(module_name, __name__), class_name)
+
+
+def create_model(backend='cnn', **kwargs):
+    """Buat instance model dari nama backend"""
+    return get_model_class(backend)(**kwargs)
+
+
+def is_tensorflow_loaded():
+    return 'tensorflow' in sys.modules
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        module_name, attribute = _LAZY_ATTRIBUTES[name]
+        value = getattr(importlib.import_module(module_name, __name__), attribute)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,286 @@
+# Inference Cascade untuk Deteksi Penyakit Bawang Merah
+# Stage 1: classifier linear murah berbasis color features
+# Stage 2: CNNModel (MobileNetV2) hanya untuk gambar yang belum pasti
+
+import numpy as np
+import logging
+import time
+from pathlib import Path
+
+try:
+    from utils.metrics import metrics
+    from utils.image_processor import ImageProcessor
+except ImportError:
+    from backend.utils.metrics import metrics
+    from backend.utils.image_processor import ImageProcessor
+
+
+COLOR_FRACTION_KEYS = ('green', 'yellow', 'brown', 'purple', 'white')
+
+# File classifier stage 1 di folder artefak versi model (registry)
+FIRST_STAGE_FILENAME = 'color_classifier.npz'
+
+_image_processor = ImageProcessor()
+
+
+def color_feature_vector(image):
+    """
+    Ubah gambar (H, W, 3) menjadi feature vector warna (13 features)
+
+    Dibangun dari ImageProcessor.extract_color_features: mean & std per
+    channel RGB, brightness, contrast, dan proporsi hue bin kasar.
+    """
+    image = np.asarray(image, dtype=np.float32)
+    if image.max() > 1.0:
+        image = image / 255.0
+
+    features = _image_processor.extract_color_features(image)
+    return np.concatenate([
+        features['rgb_mean'],
+        features['rgb_std'],
+        [features['brightness'], features['contrast']],
+        [features['color_fractions'][key] for key in COLOR_FRACTION_KEYS]
+    ]).astype(np.float32)
+
+
+class ColorFeatureClassifier:
+    """
+    Softmax regression kecil di atas color features (stage 1 cascade)
+    Dilatih dengan NumPy, inferensi hanya satu perkalian matrix
+    """
+
+    def __init__(self, num_classes=5, num_features=13):
+        self.num_classes = num_classes
+        self.num_features = num_features
+        self.weights = np.zeros((num_features, num_classes), dtype=np.float32)
+        self.bias = np.zeros(num_classes, dtype=np.float32)
+        self.feature_mean = np.zeros(num_features, dtype=np.float32)
+        self.feature_std = np.ones(num_features, dtype=np.float32)
+        self.is_trained = False
+        self.logger = logging.getLogger(__name__)
+
+    def _softmax(self, logits):
+        logits = logits - logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def fit(self, features, labels, epochs=300, learning_rate=0.1, l2=1e-3):
+        """
+        Train dengan batch gradient descent
+
+        Args:
+            features: Array (N, num_features)
+            labels: Array (N,) berisi class index
+        """
+        try:
+            features = np.asarray(features, dtype=np.float32)
+            labels = np.asarray(labels, dtype=np.int64)
+
+            self.feature_mean = features.mean(axis=0)
+            self.feature_std = features.std(axis=0) + 1e-6
+            X = (features - self.feature_mean) / self.feature_std
+            Y = np.eye(self.num_classes, dtype=np.float32)[labels]
+
+            for _ in range(epochs):
+                probs = self._softmax(X @ self.weights + self.bias)
+                grad = (probs - Y) / len(X)
+                self.weights -= learning_rate * (X.T @ grad + l2 * self.weights)
+                self.bias -= learning_rate * grad.sum(axis=0)
+
+            self.is_trained = True
+            accuracy = float(np.mean(self.predict_proba(features).argmax(axis=1) == labels))
+            self.logger.info(f"Color classifier trained (train accuracy: {accuracy:.3f})")
+            return accuracy
+
+        except Exception as e:
+            self.logger.error(f"Error training color classifier: {str(e)}")
+            raise
+
+    def predict_proba(self, features):
+        """Probabilitas kelas untuk array features (N, num_features)"""
+        features = np.atleast_2d(np.asarray(features, dtype=np.float32))
+        X = (features - self.feature_mean) / self.feature_std
+        return self._softmax(X @ self.weights + self.bias)
+
+    def save(self, filepath):
+        np.savez(
+            filepath,
+            weights=self.weights, bias=self.bias,
+            feature_mean=self.feature_mean, feature_std=self.feature_std
+        )
+        self.logger.info(f"Color classifier saved to {filepath}")
+
+    def load(self, filepath):
+        if not Path(filepath).exists():
+            raise FileNotFoundError(f"Color classifier file not found: {filepath}")
+
+        with np.load(filepath) as data:
+            self.weights = data['weights']
+            self.bias = data['bias']
+            self.feature_mean = data['feature_mean']
+            self.feature_std = data['feature_std']
+        self.num_features, self.num_classes = self.weights.shape
+        self.is_trained = True
+        self.logger.info(f"Color classifier loaded from {filepath}")
+
+
+class InferenceCascade:
+    """
+    Cascade dua tahap dengan confidence gate
+
+    Stage 1 (color features) menjawab jika confidence >= threshold,
+    sisanya diteruskan ke CNNModel. Fraksi early-exit dan latency
+    per stage dicatat di metrics registry.
+    """
+
+    def __init__(self, cnn_model=None, first_stage=None, threshold=0.9):
+        if cnn_model is None:
+            from . import create_model
+            cnn_model = create_model('cnn')
+        self.cnn_model = cnn_model
+        self.first_stage = first_stage or ColorFeatureClassifier(num_classes=cnn_model.num_classes)
+        self.threshold = threshold
+        self.class_names = cnn_model.class_names
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def input_shape(self):
+        return self.cnn_model.input_shape
+
+    def load_model(self, filepath):
+        """
+        Load CNN dari artefak registry, plus classifier stage 1 jika ada
+        color_classifier.npz di folder yang sama. Tanpa file itu cascade
+        meneruskan semua gambar ke CNN (hasil sama dengan CNN saja).
+        """
+        self.cnn_model.load_model(filepath)
+
+        first_stage_path = Path(filepath).parent / FIRST_STAGE_FILENAME
+        if first_stage_path.exists():
+            self.first_stage.load(first_stage_path)
+        else:
+            self.logger.info(f"No stage 1 classifier at {first_stage_path}, cascade uses CNN only")
+
+    def warmup(self, image):
+        """
+        Warmup stage CNN langsung (dipanggil ModelManager sebelum swap)
+
+        Tidak lewat predict(): stage 1 bisa early-exit pada gambar dummy
+        sehingga CNN tidak pernah dijalankan, dan warmup tidak boleh
+        tercatat di metrics cascade.
+
+        Returns:
+            bool: True jika CNN dijalankan
+        """
+        self.cnn_model.predict(image)
+        return True
+
+    def predict(self, image, **tta_kwargs):
+        """
+        Predict dengan cascade
+
+        Args:
+            image: Preprocessed image array (H, W, 3) atau (1, H, W, 3)
+            **tta_kwargs: tta, tta_k, latency_budget_ms untuk CNNModel.predict.
+                Jika TTA diminta, stage 1 dilewati dan CNN selalu dijalankan.
+
+        Returns:
+            dict: Prediction results + 'stage' yang menjawab
+        """
+        try:
+            if len(image.shape) == 4:
+                image = image[0]
+
+            metrics.increment('cascade.requests')
+            tta_requested = tta_kwargs.get('tta') and tta_kwargs.get('tta_k') != 0
+
+            if self.first_stage.is_trained and not tta_requested:
+                start = time.perf_counter()
+                probabilities = self.first_stage.predict_proba(color_feature_vector(image))[0]
+                metrics.observe('cascade.stage1', (time.perf_counter() - start) * 1000)
+
+                if probabilities.max() >= self.threshold:
+                    metrics.increment('cascade.early_exit')
+                    result = self.cnn_model.format_prediction(probabilities)
+                    result['stage'] = 'color'
+                    return result
+
+            start = time.perf_counter()
+            result = self.cnn_model.predict(image, **tta_kwargs)
+            metrics.observe('cascade.stage2', (time.perf_counter() - start) * 1000)
+            result['stage'] = 'cnn'
+            return result
+
+        except Exception as e:
+            self.logger.error(f"Error in cascade prediction: {str(e)}")
+            raise
+
+    def early_exit_rate(self):
+        """Fraksi request yang dijawab oleh stage 1"""
+        total = metrics.counter('cascade.requests')
+        return metrics.counter('cascade.early_exit') / total if total else 0.0
+
+    def get_metrics(self):
+        return {
+            'threshold': self.threshold,
+            'requests': metrics.counter('cascade.requests'),
+            'early_exit_rate': self.early_exit_rate(),
+            'stage1_latency': metrics.latency('cascade.stage1'),
+            'stage2_latency': metrics.latency('cascade.stage2')
+        }
+
+
+def train_first_stage(data_dir, output_path, class_names=None, target_size=(224, 224),
+                      epochs=300, learning_rate=0.1):
+    """
+    Latih classifier stage 1 dari dataset folder per kelas lalu simpan
+
+    Gambar diproses dengan ImageProcessor.prepare_model_input (sama seperti
+    saat serving). Simpan ke <versi registry>/color_classifier.npz agar
+    di-load otomatis bersama model CNN versi tersebut.
+
+    Returns:
+        float: Train accuracy
+    """
+    try:
+        from utils.disease_catalog import CLASS_ORDER
+    except ImportError:
+        from backend.utils.disease_catalog import CLASS_ORDER
+
+    class_names = list(class_names or CLASS_ORDER)
+    processor = ImageProcessor(target_size=target_size)
+    data_dir = Path(data_dir)
+
+    features, labels = [], []
+    for label, class_name in enumerate(class_names):
+        class_dir = data_dir / class_name
+        if not class_dir.is_dir():
+            continue
+        for path in sorted(class_dir.rglob('*')):
+            if path.suffix.lower() not in ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp'):
+                continue
+            features.append(color_feature_vector(processor.prepare_model_input(str(path))[0]))
+            labels.append(label)
+
+    if not features:
+        raise ValueError(f"No training images found in {data_dir}")
+
+    classifier = ColorFeatureClassifier(num_classes=len(class_names))
+    accuracy = classifier.fit(np.stack(features), np.array(labels), epochs=epochs, learning_rate=learning_rate)
+    classifier.save(output_path)
+    return accuracy
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Train the color-feature first stage of the inference cascade')
+    parser.add_argument('data_dir', help='Dataset folder per kelas (mis. data/train)')
+    parser.add_argument('output', help=f'Output .npz (mis. model_registry/v1/{FIRST_STAGE_FILENAME})')
+    parser.add_argument('--epochs', type=int, default=300)
+    parser.add_argument('--learning-rate', type=float, default=0.1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    train_accuracy = train_first_stage(args.data_dir, args.output, epochs=args.epochs, learning_rate=args.learning_rate)
+    print(f"✅ Stage 1 classifier saved to {args.output} (train accuracy {train_accuracy:.3f})")
@@ -6,14 +6,21 @@ from tensorflow import keras
 from tensorflow.keras import layers
 import numpy as np
 import logging
+import time
 from pathlib import Path
 
+from .runtime_config import configure_runtime
+from .training_callbacks import FullStateCheckpoint, ThroughputLogger, dataset_batch_size
+from .evaluation import evaluate_streaming
+
 class CNNModel:
     """
     Convolutional Neural Network untuk klasifikasi penyakit bawang merah
     """
     
-    def __init__(self, input_shape=(224, 224, 3), num_classes=5):
+    def __init__(self, input_shape=(224, 224, 3), num_classes=5, runtime_config=None):
+        # Threading/affinity harus diterapkan sebelum runtime TF dimulai
+        self.runtime_config = configure_runtime(runtime_config)
         self.input_shape = input_shape
         self.num_classes = num_classes
         self.model = None
@@ -25,11 +32,19 @@ class CNNModel:
             'leaf_blight',
             'anthracnose'
         ]
+        
+        # Test-time augmentation (TTA)
+        self.max_tta_variants = 8
+        self._tta_ms_per_image = None  # Estimasi latency per gambar (EMA)
     
-    def build_model(self):
+    def build_model(self, dense_units=(128, 64), dropout_rates=(0.2, 0.3, 0.2)):
         """
         Build CNN architecture untuk deteksi penyakit
         Menggunakan transfer learning dengan MobileNetV2 sebagai base
+        
+        Args:
+            dense_units: Lebar dua Dense layer classifier
+            dropout_rates: Dropout setelah pooling, setelah Dense pertama, dan setelah Dense kedua
         """
         try:
             # Base model menggunakan MobileNetV2 (pre-trained)
@@ -60,12 +75,12 @@ class CNNModel:
                 
                 # Custom classifier
                 layers.GlobalAveragePooling2D(),
-                layers.Dropout(0.2),
-                layers.Dense(128, activation='relu'),
+                layers.Dropout(dropout_rates[0]),
+                layers.Dense(dense_units[0], activation='relu'),
                 layers.BatchNormalization(),
-                layers.Dropout(0.3),
-                layers.Dense(64, activation='relu'),
-                layers.Dropout(0.2),
+                layers.Dropout(dropout_rates[1]),
+                layers.Dense(dense_units[1], activation='relu'),
+                layers.Dropout(dropout_rates[2]),
                 layers.Dense(self.num_classes, activation='softmax')
             ])
             
@@ -95,7 +110,8 @@ class CNNModel:
             self.logger.error(f"Error compiling model: {str(e)}")
             raise
     
-    def train(self, train_dataset, validation_dataset, epochs=50):
+    def train(self, train_dataset, validation_dataset, epochs=50, bottleneck=False, features_dir='bottleneck_features',
+              resume=False, checkpoint_dir='checkpoints/cnn', training_log='training_log.jsonl', batch_size=None):
         """
         Train model dengan dataset
         
@@ -103,7 +119,18 @@ class CNNModel:
             train_dataset: Training dataset
             validation_dataset: Validation dataset
             epochs: Number of training epochs
+            bottleneck: Jika True, base model hanya dijalankan sekali dan
+                classifier head dilatih dari features yang disimpan di disk
+                (lihat train_bottleneck)
+            features_dir: Direktori features untuk mode bottleneck
+            resume: Lanjutkan dari checkpoint full-state terakhir di checkpoint_dir
+            checkpoint_dir: Direktori checkpoint (bobot, optimizer, epoch, LR)
+            training_log: File JSON-lines untuk throughput dan step-time
+            batch_size: Ukuran batch dataset (untuk menghitung images/sec); None = dari train_dataset
         """
+        if bottleneck:
+            return self.train_bottleneck(train_dataset, validation_dataset, features_dir, epochs=epochs)
+        
         try:
             if self.model is None:
                 self.compile_model()
@@ -129,10 +156,17 @@ class CNNModel:
                 )
             ]
             
+            # Instrumentasi + checkpoint yang bisa di-resume
+            state_checkpoint = FullStateCheckpoint(checkpoint_dir, tracked_callbacks=list(callbacks))
+            logged_batch_size = batch_size or dataset_batch_size(train_dataset)
+            callbacks += [ThroughputLogger(training_log, batch_size=logged_batch_size), state_checkpoint]
+            initial_epoch = state_checkpoint.restore(self.model) if resume else 0
+            
             # Training
             history = self.model.fit(
                 train_dataset,
                 epochs=epochs,
+                initial_epoch=initial_epoch,
                 validation_data=validation_dataset,
                 callbacks=callbacks,
                 verbose=1
@@ -145,6 +179,124 @@ class CNNModel:
             self.logger.error(f"Error training model: {str(e)}")
             raise
     
+    def _split_base_and_head(self):
+        """Cari base model (MobileNetV2) dan layer classifier head setelah pooling"""
+        base_index = next(
+            index for index, layer in enumerate(self.model.layers) if isinstance(layer, keras.Model)
+        )
+        pool_index = next(
+            index for index, layer in enumerate(self.model.layers)
+            if index > base_index and isinstance(layer, layers.GlobalAveragePooling2D)
+        )
+        return self.model.layers[base_index], self.model.layers[pool_index + 1:]
+    
+    def extract_bottleneck_features(self, dataset, output_prefix):
+        """
+        Jalankan base model sekali atas dataset dan simpan pooled features
+        
+        Features ditulis bertahap ke file raw float32 lalu dibuka sebagai
+        np.memmap, jadi tidak pernah ada salinan penuh di RAM.
+        
+        Returns:
+            (features_memmap, labels): features shape (N, feature_dim)
+        """
+        try:
+            if self.model is None:
+                self.build_model()
+            
+            base_model, _ = self._split_base_and_head()
+            inputs = keras.Input(shape=self.input_shape)
+            x = keras.applications.mobilenet_v2.preprocess_input(inputs)
+            x = base_model(x, training=False)
+            outputs = layers.GlobalAveragePooling2D()(x)
+            extractor = keras.Model(inputs, outputs)
+            
+            output_prefix = Path(output_prefix)
+            output_prefix.parent.mkdir(parents=True, exist_ok=True)
+            features_path = output_prefix.with_suffix('.features.f32')
+            
+            num_rows = 0
+            labels = []
+            with open(features_path, 'wb') as f:
+                for images, batch_labels in dataset:
+                    batch_features = extractor(images, training=False).numpy().astype(np.float32)
+                    f.write(batch_features.tobytes())
+                    num_rows += len(batch_features)
+                    labels.append(np.asarray(batch_labels))
+            
+            feature_dim = extractor.output_shape[-1]
+            labels = np.concatenate(labels).astype(np.float32)
+            np.save(output_prefix.with_suffix('.labels.npy'), labels)
+            
+            features = np.memmap(features_path, dtype=np.float32, mode='r', shape=(num_rows, feature_dim))
+            self.logger.info(f"Bottleneck features extracted: {num_rows} x {feature_dim} -> {features_path}")
+            return features, labels
+            
+        except Exception as e:
+            self.logger.error(f"Error extracting bottleneck features: {str(e)}")
+            raise
+    
+    def train_bottleneck(self, train_dataset, validation_dataset, features_dir='bottleneck_features',
+                         epochs=100, batch_size=64, learning_rate=0.001):
+        """
+        Train classifier head dari bottleneck features (base model frozen)
+        
+        Base MobileNetV2 hanya dijalankan sekali per gambar; setiap epoch
+        berikutnya hanya melatih Dense layers di atas features memmap.
+        Layer head dipakai bersama dengan self.model, jadi bobot hasil
+        training langsung berlaku di model penuh. Augmentasi data tidak
+        aktif di mode ini; gunakan fine_tune untuk training end-to-end.
+        """
+        try:
+            if self.model is None:
+                self.build_model()
+            
+            features_dir = Path(features_dir)
+            train_features, train_labels = self.extract_bottleneck_features(train_dataset, features_dir / 'train')
+            val_features, val_labels = self.extract_bottleneck_features(validation_dataset, features_dir / 'val')
+            
+            _, head_layers = self._split_base_and_head()
+            head = keras.Sequential([keras.Input(shape=(train_features.shape[1],))] + list(head_layers))
+            head.compile(
+                optimizer=keras.optimizers.Adam(learning_rate=learning_rate),
+                loss='categorical_crossentropy',
+                metrics=['accuracy', 'precision', 'recall']
+            )
+            
+            callbacks = [
+                keras.callbacks.EarlyStopping(
+                    monitor='val_loss',
+                    patience=10,
+                    restore_best_weights=True
+                ),
+                keras.callbacks.ReduceLROnPlateau(
+                    monitor='val_loss',
+                    factor=0.2,
+                    patience=5,
+                    min_lr=1e-7
+                )
+            ]
+            
+            history = head.fit(
+                train_features, train_labels,
+                validation_data=(val_features, val_labels),
+                epochs=epochs,
+                batch_size=batch_size,
+                shuffle=True,
+                callbacks=callbacks,
+                verbose=1
+            )
+            
+            # Compile model penuh agar siap untuk evaluate/predict/fine_tune
+            self.compile_model(learning_rate=learning_rate)
+            
+            self.logger.info("Bottleneck head training completed")
+            return history
+            
+        except Exception as e:
+            self.logger.error(f"Error in bottleneck training: {str(e)}")
+            raise
+    
     def fine_tune(self, train_dataset, validation_dataset, epochs=10):
         """
         Fine-tuning dengan unfreeze beberapa layer terakhir
@@ -154,7 +306,7 @@ class CNNModel:
                 raise ValueError("Model must be trained first")
             
             # Unfreeze top layers of base model
-            base_model = self.model.layers[4]  # MobileNetV2 layer
+            base_model, _ = self._split_base_and_head()  # MobileNetV2 layer
             base_model.trainable = True
             
             # Fine-tune from this layer onwards
@@ -186,12 +338,15 @@ class CNNModel:
             self.logger.error(f"Error fine-tuning model: {str(e)}")
             raise
     
-    def predict(self, image):
+    def predict(self, image, tta=False, tta_k=None, latency_budget_ms=None):
         """
         Predict penyakit dari gambar
         
         Args:
             image: Preprocessed image array
+            tta: Aktifkan test-time augmentation (rata-rata prediksi beberapa varian)
+            tta_k: Jumlah varian TTA (default: semua varian yang tersedia; 0 = tanpa TTA)
+            latency_budget_ms: Batas latency; jumlah varian dikurangi agar muat
             
         Returns:
             dict: Prediction results
@@ -204,29 +359,97 @@ class CNNModel:
             if len(image.shape) == 3:
                 image = np.expand_dims(image, axis=0)
             
+            if tta and tta_k != 0:
+                if image.shape[0] != 1:
+                    raise ValueError(f"TTA expects a single image, got batch of {image.shape[0]}")
+                return self._predict_tta(image[0], tta_k, latency_budget_ms)
+            
             # Prediction
             predictions = self.model.predict(image, verbose=0)
             
-            # Get class probabilities
-            class_probabilities = predictions[0]
-            predicted_class_idx = np.argmax(class_probabilities)
-            confidence = float(class_probabilities[predicted_class_idx]) * 100
-            
-            result = {
-                'predicted_class': self.class_names[predicted_class_idx],
-                'confidence': confidence,
-                'all_probabilities': {
-                    class_name: float(prob) * 100 
-                    for class_name, prob in zip(self.class_names, class_probabilities)
-                }
-            }
-            
-            return result
+            return self.format_prediction(predictions[0])
             
         except Exception as e:
             self.logger.error(f"Error making prediction: {str(e)}")
             raise
     
+    def format_prediction(self, class_probabilities):
+        """Susun dict hasil prediksi dari vektor probabilitas"""
+        predicted_class_idx = np.argmax(class_probabilities)
+        confidence = float(class_probabilities[predicted_class_idx]) * 100
+        
+        result = {
+            'predicted_class': self.class_names[predicted_class_idx],
+            'confidence': confidence,
+            'all_probabilities': {
+                class_name: float(prob) * 100 
+                for class_name, prob in zip(self.class_names, class_probabilities)
+            }
+        }
+        
+        return result
+    
+    def build_tta_batch(self, image, k):
+        """
+        Buat k varian gambar (flip/crop) dalam satu batch
+        
+        Urutan varian: original, flip horizontal, lalu crop 90% (tengah
+        dan empat sudut) yang di-resize kembali, lalu flip vertikal.
+        """
+        height, width = image.shape[:2]
+        crop_h, crop_w = int(height * 0.9), int(width * 0.9)
+        offsets = [
+            ((height - crop_h) // 2, (width - crop_w) // 2),
+            (0, 0),
+            (0, width - crop_w),
+            (height - crop_h, 0),
+            (height - crop_h, width - crop_w)
+        ]
+        
+        variants = [image, image[:, ::-1]]
+        crops = [image[top:top + crop_h, left:left + crop_w] for top, left in offsets[:max(0, k - 2)]]
+        if crops:
+            resized = tf.image.resize(np.stack(crops), (height, width)).numpy()
+            variants.extend(resized.astype(image.dtype))
+        variants.append(image[::-1])
+        
+        return np.stack(variants[:k])
+    
+    def _predict_tta(self, image, tta_k, latency_budget_ms):
+        """Prediksi TTA dengan satu forward pass batch"""
+        k = min(tta_k if tta_k is not None else self.max_tta_variants, self.max_tta_variants)
+        
+        # Batasi jumlah varian berdasarkan latency budget. Sebelum ada estimasi
+        # latency, hanya gambar asli yang diproses (sekaligus mengisi estimasi).
+        if latency_budget_ms is not None:
+            if self._tta_ms_per_image is None:
+                k = 1
+            else:
+                k = min(k, int(latency_budget_ms // self._tta_ms_per_image))
+        k = max(k, 1)
+        
+        batch = self.build_tta_batch(image, k)
+        
+        start = time.perf_counter()
+        probabilities = np.asarray(self.model(batch, training=False))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        # Update estimasi latency per gambar (exponential moving average)
+        per_image_ms = elapsed_ms / k
+        if self._tta_ms_per_image is None:
+            self._tta_ms_per_image = per_image_ms
+        else:
+            self._tta_ms_per_image = 0.8 * self._tta_ms_per_image + 0.2 * per_image_ms
+        
+        result = self.format_prediction(probabilities.mean(axis=0))
+        result['tta'] = {
+            'variants': k,
+            'latency_ms': round(elapsed_ms, 2),
+            'agreement': float(np.mean(np.argmax(probabilities, axis=1) == np.argmax(probabilities.mean(axis=0))))
+        }
+        
+        return result
+    
     def save_model(self, filepath):
         """Save trained model"""
         try:
@@ -266,13 +489,14 @@ class CNNModel:
             if self.model is None:
                 raise ValueError("Model not loaded")
             
-            results = self.model.evaluate(test_dataset, verbose=0)
+            # return_dict: metrics diambil berdasarkan nama, bukan posisi
+            results = self.model.evaluate(test_dataset, verbose=0, return_dict=True)
             
             metrics = {
-                'loss': results[0],
-                'accuracy': results[1],
-                'precision': results[2] if len(results) > 2 else None,
-                'recall': results[3] if len(results) > 3 else None
+                'loss': results.get('loss'),
+                'accuracy': results.get('accuracy'),
+                'precision': results.get('precision'),
+                'recall': results.get('recall')
             }
             
             return metrics
@@ -280,9 +504,19 @@ class CNNModel:
         except Exception as e:
             self.logger.error(f"Error evaluating model: {str(e)}")
             raise
+    
+    def evaluate_detailed(self, test_dataset, num_bins=10):
+        """
+        Evaluasi streaming: confusion matrix, precision/recall/F1 per kelas,
+        kurva kalibrasi, dan latency per batch
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded")
+        
+        return evaluate_streaming(self.model, self.class_names, test_dataset, num_bins=num_bins)
 
 # Utility functions untuk data preparation
-def create_dataset_from_directory(data_dir, image_size=(224, 224), batch_size=32):
+def create_dataset_from_directory(data_dir, image_size=(224, 224), batch_size=32, cache=True, cache_file=None):
     """
     Create dataset from directory structure
     
@@ -293,6 +527,11 @@ def create_dataset_from_directory(data_dir, image_size=(224, 224), batch_size=32
     ├── downy_mildew/
     ├── leaf_blight/
     └── anthracnose/
+    
+    Args:
+        cache: Cache hasil decode+resize (default True)
+        cache_file: Jika diisi, cache ditulis ke disk (path prefix) bukan di RAM.
+            Gunakan ini untuk dataset besar yang tidak muat di memory.
     """
     try:
         dataset = keras.utils.image_dataset_from_directory(
@@ -304,7 +543,12 @@ def create_dataset_from_directory(data_dir, image_size=(224, 224), batch_size=32
         
         # Optimize dataset performance
         AUTOTUNE = tf.data.AUTOTUNE
-        dataset = dataset.cache().prefetch(buffer_size=AUTOTUNE)
+        if cache_file:
+            Path(cache_file).parent.mkdir(parents=True, exist_ok=True)
+            dataset = dataset.cache(str(cache_file))
+        elif cache:
+            dataset = dataset.cache()
+        dataset = dataset.prefetch(buffer_size=AUTOTUNE)
         
         return dataset
         
@@ -313,7 +557,13 @@ def create_dataset_from_directory(data_dir, image_size=(224, 224), batch_size=32
         raise
 
 def split_dataset(dataset, train_split=0.8, val_split=0.1, test_split=0.1):
-    """Split dataset into train, validation, and test sets"""
+    """
+    Split dataset into train, validation, and test sets
+    
+    Catatan: split ini bekerja pada dataset yang sudah di-batch (jumlah
+    batch, tidak stratified). Untuk split stratified per kelas di level
+    file, gunakan dataset_pipeline.create_split_datasets.
+    """
     try:
         dataset_size = len(dataset)
         train_size = int(train_split * dataset_size)
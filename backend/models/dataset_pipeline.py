@@ -0,0 +1,307 @@
+# Dataset Pipeline untuk training CNN dengan dataset besar
+# Konversi folder per kelas ke TFRecord sharded + pembacaan paralel
+
+import json
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import tensorflow as tf
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.gif'}
+CLASSES_FILE = 'classes.json'
+
+
+def list_image_files(data_dir, class_names=None):
+    """
+    Daftar (path, label_index) dari struktur folder per kelas
+
+    Urutan kelas default mengikuti urutan alfabet folder, sama seperti
+    keras.utils.image_dataset_from_directory.
+    """
+    data_dir = Path(data_dir)
+    if class_names is None:
+        class_names = sorted(p.name for p in data_dir.iterdir() if p.is_dir())
+
+    files = []
+    for label, class_name in enumerate(class_names):
+        class_dir = data_dir / class_name
+        if not class_dir.is_dir():
+            continue
+        for path in sorted(class_dir.rglob('*')):
+            if path.suffix.lower() in IMAGE_EXTENSIONS:
+                files.append((str(path), label))
+
+    return files, list(class_names)
+
+
+def _bytes_feature(value):
+    return tf.train.Feature(bytes_list=tf.train.BytesList(value=[value]))
+
+
+def _int64_feature(value):
+    return tf.train.Feature(int64_list=tf.train.Int64List(value=[value]))
+
+
+def _write_shard(shard_path, entries):
+    """Tulis satu shard TFRecord; gambar disimpan ter-encode (tanpa decode)"""
+    count = 0
+    with tf.io.TFRecordWriter(shard_path, options='GZIP') as writer:
+        for path, label in entries:
+            with open(path, 'rb') as f:
+                image_bytes = f.read()
+            example = tf.train.Example(features=tf.train.Features(feature={
+                'image': _bytes_feature(image_bytes),
+                'label': _int64_feature(label)
+            }))
+            writer.write(example.SerializeToString())
+            count += 1
+    return count
+
+
+def convert_directory_to_tfrecords(data_dir, output_dir, num_shards=16, class_names=None, seed=42, max_workers=None):
+    """
+    Konversi dataset folder per kelas menjadi TFRecord sharded (GZIP)
+
+    File di-shuffle sebelum dibagi ke shard agar setiap shard berisi
+    campuran kelas. Shard ditulis paralel.
+
+    Returns:
+        dict: Ringkasan konversi (jumlah file, shard, kelas)
+    """
+    try:
+        files, class_names = list_image_files(data_dir, class_names)
+        if not files:
+            raise ValueError(f"No image files found in {data_dir}")
+
+        random.Random(seed).shuffle(files)
+        num_shards = max(1, min(num_shards, len(files)))
+
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        shards = [
+            (str(output_dir / f'data-{index:05d}-of-{num_shards:05d}.tfrecord.gz'), files[index::num_shards])
+            for index in range(num_shards)
+        ]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            counts = list(executor.map(lambda shard: _write_shard(*shard), shards))
+
+        with open(output_dir / CLASSES_FILE, 'w') as f:
+            json.dump(class_names, f, indent=2)
+
+        summary = {'num_files': sum(counts), 'num_shards': num_shards, 'class_names': class_names}
+        logging.info(f"TFRecord conversion completed: {summary}")
+        return summary
+
+    except Exception as e:
+        logging.error(f"Error converting dataset to TFRecord: {str(e)}")
+        raise
+
+
+def create_dataset_from_tfrecords(tfrecord_dir, image_size=(224, 224), batch_size=32, shuffle=True,
+                                  shuffle_buffer=1000, cache_file=None, seed=None):
+    """
+    Dataset dari TFRecord sharded dengan interleaved read dan decode paralel
+
+    Args:
+        tfrecord_dir: Direktori output convert_directory_to_tfrecords
+        cache_file: Cache hasil decode ke disk (opsional); tidak pernah di RAM
+        shuffle: Shuffle urutan shard dan sampel (untuk training)
+    """
+    try:
+        tfrecord_dir = Path(tfrecord_dir)
+        with open(tfrecord_dir / CLASSES_FILE) as f:
+            num_classes = len(json.load(f))
+
+        AUTOTUNE = tf.data.AUTOTUNE
+        files = tf.data.Dataset.list_files(str(tfrecord_dir / '*.tfrecord.gz'), shuffle=shuffle, seed=seed)
+
+        # Baca beberapa shard sekaligus agar I/O tidak jadi bottleneck
+        dataset = files.interleave(
+            lambda path: tf.data.TFRecordDataset(path, compression_type='GZIP'),
+            cycle_length=AUTOTUNE,
+            num_parallel_calls=AUTOTUNE,
+            deterministic=not shuffle
+        )
+
+        feature_spec = {
+            'image': tf.io.FixedLenFeature([], tf.string),
+            'label': tf.io.FixedLenFeature([], tf.int64)
+        }
+
+        def parse(record):
+            example = tf.io.parse_single_example(record, feature_spec)
+            image = tf.io.decode_image(example['image'], channels=3, expand_animations=False)
+            image = tf.image.resize(image, image_size)
+            label = tf.one_hot(example['label'], num_classes)
+            return image, label
+
+        dataset = dataset.map(parse, num_parallel_calls=AUTOTUNE, deterministic=not shuffle)
+
+        if cache_file:
+            Path(cache_file).parent.mkdir(parents=True, exist_ok=True)
+            dataset = dataset.cache(str(cache_file))
+        if shuffle:
+            dataset = dataset.shuffle(shuffle_buffer, seed=seed)
+
+        return dataset.batch(batch_size).prefetch(AUTOTUNE)
+
+    except Exception as e:
+        logging.error(f"Error creating TFRecord dataset: {str(e)}")
+        raise
+
+
+def stratified_split(files, train_split=0.8, val_split=0.1, test_split=0.1, seed=42):
+    """
+    Split daftar (path, label) per kelas sebelum decode
+
+    Setiap kelas di-shuffle dengan seed yang sama lalu dibagi sesuai
+    proporsi, sehingga distribusi kelas di setiap split terjaga dan hasil
+    split deterministik.
+
+    Returns:
+        dict: {'train': [...], 'val': [...], 'test': [...]}
+    """
+    if abs(train_split + val_split + test_split - 1.0) > 1e-6:
+        raise ValueError("Split proportions must sum to 1.0")
+
+    by_class = {}
+    for path, label in files:
+        by_class.setdefault(label, []).append((path, label))
+
+    rng = random.Random(seed)
+    splits = {'train': [], 'val': [], 'test': []}
+    for label in sorted(by_class):
+        class_files = sorted(by_class[label])
+        rng.shuffle(class_files)
+
+        n = len(class_files)
+        n_val = int(round(val_split * n))
+        n_test = int(round(test_split * n))
+        n_train = n - n_val - n_test
+
+        splits['train'].extend(class_files[:n_train])
+        splits['val'].extend(class_files[n_train:n_train + n_val])
+        splits['test'].extend(class_files[n_train + n_val:])
+
+    for name in splits:
+        rng.shuffle(splits[name])
+
+    return splits
+
+
+def save_split_manifest(manifest_path, splits, class_names, seed, fractions=None):
+    """Simpan hasil split ke JSON agar bisa direproduksi persis"""
+    manifest = {
+        'seed': seed,
+        'class_names': class_names,
+        'fractions': fractions,
+        'splits': {name: [[path, label] for path, label in entries] for name, entries in splits.items()}
+    }
+    Path(manifest_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def load_split_manifest(manifest_path, expected=None):
+    """
+    Baca split dari manifest
+
+    Args:
+        expected: Dict opsional {seed, class_names, fractions}; ValueError jika
+            manifest dibuat dengan nilai berbeda (key bernilai None tidak dicek)
+    """
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    mismatches = [
+        f"{key}: manifest={manifest.get(key)!r}, requested={value!r}"
+        for key, value in (expected or {}).items()
+        if value is not None and key in manifest and manifest[key] is not None and manifest[key] != value
+    ]
+    if mismatches:
+        raise ValueError(f"Split manifest {manifest_path} was created with different arguments "
+                         f"({'; '.join(mismatches)}). Delete it or pass a different manifest_path.")
+
+    splits = {name: [(path, label) for path, label in entries] for name, entries in manifest['splits'].items()}
+    return splits, manifest['class_names']
+
+
+def create_dataset_from_files(files, num_classes, image_size=(224, 224), batch_size=32, shuffle=False,
+                              shuffle_buffer=1000, cache_file=None, seed=None):
+    """Pipeline tf.data independen dari daftar (path, label) dengan decode paralel"""
+    AUTOTUNE = tf.data.AUTOTUNE
+    paths = [path for path, _ in files]
+    labels = [label for _, label in files]
+
+    dataset = tf.data.Dataset.from_tensor_slices((paths, labels))
+    if shuffle:
+        # Shuffle path (murah) sebelum decode, bukan gambar hasil decode
+        dataset = dataset.shuffle(len(paths), seed=seed, reshuffle_each_iteration=True)
+
+    def load(path, label):
+        image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+        image = tf.image.resize(image, image_size)
+        return image, tf.one_hot(label, num_classes)
+
+    dataset = dataset.map(load, num_parallel_calls=AUTOTUNE, deterministic=not shuffle)
+    if cache_file:
+        Path(cache_file).parent.mkdir(parents=True, exist_ok=True)
+        dataset = dataset.cache(str(cache_file))
+
+    return dataset.batch(batch_size).prefetch(AUTOTUNE)
+
+
+def create_split_datasets(data_dir, image_size=(224, 224), batch_size=32, train_split=0.8, val_split=0.1,
+                          test_split=0.1, seed=42, manifest_path=None, class_names=None):
+    """
+    Train/val/test dataset dengan split stratified di level daftar file
+
+    Jika manifest_path sudah ada, split dibaca dari manifest (reproducible);
+    jika belum, split dibuat lalu disimpan ke manifest_path. ValueError jika
+    manifest dibuat dengan fraksi split, seed, atau class_names yang berbeda.
+
+    Returns:
+        train_dataset, val_dataset, test_dataset, class_names
+    """
+    try:
+        fractions = {'train': train_split, 'val': val_split, 'test': test_split}
+        if manifest_path and Path(manifest_path).exists():
+            expected = {'seed': seed, 'class_names': list(class_names) if class_names else None, 'fractions': fractions}
+            splits, class_names = load_split_manifest(manifest_path, expected)
+            logging.info(f"Split loaded from manifest: {manifest_path}")
+        else:
+            files, class_names = list_image_files(data_dir, class_names)
+            splits = stratified_split(files, train_split, val_split, test_split, seed)
+            if manifest_path:
+                save_split_manifest(manifest_path, splits, class_names, seed, fractions)
+                logging.info(f"Split manifest saved: {manifest_path}")
+
+        num_classes = len(class_names)
+        train_dataset = create_dataset_from_files(splits['train'], num_classes, image_size, batch_size,
+                                                  shuffle=True, seed=seed)
+        val_dataset = create_dataset_from_files(splits['val'], num_classes, image_size, batch_size)
+        test_dataset = create_dataset_from_files(splits['test'], num_classes, image_size, batch_size)
+
+        return train_dataset, val_dataset, test_dataset, class_names
+
+    except Exception as e:
+        logging.error(f"Error creating split datasets: {str(e)}")
+        raise
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Convert class-folder dataset to sharded TFRecords')
+    parser.add_argument('data_dir')
+    parser.add_argument('output_dir')
+    parser.add_argument('--num-shards', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(convert_directory_to_tfrecords(args.data_dir, args.output_dir, args.num_shards, seed=args.seed))
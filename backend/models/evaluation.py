@@ -0,0 +1,157 @@
+# Streaming Evaluation untuk CNNModel/RNNModel
+# Confusion matrix, metrics per kelas, kalibrasi, dan latency per batch
+
+import logging
+import time
+
+import numpy as np
+
+
+class StreamingEvaluator:
+    """
+    Akumulasi statistik evaluasi batch demi batch
+
+    Hanya menyimpan confusion matrix, histogram kalibrasi, dan latency
+    per batch, jadi memory tetap konstan berapapun ukuran validation set.
+    """
+
+    def __init__(self, class_names, num_bins=10):
+        self.class_names = list(class_names)
+        self.num_classes = len(self.class_names)
+        self.num_bins = num_bins
+        self.confusion = np.zeros((self.num_classes, self.num_classes), dtype=np.int64)
+        self.bin_counts = np.zeros(num_bins, dtype=np.int64)
+        self.bin_confidence = np.zeros(num_bins, dtype=np.float64)
+        self.bin_correct = np.zeros(num_bins, dtype=np.int64)
+        self.log_loss_sum = 0.0
+        self.num_samples = 0
+        self.batch_latencies_ms = []
+
+    def update(self, y_true, probabilities, latency_ms=None):
+        """
+        Tambahkan satu batch
+
+        Args:
+            y_true: Label one-hot (N, C) atau index kelas (N,)
+            probabilities: Output softmax model (N, C)
+            latency_ms: Latency forward pass batch ini (opsional)
+        """
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        y_true = np.asarray(y_true)
+        true_idx = y_true.argmax(axis=1) if y_true.ndim == 2 else y_true.astype(np.int64)
+        pred_idx = probabilities.argmax(axis=1)
+        confidence = probabilities.max(axis=1)
+
+        np.add.at(self.confusion, (true_idx, pred_idx), 1)
+
+        bins = np.minimum((confidence * self.num_bins).astype(np.int64), self.num_bins - 1)
+        self.bin_counts += np.bincount(bins, minlength=self.num_bins)
+        self.bin_confidence += np.bincount(bins, weights=confidence, minlength=self.num_bins)
+        self.bin_correct += np.bincount(bins, weights=(pred_idx == true_idx), minlength=self.num_bins).astype(np.int64)
+
+        true_prob = probabilities[np.arange(len(true_idx)), true_idx]
+        self.log_loss_sum += float(-np.log(np.clip(true_prob, 1e-12, 1.0)).sum())
+        self.num_samples += len(true_idx)
+
+        if latency_ms is not None:
+            self.batch_latencies_ms.append((latency_ms, len(true_idx)))
+
+    def per_class_metrics(self):
+        true_positive = np.diag(self.confusion).astype(np.float64)
+        predicted = self.confusion.sum(axis=0)
+        actual = self.confusion.sum(axis=1)
+
+        precision = np.divide(true_positive, predicted, out=np.zeros_like(true_positive), where=predicted > 0)
+        recall = np.divide(true_positive, actual, out=np.zeros_like(true_positive), where=actual > 0)
+        denominator = precision + recall
+        f1 = np.divide(2 * precision * recall, denominator, out=np.zeros_like(true_positive), where=denominator > 0)
+
+        return {
+            class_name: {
+                'precision': float(precision[i]),
+                'recall': float(recall[i]),
+                'f1': float(f1[i]),
+                'support': int(actual[i])
+            }
+            for i, class_name in enumerate(self.class_names)
+        }
+
+    def calibration(self):
+        """Reliability curve per confidence bin + expected calibration error (ECE)"""
+        curve = []
+        ece = 0.0
+        for i in range(self.num_bins):
+            count = int(self.bin_counts[i])
+            if count == 0:
+                continue
+            mean_confidence = self.bin_confidence[i] / count
+            accuracy = self.bin_correct[i] / count
+            ece += count / self.num_samples * abs(accuracy - mean_confidence)
+            curve.append({
+                'bin_start': i / self.num_bins,
+                'bin_end': (i + 1) / self.num_bins,
+                'mean_confidence': float(mean_confidence),
+                'accuracy': float(accuracy),
+                'count': count
+            })
+        return {'curve': curve, 'ece': float(ece)}
+
+    def latency(self):
+        if not self.batch_latencies_ms:
+            return None
+        latencies = np.array([latency for latency, _ in self.batch_latencies_ms])
+        sizes = np.array([size for _, size in self.batch_latencies_ms])
+        return {
+            'batches': len(latencies),
+            'mean_batch_ms': float(latencies.mean()),
+            'p50_batch_ms': float(np.percentile(latencies, 50)),
+            'p95_batch_ms': float(np.percentile(latencies, 95)),
+            'mean_per_sample_ms': float(latencies.sum() / sizes.sum())
+        }
+
+    def result(self):
+        per_class = self.per_class_metrics()
+        total = self.confusion.sum()
+        return {
+            'num_samples': int(self.num_samples),
+            'accuracy': float(np.trace(self.confusion) / total) if total else 0.0,
+            'log_loss': self.log_loss_sum / self.num_samples if self.num_samples else None,
+            'macro_f1': float(np.mean([m['f1'] for m in per_class.values()])),
+            'per_class': per_class,
+            'confusion_matrix': self.confusion.tolist(),
+            'calibration': self.calibration(),
+            'latency': self.latency()
+        }
+
+
+def _iterate_batches(data, labels=None, batch_size=32):
+    """Yield (x, y) batch dari tf.data dataset atau array NumPy"""
+    if labels is None:
+        for x, y in data:
+            yield x, np.asarray(y)
+        return
+
+    for start in range(0, len(data), batch_size):
+        yield data[start:start + batch_size], labels[start:start + batch_size]
+
+
+def evaluate_streaming(model, class_names, data, labels=None, batch_size=32, num_bins=10):
+    """
+    Evaluasi keras model batch demi batch tanpa menyimpan semua prediksi
+
+    Args:
+        model: keras.Model
+        data: tf.data.Dataset berisi (x, y) atau array fitur X
+        labels: Array label jika data berupa array
+    """
+    try:
+        evaluator = StreamingEvaluator(class_names, num_bins=num_bins)
+        for x, y in _iterate_batches(data, labels, batch_size):
+            start = time.perf_counter()
+            probabilities = np.asarray(model(x, training=False))
+            evaluator.update(y, probabilities, (time.perf_counter() - start) * 1000)
+        return evaluator.result()
+
+    except Exception as e:
+        logging.error(f"Error in streaming evaluation: {str(e)}")
+        raise
@@ -0,0 +1,306 @@
+# Hyperparameter Sweep Runner untuk CNNModel/RNNModel
+# Trial paralel di process pool, median early stopping, hasil di SQLite
+#
+# Contoh:
+#   python -m backend.models.hyperparam_sweep --model rnn --space space.json --trials 20 --workers 4
+#
+# Format search space (JSON):
+#   {
+#     "learning_rate": {"loguniform": [0.0001, 0.01]},
+#     "dense_units": [[64, 32], [128, 64]],
+#     "lstm_dropout": {"uniform": [0.1, 0.4]}
+#   }
+# List = pilihan diskrit; "uniform"/"loguniform"/"int" = range. Semua key selain
+# learning_rate diteruskan sebagai argumen build_model.
+
+import json
+import logging
+import math
+import multiprocessing
+import os
+import random
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from .runtime_config import configure_runtime
+
+logger = logging.getLogger(__name__)
+
+
+def sample_params(space, rng):
+    """Ambil satu konfigurasi acak dari search space"""
+    params = {}
+    for name, spec in space.items():
+        if isinstance(spec, list):
+            value = rng.choice(spec)
+            params[name] = tuple(value) if isinstance(value, list) else value
+        elif 'uniform' in spec:
+            params[name] = rng.uniform(*spec['uniform'])
+        elif 'loguniform' in spec:
+            low, high = spec['loguniform']
+            params[name] = math.exp(rng.uniform(math.log(low), math.log(high)))
+        elif 'int' in spec:
+            params[name] = rng.randint(*spec['int'])
+        else:
+            raise ValueError(f"Unknown search space spec for '{name}': {spec}")
+    return params
+
+
+class SweepStore:
+    """Penyimpanan trial dan nilai intermediate di SQLite (dipakai bersama oleh semua proses)"""
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS trials (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    sweep TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    best_value REAL,
+                    best_epoch INTEGER,
+                    duration REAL,
+                    error TEXT,
+                    created DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS intermediate (
+                    trial_id INTEGER NOT NULL,
+                    epoch INTEGER NOT NULL,
+                    value REAL NOT NULL,
+                    PRIMARY KEY (trial_id, epoch)
+                )
+            ''')
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def create_trial(self, sweep, params):
+        with self._connect() as conn:
+            cursor = conn.execute('INSERT INTO trials (sweep, params) VALUES (?, ?)', (sweep, json.dumps(params)))
+            return cursor.lastrowid
+
+    def update_trial(self, trial_id, **fields):
+        columns = ', '.join(f'{name} = ?' for name in fields)
+        with self._connect() as conn:
+            conn.execute(f'UPDATE trials SET {columns} WHERE id = ?', (*fields.values(), trial_id))
+
+    def report(self, trial_id, epoch, value):
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO intermediate (trial_id, epoch, value) VALUES (?, ?, ?)',
+                         (trial_id, epoch, value))
+
+    def peer_values(self, sweep, trial_id, epoch):
+        """Nilai trial lain di sweep yang sama pada epoch yang sama"""
+        with self._connect() as conn:
+            rows = conn.execute('''
+                SELECT i.value FROM intermediate i JOIN trials t ON t.id = i.trial_id
+                WHERE t.sweep = ? AND i.epoch = ? AND i.trial_id != ?
+            ''', (sweep, epoch, trial_id)).fetchall()
+        return [row[0] for row in rows]
+
+    def best_trial(self, sweep):
+        with self._connect() as conn:
+            row = conn.execute('''
+                SELECT id, params, best_value, best_epoch FROM trials
+                WHERE sweep = ? AND best_value IS NOT NULL
+                ORDER BY best_value ASC LIMIT 1
+            ''', (sweep,)).fetchone()
+        if row is None:
+            return None
+        return {'trial_id': row[0], 'params': json.loads(row[1]), 'best_value': row[2], 'best_epoch': row[3]}
+
+
+def _median(values):
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def _load_data(config):
+    """Load data training sesuai tipe model (di dalam proses worker)"""
+    if config['model'] == 'cnn':
+        from .dataset_pipeline import create_split_datasets
+        train, val, _, _ = create_split_datasets(
+            config['data'], batch_size=config.get('batch_size', 32),
+            manifest_path=config['split_manifest'], seed=config['seed']
+        )
+        return {'x': train, 'validation_data': val}
+
+    import numpy as np
+    if config.get('data'):
+        with np.load(config['data']) as data:
+            return {'x': data['X_train'], 'y': data['y_train'],
+                    'validation_data': (data['X_val'], data['y_val']), 'batch_size': config.get('batch_size', 32)}
+
+    from .rnn_model import RNNModel, create_mock_temporal_data
+    X, y = RNNModel().prepare_sequence_data(create_mock_temporal_data())
+    rng = np.random.default_rng(config['seed'])
+    order = rng.permutation(len(X))
+    split = int(len(X) * 0.8)
+    train_idx, val_idx = order[:split], order[split:]
+    return {'x': X[train_idx], 'y': y[train_idx],
+            'validation_data': (X[val_idx], y[val_idx]), 'batch_size': config.get('batch_size', 32)}
+
+
+def run_trial(config):
+    """
+    Jalankan satu trial (entry point proses worker)
+
+    Thread budget diterapkan sebelum TensorFlow di-import agar trial
+    paralel tidak saling berebut core.
+    """
+    configure_runtime({
+        'intra_op_threads': config['threads'],
+        'inter_op_threads': 1,
+        'omp_threads': config['threads']
+    })
+
+    from tensorflow import keras
+
+    store = SweepStore(config['db_path'])
+    trial_id, params = config['trial_id'], dict(config['params'])
+    store.update_trial(trial_id, status='running')
+    start = time.time()
+
+    class MedianStopping(keras.callbacks.Callback):
+        """Hentikan trial jika val_loss lebih buruk dari median trial lain di epoch yang sama"""
+
+        def __init__(self):
+            super().__init__()
+            self.pruned = False
+            self.best = (float('inf'), None)
+
+        def on_epoch_end(self, epoch, logs=None):
+            value = float((logs or {}).get('val_loss', float('inf')))
+            store.report(trial_id, epoch, value)
+            if value < self.best[0]:
+                self.best = (value, epoch)
+            store.update_trial(trial_id, best_value=self.best[0], best_epoch=self.best[1])
+
+            if epoch < config['grace_epochs']:
+                return
+            peers = store.peer_values(config['sweep'], trial_id, epoch)
+            if len(peers) >= config['min_peers'] and value > _median(peers):
+                self.pruned = True
+                self.model.stop_training = True
+
+    try:
+        learning_rate = params.pop('learning_rate', 0.001)
+        build_kwargs = {key: tuple(value) if isinstance(value, list) else value for key, value in params.items()}
+
+        if config['model'] == 'cnn':
+            from .cnn_model import CNNModel
+            model = CNNModel()
+        else:
+            from .rnn_model import RNNModel
+            model = RNNModel()
+        model.build_model(**build_kwargs)
+        model.compile_model(learning_rate=learning_rate)
+
+        data = _load_data(config)
+        stopper = MedianStopping()
+        model.model.fit(
+            epochs=config['epochs'],
+            callbacks=[stopper, keras.callbacks.EarlyStopping(monitor='val_loss', patience=config['patience'])],
+            verbose=0,
+            **data
+        )
+
+        status = 'pruned' if stopper.pruned else 'completed'
+        store.update_trial(trial_id, status=status, duration=time.time() - start)
+        return {'trial_id': trial_id, 'status': status, 'best_value': stopper.best[0]}
+
+    except Exception as e:
+        store.update_trial(trial_id, status='failed', error=str(e), duration=time.time() - start)
+        return {'trial_id': trial_id, 'status': 'failed', 'error': str(e)}
+
+
+def run_sweep(model, space, n_trials=10, workers=2, threads_per_trial=None, epochs=30, data=None,
+              db_path='sweeps.db', sweep_name=None, seed=42, grace_epochs=3, min_peers=2, patience=5):
+    """
+    Jalankan sweep hyperparameter secara paralel
+
+    Returns:
+        dict: Trial terbaik (params, best val_loss, epoch)
+    """
+    sweep_name = sweep_name or f'{model}-{int(time.time())}'
+    threads_per_trial = threads_per_trial or max(1, (os.cpu_count() or 1) // workers)
+    store = SweepStore(db_path)
+    rng = random.Random(seed)
+
+    # Split CNN dibuat sekali agar semua trial memakai data yang sama
+    split_manifest = None
+    if model == 'cnn':
+        from .dataset_pipeline import list_image_files, save_split_manifest, stratified_split
+        split_manifest = f"{Path(db_path).with_suffix('')}-{sweep_name}-split.json"
+        files, class_names = list_image_files(data)
+        fractions = {'train': 0.8, 'val': 0.1, 'test': 0.1}
+        splits = stratified_split(files, fractions['train'], fractions['val'], fractions['test'], seed=seed)
+        save_split_manifest(split_manifest, splits, class_names, seed, fractions)
+
+    configs = []
+    for _ in range(n_trials):
+        params = sample_params(space, rng)
+        configs.append({
+            'trial_id': store.create_trial(sweep_name, params),
+            'params': params,
+            'model': model,
+            'data': data,
+            'db_path': db_path,
+            'sweep': sweep_name,
+            'threads': threads_per_trial,
+            'epochs': epochs,
+            'seed': seed,
+            'grace_epochs': grace_epochs,
+            'min_peers': min_peers,
+            'patience': patience,
+            'split_manifest': split_manifest
+        })
+
+    logger.info(f"Sweep {sweep_name}: {n_trials} trials, {workers} workers x {threads_per_trial} threads")
+
+    # spawn: setiap worker memulai runtime TensorFlow sendiri
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = [executor.submit(run_trial, config) for config in configs]
+        for future in as_completed(futures):
+            result = future.result()
+            logger.info(f"Trial {result['trial_id']} {result['status']}: {result.get('best_value', result.get('error'))}")
+
+    best = store.best_trial(sweep_name)
+    logger.info(f"Best trial for {sweep_name}: {best}")
+    return best
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Parallel hyperparameter sweep for CNNModel/RNNModel')
+    parser.add_argument('--model', choices=['cnn', 'rnn'], required=True)
+    parser.add_argument('--space', required=True, help='Search space JSON file')
+    parser.add_argument('--data', help='CNN: dataset directory; RNN: .npz dengan X_train/y_train/X_val/y_val')
+    parser.add_argument('--trials', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads-per-trial', type=int)
+    parser.add_argument('--epochs', type=int, default=30)
+    parser.add_argument('--db', default='sweeps.db')
+    parser.add_argument('--name')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    with open(args.space) as f:
+        search_space = json.load(f)
+
+    best_trial = run_sweep(
+        args.model, search_space, n_trials=args.trials, workers=args.workers,
+        threads_per_trial=args.threads_per_trial, epochs=args.epochs, data=args.data,
+        db_path=args.db, sweep_name=args.name, seed=args.seed
+    )
+    print(json.dumps(best_trial, indent=2))
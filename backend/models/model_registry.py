@@ -0,0 +1,228 @@
+# Model Registry untuk hot-swap model tanpa downtime
+# Artefak model versioned + manifest, loader background, swap atomik
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+MANIFEST_NAME = 'manifest.json'
+
+
+class ModelRegistry:
+    """
+    Direktori artefak model versioned
+
+    Struktur:
+    registry_dir/
+    ├── manifest.json        # {"active": "v2", "versions": {"v1": {...}, "v2": {...}}}
+    ├── v1/model.h5
+    └── v2/model.h5
+    """
+
+    def __init__(self, registry_dir):
+        self.registry_dir = Path(registry_dir)
+        self.manifest_path = self.registry_dir / MANIFEST_NAME
+        self.logger = logging.getLogger(__name__)
+
+    def read_manifest(self):
+        if not self.manifest_path.exists():
+            return {'active': None, 'versions': {}}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def write_manifest(self, manifest):
+        """Tulis manifest secara atomik (tmp file + rename)"""
+        self.registry_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def manifest_mtime(self):
+        return self.manifest_path.stat().st_mtime if self.manifest_path.exists() else None
+
+    def list_versions(self):
+        return self.read_manifest().get('versions', {})
+
+    def active_version(self):
+        return self.read_manifest().get('active')
+
+    def artifact_path(self, version):
+        versions = self.list_versions()
+        if version not in versions:
+            raise ValueError(f"Model version '{version}' not found in registry")
+        return self.registry_dir / versions[version].get('path', f'{version}/model.h5')
+
+    def register(self, version, model_file, metadata=None, activate=False):
+        """Daftarkan artefak model (path relatif terhadap registry_dir) sebagai versi baru"""
+        manifest = self.read_manifest()
+        manifest.setdefault('versions', {})[version] = {
+            'path': str(model_file),
+            'created': datetime.now().isoformat(),
+            **(metadata or {})
+        }
+        if activate:
+            manifest['active'] = version
+        self.write_manifest(manifest)
+        self.logger.info(f"Model version registered: {version}")
+
+    def set_active(self, version):
+        manifest = self.read_manifest()
+        if version not in manifest.get('versions', {}):
+            raise ValueError(f"Model version '{version}' not found in registry")
+        manifest['active'] = version
+        self.write_manifest(manifest)
+
+
+class ModelHandle:
+    """Model yang sudah di-load + versinya (immutable setelah dibuat)"""
+
+    def __init__(self, version, model, warmup_runs=0, warmup_ms=None):
+        self.version = version
+        self.model = model
+        self.loaded_at = datetime.now().isoformat()
+        self.warmup_runs = warmup_runs
+        self.warmup_ms = warmup_ms
+
+    @property
+    def warm(self):
+        """True jika prediksi warmup benar-benar sudah dijalankan"""
+        return self.warmup_runs > 0
+
+
+class ModelManager:
+    """
+    Kelola model aktif dengan hot-swap
+
+    Request mengambil `handle = manager.current` sekali di awal dan memakai
+    handle itu sampai selesai, jadi request yang sedang berjalan tetap di
+    versi lama ketika swap terjadi. Swap hanya mengganti satu referensi.
+    """
+
+    def __init__(self, registry, model_factory=None, warmup_runs=2):
+        self.registry = registry
+        self.model_factory = model_factory or self._default_factory
+        self.warmup_runs = warmup_runs
+        self.current = None
+        self.loading_version = None
+        self.last_error = None
+        self.logger = logging.getLogger(__name__)
+        self._load_lock = threading.Lock()
+        self._watcher = None
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def _default_factory():
+        from . import create_model
+        return create_model('cnn')
+
+    def load_version(self, version):
+        """Load, warmup, lalu swap model versi tertentu (blocking)"""
+        with self._load_lock:
+            if self.current is not None and self.current.version == version:
+                return self.current
+
+            self.loading_version = version
+            try:
+                start = time.perf_counter()
+                model = self.model_factory()
+                model.load_model(str(self.registry.artifact_path(version)))
+                warmup_start = time.perf_counter()
+                warmup_runs = self._warmup(model)
+                warmup_ms = (time.perf_counter() - warmup_start) * 1000
+
+                self.current = ModelHandle(version, model, warmup_runs=warmup_runs, warmup_ms=warmup_ms)
+                self.last_error = None
+                self.logger.info(f"Model swapped to version {version} ({time.perf_counter() - start:.1f}s)")
+                return self.current
+
+            except Exception as e:
+                self.last_error = str(e)
+                self.logger.error(f"Error loading model version {version}: {str(e)}")
+                raise
+            finally:
+                self.loading_version = None
+
+    def load_version_async(self, version):
+        """Load versi baru di background thread; model lama tetap melayani request"""
+        thread = threading.Thread(target=self._safe_load, args=(version,), daemon=True)
+        thread.start()
+        return thread
+
+    def _safe_load(self, version):
+        try:
+            self.load_version(version)
+        except Exception:
+            pass  # Sudah di-log; model lama tetap aktif
+
+    def _warmup(self, model):
+        """
+        Jalankan beberapa prediksi dummy agar graph/kernels siap sebelum swap
+
+        Model dengan method warmup() (mis. InferenceCascade) me-warmup stage
+        yang mahal secara langsung dan mengembalikan apakah stage itu berjalan.
+
+        Returns:
+            int: Jumlah run warmup yang benar-benar menjalankan model utama
+        """
+        dummy = np.zeros((1, *model.input_shape), dtype=np.float32)
+        warmup = getattr(model, 'warmup', None)
+        runs = 0
+        for _ in range(self.warmup_runs):
+            if warmup is not None:
+                runs += int(bool(warmup(dummy)))
+            else:
+                model.predict(dummy)
+                runs += 1
+        return runs
+
+    def load_active(self, background=False):
+        version = self.registry.active_version()
+        if version is None:
+            self.logger.warning("No active model version in registry")
+            return None
+        if background:
+            return self.load_version_async(version)
+        return self.load_version(version)
+
+    def start_watcher(self, interval=5.0):
+        """Poll manifest; jika versi aktif berubah, load versi baru di background"""
+        if self._watcher is not None:
+            return
+
+        def watch():
+            last_mtime = self.registry.manifest_mtime()
+            while not self._stop_event.wait(interval):
+                mtime = self.registry.manifest_mtime()
+                if mtime == last_mtime:
+                    continue
+                last_mtime = mtime
+                try:
+                    version = self.registry.active_version()
+                except Exception as e:
+                    self.logger.warning(f"Could not read model manifest: {e}")
+                    continue
+                if version and (self.current is None or self.current.version != version):
+                    self._safe_load(version)
+
+        self._watcher = threading.Thread(target=watch, daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop_event.set()
+
+    def status(self):
+        return {
+            'active_version': self.current.version if self.current else None,
+            'loaded_at': self.current.loaded_at if self.current else None,
+            'warm': self.current.warm if self.current else False,
+            'warmup_ms': round(self.current.warmup_ms, 1) if self.current else None,
+            'loading_version': self.loading_version,
+            'last_error': self.last_error
+        }
@@ -0,0 +1,235 @@
+# NumPy LSTM Inference untuk RNNModel
+# Serving model temporal tanpa import TensorFlow
+#
+# Export (di environment training, butuh TF):
+#   rnn_model.export_numpy('models/rnn_weights.npz')
+# Serving (hanya NumPy):
+#   model = NumpyLSTMModel.load('models/rnn_weights.npz')
+#   probabilities = model.predict(X)  # X: (N, sequence_length, num_features)
+
+import json
+import logging
+
+import numpy as np
+
+from .trend_analysis import analyze_trends_batch
+
+SUPPORTED_ACTIVATIONS = ('linear', 'relu', 'softmax', 'sigmoid', 'tanh')
+
+
+def _sigmoid(x):
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)  # stabil untuk x besar, tanpa overflow exp
+
+
+def _activation(name, x):
+    if name == 'relu':
+        return np.maximum(x, 0.0)
+    if name == 'softmax':
+        exp = np.exp(x - x.max(axis=-1, keepdims=True))
+        return exp / exp.sum(axis=-1, keepdims=True)
+    if name == 'sigmoid':
+        return _sigmoid(x)
+    if name == 'tanh':
+        return np.tanh(x)
+    return x
+
+
+def export_rnn_weights(keras_model, filepath, class_names=None, feature_names=None):
+    """
+    Export bobot model Sequential (LSTM, Dense, BatchNormalization) ke .npz
+
+    Dropout dan InputLayer dilewati (identity saat inferensi). BatchNorm
+    di-fold menjadi scale/shift sehingga forward pass hanya perlu satu
+    multiply-add per layer.
+
+    Returns:
+        list: Spesifikasi layer yang diexport
+    """
+    try:
+        specs = []
+        arrays = {}
+        for layer in keras_model.layers:
+            kind = type(layer).__name__
+            config = layer.get_config()
+            prefix = f'layer{len(specs)}'
+
+            if kind == 'LSTM':
+                if config.get('activation') != 'tanh' or config.get('recurrent_activation') != 'sigmoid':
+                    raise ValueError(f"Unsupported LSTM activations in layer {layer.name}")
+                kernel, recurrent_kernel, bias = layer.get_weights()
+                arrays[f'{prefix}_kernel'] = kernel
+                arrays[f'{prefix}_recurrent_kernel'] = recurrent_kernel
+                arrays[f'{prefix}_bias'] = bias
+                specs.append({'type': 'lstm', 'units': int(config['units']),
+                              'return_sequences': bool(config['return_sequences'])})
+            elif kind == 'Dense':
+                activation = config.get('activation', 'linear')
+                if activation not in SUPPORTED_ACTIVATIONS:
+                    raise ValueError(f"Unsupported Dense activation '{activation}' in layer {layer.name}")
+                kernel, bias = layer.get_weights()
+                arrays[f'{prefix}_kernel'] = kernel
+                arrays[f'{prefix}_bias'] = bias
+                specs.append({'type': 'dense', 'activation': activation})
+            elif kind == 'BatchNormalization':
+                gamma, beta, moving_mean, moving_variance = layer.get_weights()
+                scale = gamma / np.sqrt(moving_variance + config['epsilon'])
+                arrays[f'{prefix}_scale'] = scale
+                arrays[f'{prefix}_shift'] = beta - moving_mean * scale
+                specs.append({'type': 'batchnorm'})
+            elif kind in ('Dropout', 'InputLayer'):
+                continue
+            else:
+                raise ValueError(f"Unsupported layer type for NumPy export: {kind}")
+
+        metadata = {
+            'layers': specs,
+            'input_shape': list(keras_model.input_shape[1:]),
+            'class_names': list(class_names or []),
+            'feature_names': list(feature_names or [])
+        }
+        np.savez(filepath, metadata=np.array(json.dumps(metadata)),
+                 **{name: np.asarray(value, dtype=np.float32) for name, value in arrays.items()})
+
+        logging.info(f"Exported {len(specs)} layers to {filepath}")
+        return specs
+
+    except Exception as e:
+        logging.error(f"Error exporting RNN weights: {str(e)}")
+        raise
+
+
+class NumpyLSTMModel:
+    """
+    Forward pass RNNModel.build_model dengan NumPy
+
+    Input proyeksi x @ W untuk seluruh timestep dihitung dalam satu matmul
+    per layer; loop waktu hanya untuk h @ U (sequence_length = 7 step).
+    """
+
+    def __init__(self, layers, weights, input_shape, class_names=None, feature_names=None):
+        self.layers = layers
+        self.weights = weights
+        self.input_shape = tuple(input_shape)
+        self.class_names = list(class_names or [])
+        self.feature_names = list(feature_names or [])
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def load(cls, filepath):
+        with np.load(filepath) as data:
+            metadata = json.loads(str(data['metadata']))
+            weights = {name: data[name] for name in data.files if name != 'metadata'}
+        return cls(metadata['layers'], weights, metadata['input_shape'],
+                   metadata.get('class_names'), metadata.get('feature_names'))
+
+    def _lstm(self, prefix, x, units, return_sequences):
+        kernel = self.weights[f'{prefix}_kernel']
+        recurrent_kernel = self.weights[f'{prefix}_recurrent_kernel']
+        batch, timesteps, _ = x.shape
+
+        # Gate order Keras: input, forget, cell, output
+        projected = x @ kernel + self.weights[f'{prefix}_bias']
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        outputs = np.empty((batch, timesteps, units), dtype=np.float32) if return_sequences else None
+
+        for t in range(timesteps):
+            z = projected[:, t] + h @ recurrent_kernel
+            i = _sigmoid(z[:, :units])
+            f = _sigmoid(z[:, units:2 * units])
+            c = f * c + i * np.tanh(z[:, 2 * units:3 * units])
+            h = _sigmoid(z[:, 3 * units:]) * np.tanh(c)
+            if return_sequences:
+                outputs[:, t] = h
+
+        return outputs if return_sequences else h
+
+    def _forward(self, x):
+        for index, spec in enumerate(self.layers):
+            prefix = f'layer{index}'
+            if spec['type'] == 'lstm':
+                x = self._lstm(prefix, x, spec['units'], spec['return_sequences'])
+            elif spec['type'] == 'dense':
+                x = _activation(spec['activation'], x @ self.weights[f'{prefix}_kernel'] + self.weights[f'{prefix}_bias'])
+            elif spec['type'] == 'batchnorm':
+                x = x * self.weights[f'{prefix}_scale'] + self.weights[f'{prefix}_shift']
+        return x
+
+    def predict(self, sequences, batch_size=1024):
+        """
+        Probabilitas kelas untuk batch sequence
+
+        Args:
+            sequences: Array (N, sequence_length, num_features) atau satu sequence 2D
+
+        Returns:
+            np.ndarray: (N, num_classes)
+        """
+        try:
+            sequences = np.asarray(sequences, dtype=np.float32)
+            if sequences.ndim == 2:
+                sequences = np.expand_dims(sequences, axis=0)
+            if sequences.shape[1:] != self.input_shape:
+                raise ValueError(f"Expected input shape (N, {self.input_shape[0]}, {self.input_shape[1]}), "
+                                 f"got {sequences.shape}")
+
+            if len(sequences) <= batch_size:
+                return self._forward(sequences)
+            return np.concatenate([
+                self._forward(sequences[start:start + batch_size])
+                for start in range(0, len(sequences), batch_size)
+            ])
+
+        except Exception as e:
+            self.logger.error(f"Error in NumPy LSTM prediction: {str(e)}")
+            raise
+
+    def predict_sequence(self, sequence_data):
+        """Prediksi satu sequence dengan format dict yang sama dengan RNNModel.predict_sequence"""
+        return self.predict_sequences(sequence_data)[0]
+
+    def predict_sequences(self, sequences):
+        """
+        Prediksi + trend_analysis untuk batch sequence (satu forward pass)
+
+        Returns:
+            list: Satu dict per sequence (predicted_class, confidence, all_probabilities, trend_analysis)
+        """
+        sequences = np.asarray(sequences, dtype=np.float32)
+        if sequences.ndim == 2:
+            sequences = np.expand_dims(sequences, axis=0)
+
+        probabilities = self.predict(sequences)
+        feature_names = self.feature_names or [f'feature_{i}' for i in range(self.input_shape[1])]
+        trends = analyze_trends_batch(sequences, feature_names)
+
+        results = []
+        for class_probabilities, trend in zip(probabilities, trends):
+            predicted_class_idx = int(np.argmax(class_probabilities))
+            results.append({
+                'predicted_class': self.class_names[predicted_class_idx],
+                'confidence': float(class_probabilities[predicted_class_idx]) * 100,
+                'all_probabilities': {
+                    class_name: float(prob) * 100
+                    for class_name, prob in zip(self.class_names, class_probabilities)
+                },
+                'trend_analysis': trend
+            })
+        return results
+
+
+def verify_export(keras_model, numpy_model, sequences, atol=1e-4):
+    """
+    Bandingkan prediksi Keras vs NumPy
+
+    Returns:
+        dict: max_abs_diff, argmax_agreement, within_tolerance
+    """
+    expected = np.asarray(keras_model(np.asarray(sequences, dtype=np.float32), training=False))
+    actual = numpy_model.predict(sequences)
+    max_abs_diff = float(np.abs(expected - actual).max()) if len(expected) else 0.0
+    return {
+        'max_abs_diff': max_abs_diff,
+        'argmax_agreement': float(np.mean(expected.argmax(axis=1) == actual.argmax(axis=1))) if len(expected) else 1.0,
+        'within_tolerance': max_abs_diff <= atol
+    }
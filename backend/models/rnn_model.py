@@ -8,13 +8,20 @@ import numpy as np
 import logging
 from datetime import datetime, timedelta
 
+from .runtime_config import configure_runtime
+from .training_callbacks import FullStateCheckpoint, ThroughputLogger, dataset_batch_size
+from .evaluation import evaluate_streaming
+from .trend_analysis import analyze_trends_batch
+
 class RNNModel:
     """
     Recurrent Neural Network untuk analisis temporal penyakit bawang merah
     Digunakan untuk memprediksi perkembangan penyakit berdasarkan riwayat
     """
     
-    def __init__(self, sequence_length=7, num_features=10, num_classes=5):
+    def __init__(self, sequence_length=7, num_features=10, num_classes=5, runtime_config=None):
+        # Threading/affinity harus diterapkan sebelum runtime TF dimulai
+        self.runtime_config = configure_runtime(runtime_config)
         self.sequence_length = sequence_length  # 7 hari riwayat
         self.num_features = num_features        # Features per hari
         self.num_classes = num_classes          # Jumlah kelas penyakit
@@ -43,10 +50,17 @@ class RNNModel:
             'anthracnose'
         ]
     
-    def build_model(self):
+    def build_model(self, lstm_units=(128, 64, 32), dense_units=(64, 32), lstm_dropout=0.2,
+                    dropout_rates=(0.3, 0.2)):
         """
         Build RNN architecture untuk analisis temporal
         Menggunakan LSTM untuk menangkap long-term dependencies
+        
+        Args:
+            lstm_units: Jumlah unit tiga LSTM layer
+            dense_units: Lebar dua Dense layer
+            lstm_dropout: Dropout input di setiap LSTM layer
+            dropout_rates: Dropout setelah Dense pertama dan kedua
         """
         try:
             model = keras.Sequential([
@@ -54,16 +68,16 @@ class RNNModel:
                 keras.Input(shape=(self.sequence_length, self.num_features)),
                 
                 # LSTM layers
-                layers.LSTM(128, return_sequences=True, dropout=0.2),
-                layers.LSTM(64, return_sequences=True, dropout=0.2),
-                layers.LSTM(32, dropout=0.2),
+                layers.LSTM(lstm_units[0], return_sequences=True, dropout=lstm_dropout),
+                layers.LSTM(lstm_units[1], return_sequences=True, dropout=lstm_dropout),
+                layers.LSTM(lstm_units[2], dropout=lstm_dropout),
                 
                 # Dense layers
-                layers.Dense(64, activation='relu'),
+                layers.Dense(dense_units[0], activation='relu'),
                 layers.BatchNormalization(),
-                layers.Dropout(0.3),
-                layers.Dense(32, activation='relu'),
-                layers.Dropout(0.2),
+                layers.Dropout(dropout_rates[0]),
+                layers.Dense(dense_units[1], activation='relu'),
+                layers.Dropout(dropout_rates[1]),
                 
                 # Output layer
                 layers.Dense(self.num_classes, activation='softmax')
@@ -144,6 +158,12 @@ class RNNModel:
         """
         Prepare data untuk sequence learning
         
+        Implementasi vectorized: satu kali sort (plant, date), batas grup
+        dihitung sekali, dan window diambil dari strided view
+        (sliding_window_view) langsung ke satu array yang sudah dialokasikan.
+        Urutan output sama dengan iterasi per plant (urutan kemunculan
+        plant_id) lalu per tanggal.
+        
         Args:
             data: DataFrame dengan kolom temporal
             target_column: Nama kolom target
@@ -152,24 +172,33 @@ class RNNModel:
             X, y: Sequence data dan labels
         """
         try:
-            sequences = []
-            labels = []
+            import pandas as pd
             
-            # Group by plant/field ID
-            for plant_id in data['plant_id'].unique():
-                plant_data = data[data['plant_id'] == plant_id].sort_values('date')
-                
-                # Create sequences
-                for i in range(len(plant_data) - self.sequence_length + 1):
-                    # Feature sequence
-                    sequence = plant_data[self.feature_names].iloc[i:i+self.sequence_length].values
-                    sequences.append(sequence)
-                    
-                    # Label (last day of sequence)
-                    label = plant_data[target_column].iloc[i+self.sequence_length-1]
-                    labels.append(label)
-            
-            X = np.array(sequences)
+            seq_len = self.sequence_length
+            
+            # Kode plant mengikuti urutan kemunculan (sama seperti .unique())
+            plant_codes = pd.factorize(data['plant_id'])[0]
+            order = np.lexsort((data['date'].to_numpy(), plant_codes))
+            
+            features = data[self.feature_names].to_numpy()[order]
+            targets = data[target_column].to_numpy()[order]
+            sorted_codes = plant_codes[order]
+            
+            # Batas akhir grup untuk setiap baris
+            counts = np.bincount(sorted_codes)
+            group_ends = np.repeat(np.cumsum(counts), counts)
+            
+            # Window valid jika seluruh window berada di grup yang sama
+            window_starts = np.nonzero(group_ends - np.arange(len(features)) >= seq_len)[0]
+            
+            X = np.empty((len(window_starts), seq_len, features.shape[1]), dtype=features.dtype)
+            if len(window_starts):
+                # View (num_windows, seq_len, num_features) tanpa copy
+                windows = np.lib.stride_tricks.sliding_window_view(features, seq_len, axis=0).transpose(0, 2, 1)
+                np.take(windows, window_starts, axis=0, out=X)
+            
+            # Label = hari terakhir dari setiap window
+            labels = targets[window_starts + seq_len - 1]
             y = keras.utils.to_categorical(labels, num_classes=self.num_classes)
             
             return X, y
@@ -178,14 +207,19 @@ class RNNModel:
             self.logger.error(f"Error preparing sequence data: {str(e)}")
             raise
     
-    def train(self, X_train, y_train, X_val, y_val, epochs=100):
+    def train(self, X_train, y_train, X_val, y_val, epochs=100, resume=False, checkpoint_dir='checkpoints/rnn',
+              training_log='rnn_training_log.jsonl', batch_size=32):
         """
         Train RNN model
         
         Args:
-            X_train, y_train: Training data
-            X_val, y_val: Validation data
+            X_train, y_train: Training data (y_train None jika X_train berupa tf.data.Dataset)
+            X_val, y_val: Validation data (y_val None jika X_val berupa tf.data.Dataset)
             epochs: Number of training epochs
+            resume: Lanjutkan dari checkpoint full-state terakhir di checkpoint_dir
+            checkpoint_dir: Direktori checkpoint (bobot, optimizer, epoch, LR)
+            training_log: File JSON-lines untuk throughput dan step-time
+            batch_size: Ukuran batch (untuk dataset diabaikan; throughput log memakai batch dataset)
         """
         try:
             if self.model is None:
@@ -211,12 +245,19 @@ class RNNModel:
                 )
             ]
             
+            # Instrumentasi + checkpoint yang bisa di-resume
+            state_checkpoint = FullStateCheckpoint(checkpoint_dir, tracked_callbacks=list(callbacks))
+            logged_batch_size = batch_size if y_train is not None else dataset_batch_size(X_train)
+            callbacks += [ThroughputLogger(training_log, batch_size=logged_batch_size), state_checkpoint]
+            initial_epoch = state_checkpoint.restore(self.model) if resume else 0
+            
             # Training
             history = self.model.fit(
                 X_train, y_train,
-                validation_data=(X_val, y_val),
+                validation_data=X_val if y_val is None else (X_val, y_val),
                 epochs=epochs,
-                batch_size=32,
+                initial_epoch=initial_epoch,
+                batch_size=None if y_train is None else batch_size,
                 callbacks=callbacks,
                 verbose=1
             )
@@ -227,6 +268,30 @@ class RNNModel:
         except Exception as e:
             self.logger.error(f"Error training RNN model: {str(e)}")
             raise
+
+    def train_from_memmap(self, data_dir, val_fraction=0.2, batch_size=32, seed=42, split_by='series', **train_kwargs):
+        """
+        Train dari dataset memmap (lihat sequence_dataset.build_sequence_memmap)
+
+        Window dibaca per batch dari disk, jadi ukuran data tidak dibatasi RAM.
+        split_by: 'series' (per plant) atau 'time' (lihat SequenceMemmapDataset.split)
+        """
+        from .sequence_dataset import SequenceMemmapDataset
+
+        dataset = SequenceMemmapDataset(data_dir, num_classes=self.num_classes)
+        if dataset.sequence_length != self.sequence_length or dataset.num_features != self.num_features:
+            raise ValueError(
+                f"Memmap dataset shape ({dataset.sequence_length}, {dataset.num_features}) does not match "
+                f"model ({self.sequence_length}, {self.num_features})"
+            )
+
+        train_set, val_set = dataset.split(val_fraction=val_fraction, seed=seed, by=split_by)
+        self.logger.info(f"Training from memmap: {len(train_set)} train / {len(val_set)} val windows")
+        return self.train(
+            train_set.to_tf_dataset(batch_size, shuffle=True, seed=seed), None,
+            val_set.to_tf_dataset(batch_size, shuffle=False), None,
+            batch_size=batch_size, **train_kwargs
+        )
     
     def predict_sequence(self, sequence_data):
         """
@@ -273,34 +338,34 @@ class RNNModel:
     def _analyze_trend(self, sequence_data):
         """Analyze trend dari sequence data"""
         try:
-            trends = {}
-            
-            for i, feature_name in enumerate(self.feature_names):
-                feature_values = sequence_data[:, i]
-                
-                # Calculate trend
-                if len(feature_values) > 1:
-                    trend = np.polyfit(range(len(feature_values)), feature_values, 1)[0]
-                    trends[feature_name] = {
-                        'slope': float(trend),
-                        'direction': 'increasing' if trend > 0 else 'decreasing' if trend < 0 else 'stable',
-                        'current_value': float(feature_values[-1]),
-                        'change_rate': float(trend * len(feature_values))
-                    }
-            
-            return trends
+            if len(sequence_data) < 2:
+                return {}
+            return self.analyze_trends_batch(np.expand_dims(sequence_data, axis=0))[0]
             
         except Exception as e:
             self.logger.error(f"Error analyzing trend: {str(e)}")
             return {}
     
-    def predict_future(self, sequence_data, days_ahead=3):
+    def analyze_trends_batch(self, sequences):
+        """
+        Analisis trend untuk banyak sequence sekaligus
+        
+        Args:
+            sequences: Array (N, T, F)
+            
+        Returns:
+            list: Satu dict trend per sequence (struktur sama dengan _analyze_trend)
+        """
+        return analyze_trends_batch(sequences, self.feature_names)
+    
+    def predict_future(self, sequence_data, days_ahead=3, seed=None):
         """
         Predict kondisi penyakit beberapa hari ke depan
         
         Args:
             sequence_data: Historical sequence data
             days_ahead: Jumlah hari yang ingin diprediksi
+            seed: Seed untuk variasi cuaca simulasi (reproducible)
             
         Returns:
             list: Predictions untuk setiap hari
@@ -309,34 +374,26 @@ class RNNModel:
             if self.model is None:
                 raise ValueError("Model not loaded")
             
-            predictions = []
-            current_sequence = sequence_data.copy()
+            rollout = self.predict_future_batch(np.expand_dims(sequence_data, axis=0), days_ahead,
+                                                seed=seed, return_windows=True)
             
+            predictions = []
             for day in range(days_ahead):
-                # Predict next day
-                pred = self.predict_sequence(current_sequence)
+                class_probabilities = rollout['probabilities'][0, day]
+                predicted_class_idx = int(np.argmax(class_probabilities))
                 predictions.append({
                     'day': day + 1,
-                    'date': (datetime.now() + timedelta(days=day+1)).strftime('%Y-%m-%d'),
-                    'prediction': pred
+                    'date': rollout['dates'][day],
+                    'prediction': {
+                        'predicted_class': self.class_names[predicted_class_idx],
+                        'confidence': float(class_probabilities[predicted_class_idx]) * 100,
+                        'all_probabilities': {
+                            class_name: float(prob) * 100
+                            for class_name, prob in zip(self.class_names, class_probabilities)
+                        },
+                        'trend_analysis': self._analyze_trend(rollout['windows'][day][0])
+                    }
                 })
-                
-                # Update sequence for next prediction
-                # (Simplified - in real implementation, you'd need weather forecast data)
-                # For now, we'll use the last values with some variation
-                last_values = current_sequence[-1].copy()
-                
-                # Add some realistic variation
-                for i in range(len(last_values)):
-                    if i < 4:  # Weather features - add some random variation
-                        last_values[i] += np.random.normal(0, 0.1)
-                    elif i == 4:  # Disease severity - might increase if no treatment
-                        if last_values[7] == 0:  # No treatment applied
-                            last_values[i] = min(1.0, last_values[i] + 0.1)
-                
-                # Shift sequence and add new prediction
-                current_sequence = np.roll(current_sequence, -1, axis=0)
-                current_sequence[-1] = last_values
             
             return predictions
             
@@ -344,6 +401,67 @@ class RNNModel:
             self.logger.error(f"Error predicting future: {str(e)}")
             raise
     
+    def predict_future_batch(self, sequences, days_ahead=3, seed=None, batch_size=1024, return_windows=False):
+        """
+        Rollout forecast untuk banyak plant sekaligus
+        
+        Semua plant maju bersama: satu forward pass batch per hari. Window
+        disimpan di satu buffer (N, T + days_ahead, F); hari baru ditulis
+        in-place di ujung buffer dan window berikutnya hanya view/slice,
+        tanpa np.roll atau copy per plant.
+        
+        Args:
+            sequences: Array (N, sequence_length, num_features)
+            days_ahead: Jumlah hari yang diprediksi
+            seed: Seed np.random.Generator untuk variasi cuaca (reproducible)
+            batch_size: Batch size forward pass
+            return_windows: Sertakan view window input tiap hari
+            
+        Returns:
+            dict: 'dates', 'probabilities' (N, days_ahead, C),
+                  'predicted_class' (N, days_ahead) dan opsional 'windows'
+        """
+        try:
+            if self.model is None:
+                raise ValueError("Model not loaded")
+            
+            sequences = np.asarray(sequences, dtype=np.float32)
+            num_plants, seq_len, num_features = sequences.shape
+            rng = np.random.default_rng(seed)
+            
+            buffer = np.empty((num_plants, seq_len + days_ahead, num_features), dtype=np.float32)
+            buffer[:, :seq_len] = sequences
+            probabilities = np.empty((num_plants, days_ahead, self.num_classes), dtype=np.float32)
+            windows = []
+            
+            for day in range(days_ahead):
+                window = buffer[:, day:day + seq_len]
+                if return_windows:
+                    windows.append(window)
+                probabilities[:, day] = self.model.predict(window, batch_size=batch_size, verbose=0)
+                
+                # Hari berikutnya: nilai terakhir + variasi
+                # (Simplified - in real implementation, you'd need weather forecast data)
+                next_day = buffer[:, day + seq_len]
+                next_day[:] = buffer[:, day + seq_len - 1]
+                next_day[:, :4] += rng.normal(0, 0.1, (num_plants, 4))  # Weather features
+                untreated = next_day[:, 7] == 0  # Disease severity naik jika tanpa treatment
+                next_day[untreated, 4] = np.minimum(1.0, next_day[untreated, 4] + 0.1)
+            
+            result = {
+                'dates': [(datetime.now() + timedelta(days=day + 1)).strftime('%Y-%m-%d') for day in range(days_ahead)],
+                'probabilities': probabilities,
+                'predicted_class': probabilities.argmax(axis=2)
+            }
+            if return_windows:
+                result['windows'] = windows
+            
+            return result
+            
+        except Exception as e:
+            self.logger.error(f"Error in batch rollout: {str(e)}")
+            raise
+    
     def generate_recommendations(self, sequence_data, prediction_result):
         """
         Generate rekomendasi berdasarkan analisis temporal
@@ -388,6 +506,26 @@ class RNNModel:
             self.logger.error(f"Error generating recommendations: {str(e)}")
             return ["Error generating recommendations"]
     
+    def evaluate_detailed(self, X_test, y_test, batch_size=256, num_bins=10):
+        """
+        Evaluasi streaming: confusion matrix, precision/recall/F1 per kelas,
+        kurva kalibrasi, dan latency per batch
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded")
+        
+        return evaluate_streaming(self.model, self.class_names, X_test, y_test, batch_size=batch_size,
+                                  num_bins=num_bins)
+    
+    def create_streaming_session(self, initial_capacity=1024):
+        """
+        Buat sesi inferensi incremental per plant (state LSTM disimpan per plant)
+        
+        Lihat StreamingRNN: setiap hari baru hanya menjalankan satu step recurrent.
+        """
+        from .streaming_rnn import StreamingRNN
+        return StreamingRNN(self, initial_capacity)
+    
     def save_model(self, filepath):
         """Save trained RNN model"""
         try:
@@ -401,6 +539,19 @@ class RNNModel:
             self.logger.error(f"Error saving RNN model: {str(e)}")
             raise
     
+    def export_numpy(self, filepath):
+        """Export bobot ke .npz untuk serving dengan NumpyLSTMModel (tanpa TF)"""
+        try:
+            if self.model is None:
+                raise ValueError("No model to export")
+
+            from .numpy_lstm import export_rnn_weights
+            return export_rnn_weights(self.model, filepath, self.class_names, self.feature_names)
+
+        except Exception as e:
+            self.logger.error(f"Error exporting RNN model: {str(e)}")
+            raise
+
     def load_model(self, filepath):
         """Load trained RNN model"""
         try:
@@ -412,56 +563,188 @@ class RNNModel:
             raise
 
 # Utility functions untuk temporal data
-def create_mock_temporal_data(num_plants=100, days_per_plant=30):
+MOCK_DATA_COLUMNS = [
+    'plant_id', 'date', 'temperature', 'humidity', 'rainfall', 'wind_speed',
+    'disease_severity', 'leaf_health', 'growth_rate', 'treatment_applied',
+    'fertilizer_applied', 'irrigation_amount', 'disease_class'
+]
+
+
+def _generate_mock_columns(rng, plant_ids, days_per_plant, disease_dynamics=False):
+    """
+    Generate semua kolom untuk sekelompok plant sekaligus (vectorized)
+    
+    Returns:
+        dict: nama kolom -> array dengan panjang len(plant_ids) * days_per_plant
+    """
+    num_plants = len(plant_ids)
+    shape = (num_plants, days_per_plant)
+    
+    # Mock weather data
+    temperature = 25 + rng.normal(0, 3, shape)
+    humidity = 0.7 + rng.normal(0, 0.1, shape)
+    rainfall = rng.exponential(2, shape)
+    wind_speed = np.maximum(0, rng.normal(5, 2, shape))
+    
+    # Mock management data
+    treatment_applied = (rng.random(shape) < 0.2).astype(np.int64)
+    fertilizer_applied = (rng.random(shape) < 0.1).astype(np.int64)
+    irrigation_amount = np.maximum(0, rng.normal(10, 3, shape))
+    
+    if disease_dynamics:
+        # Onset penyakit per plant: severity naik logistik setelah onset,
+        # dipercepat kelembaban tinggi dan diperlambat treatment kumulatif
+        infected = rng.random(num_plants) < 0.6
+        onset = rng.uniform(0, days_per_plant, num_plants)
+        plant_class = rng.integers(1, 5, num_plants)
+        
+        day = np.arange(days_per_plant)
+        humidity_pressure = np.cumsum(np.clip(humidity - 0.7, 0, None), axis=1)
+        treatment_effect = np.cumsum(treatment_applied, axis=1) * 0.15
+        progress = (day - onset[:, None]) / 3.0 + humidity_pressure - treatment_effect
+        disease_severity = np.where(infected[:, None], 1 / (1 + np.exp(-(progress - 2))), 0.0)
+        disease_severity = np.clip(disease_severity + rng.normal(0, 0.03, shape), 0, 1)
+        
+        disease_class = np.where(disease_severity < 0.2, 0, np.broadcast_to(plant_class[:, None], shape))
+    else:
+        # Mock plant data
+        disease_severity = np.clip(rng.beta(2, 5, shape), 0, 1)
+        disease_class = np.where(disease_severity < 0.2, 0, rng.integers(1, 5, shape))
+    
+    leaf_health = 1 - disease_severity + rng.normal(0, 0.1, shape)
+    growth_rate = np.maximum(0, rng.normal(0.1, 0.02, shape))
+    if disease_dynamics:
+        growth_rate *= 1 - 0.5 * disease_severity
+    
+    columns = {
+        'plant_id': np.repeat(plant_ids, days_per_plant),
+        'temperature': temperature,
+        'humidity': humidity,
+        'rainfall': rainfall,
+        'wind_speed': wind_speed,
+        'disease_severity': disease_severity,
+        'leaf_health': leaf_health,
+        'growth_rate': growth_rate,
+        'treatment_applied': treatment_applied,
+        'fertilizer_applied': fertilizer_applied,
+        'irrigation_amount': irrigation_amount,
+        'disease_class': disease_class
+    }
+    return {name: values.reshape(-1) for name, values in columns.items()}
+
+
+def iter_mock_temporal_data(num_plants=100, days_per_plant=30, chunk_plants=10000, seed=None,
+                            disease_dynamics=False, start_date=None):
+    """
+    Generate mock temporal data per chunk (DataFrame per chunk_plants plant)
+    
+    Semua kolom dibuat sekaligus dari np.random.Generator; memory hanya
+    sebesar satu chunk.
+    """
+    import pandas as pd
+    
+    rng = np.random.default_rng(seed)
+    end_date = pd.Timestamp(start_date or datetime.now())
+    day_offsets = pd.to_timedelta(np.arange(days_per_plant, 0, -1), unit='D')
+    dates = (end_date - day_offsets).to_numpy()
+    
+    for first in range(0, num_plants, chunk_plants):
+        plant_ids = np.arange(first, min(first + chunk_plants, num_plants))
+        columns = _generate_mock_columns(rng, plant_ids, days_per_plant, disease_dynamics)
+        columns['date'] = np.tile(dates, len(plant_ids))
+        yield pd.DataFrame({name: columns[name] for name in MOCK_DATA_COLUMNS})
+
+
+def create_mock_temporal_data(num_plants=100, days_per_plant=30, seed=None, disease_dynamics=False):
     """
     Create mock temporal data untuk testing
     """
     import pandas as pd
     
-    data = []
-    
-    for plant_id in range(num_plants):
-        for day in range(days_per_plant):
-            date = datetime.now() - timedelta(days=days_per_plant-day)
-            
-            # Mock weather data
-            temperature = 25 + np.random.normal(0, 3)
-            humidity = 0.7 + np.random.normal(0, 0.1)
-            rainfall = max(0, np.random.exponential(2))
-            wind_speed = max(0, np.random.normal(5, 2))
-            
-            # Mock plant data
-            disease_severity = max(0, min(1, np.random.beta(2, 5)))
-            leaf_health = 1 - disease_severity + np.random.normal(0, 0.1)
-            growth_rate = max(0, np.random.normal(0.1, 0.02))
-            
-            # Mock management data
-            treatment_applied = 1 if np.random.random() < 0.2 else 0
-            fertilizer_applied = 1 if np.random.random() < 0.1 else 0
-            irrigation_amount = max(0, np.random.normal(10, 3))
-            
-            # Mock disease class (simplified logic)
-            if disease_severity < 0.2:
-                disease_class = 0  # healthy
-            elif disease_severity < 0.4:
-                disease_class = np.random.choice([1, 2, 3, 4])
-            else:
-                disease_class = np.random.choice([1, 2, 3, 4])
-            
-            data.append({
-                'plant_id': plant_id,
-                'date': date,
-                'temperature': temperature,
-                'humidity': humidity,
-                'rainfall': rainfall,
-                'wind_speed': wind_speed,
-                'disease_severity': disease_severity,
-                'leaf_health': leaf_health,
-                'growth_rate': growth_rate,
-                'treatment_applied': treatment_applied,
-                'fertilizer_applied': fertilizer_applied,
-                'irrigation_amount': irrigation_amount,
-                'disease_class': disease_class
-            })
-    
-    return pd.DataFrame(data)
\ No newline at end of file
+    chunks = list(iter_mock_temporal_data(num_plants, days_per_plant, chunk_plants=max(num_plants, 1),
+                                          seed=seed, disease_dynamics=disease_dynamics))
+    if not chunks:
+        return pd.DataFrame(columns=MOCK_DATA_COLUMNS)
+    return chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
+
+
+def write_mock_temporal_data(output_path, num_plants=100000, days_per_plant=30, output_format='csv',
+                             chunk_plants=10000, seed=None, disease_dynamics=False):
+    """
+    Tulis mock temporal data ke disk per chunk (untuk dataset > RAM)
+    
+    Format:
+        csv: satu file CSV, di-append per chunk
+        parquet: satu file Parquet, satu row group per chunk (butuh pyarrow)
+        npy: matrix float64 memmap (kolom date diganti 'day' = hari ke-n),
+             nama kolom disimpan di <output>.columns.json
+    
+    Returns:
+        int: Jumlah baris yang ditulis
+    """
+    import json
+    
+    total_rows = num_plants * days_per_plant
+    chunks = iter_mock_temporal_data(num_plants, days_per_plant, chunk_plants, seed, disease_dynamics)
+    written = 0
+    
+    if output_format == 'csv':
+        for index, chunk in enumerate(chunks):
+            chunk.to_csv(output_path, mode='w' if index == 0 else 'a', header=index == 0, index=False)
+            written += len(chunk)
+    
+    elif output_format == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table)
+                written += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+    
+    elif output_format == 'npy':
+        columns = ['plant_id', 'day'] + MOCK_DATA_COLUMNS[2:]
+        matrix = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.float64,
+                                           shape=(total_rows, len(columns)))
+        day = np.arange(days_per_plant)
+        for chunk in chunks:
+            rows = len(chunk)
+            block = matrix[written:written + rows]
+            block[:, 0] = chunk['plant_id'].to_numpy()
+            block[:, 1] = np.tile(day, rows // days_per_plant)
+            block[:, 2:] = chunk[MOCK_DATA_COLUMNS[2:]].to_numpy(dtype=np.float64)
+            written += rows
+        matrix.flush()
+        with open(f'{output_path}.columns.json', 'w') as f:
+            json.dump(columns, f)
+    
+    else:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    
+    logging.info(f"Mock temporal data written: {written} rows -> {output_path}")
+    return written
+
+
+if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Generate mock temporal data for RNNModel load testing')
+    parser.add_argument('output')
+    parser.add_argument('--plants', type=int, default=100000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--format', choices=['csv', 'parquet', 'npy'], default='csv')
+    parser.add_argument('--chunk-plants', type=int, default=10000)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--disease-dynamics', action='store_true')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    write_mock_temporal_data(args.output, args.plants, args.days, args.format, args.chunk_plants,
+                             args.seed, args.disease_dynamics)
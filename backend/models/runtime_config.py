@@ -0,0 +1,149 @@
+# Konfigurasi runtime CPU untuk inference worker
+# Threading TensorFlow, OMP/MKL, dan CPU pinning per worker
+
+import os
+import sys
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Env var -> key konfigurasi
+ENV_KEYS = {
+    'intra_op_threads': 'TF_INTRA_OP_THREADS',
+    'inter_op_threads': 'TF_INTER_OP_THREADS',
+    'omp_threads': 'OMP_NUM_THREADS',
+    'cpu_affinity': 'INFERENCE_CPU_AFFINITY',
+}
+
+_applied = None
+_tf_applied = False
+
+
+def load_runtime_config(overrides=None):
+    """
+    Baca konfigurasi threading dari environment, di-override oleh dict
+
+    cpu_affinity bisa berupa:
+        - None / 'none': tidak ada pinning
+        - 'auto': bagi core secara rata per worker (INFERENCE_WORKER_INDEX / INFERENCE_WORKERS)
+        - '0-3' atau '0,2,4': daftar core eksplisit
+    """
+    config = {}
+    for key, env_name in ENV_KEYS.items():
+        value = os.environ.get(env_name)
+        if value is not None and key != 'cpu_affinity':
+            try:
+                value = int(value)
+            except ValueError:
+                logger.warning(f"Ignoring invalid {env_name}={value!r} (expected integer)")
+                value = None
+        config[key] = value
+
+    if overrides:
+        config.update({key: value for key, value in overrides.items() if value is not None})
+
+    return config
+
+
+def parse_cpu_list(spec):
+    """Parse '0-3,6' menjadi [0, 1, 2, 3, 6]"""
+    cpus = []
+    for part in str(spec).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-')
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        logger.warning(f"Ignoring invalid {name}={os.environ.get(name)!r}")
+        return default
+
+
+def resolve_cpu_affinity(spec):
+    """Tentukan set CPU untuk worker ini berdasarkan spesifikasi affinity"""
+    if spec is None or str(spec).lower() == 'none':
+        return None
+
+    if str(spec).lower() != 'auto':
+        return parse_cpu_list(spec)
+
+    available = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else list(range(os.cpu_count() or 1))
+    num_workers = _env_int('INFERENCE_WORKERS', 1)
+    worker_index = _env_int('INFERENCE_WORKER_INDEX', 0) % max(num_workers, 1)
+
+    per_worker = max(1, len(available) // max(num_workers, 1))
+    start = (worker_index * per_worker) % len(available)
+    return available[start:start + per_worker]
+
+
+def _apply_tensorflow_threading(config):
+    """Panggil setter tf.config.threading sekali, hanya jika TF sudah di-import"""
+    global _tf_applied
+    tf = sys.modules.get('tensorflow')
+    if _tf_applied or tf is None:
+        return
+
+    try:
+        if config['intra_op_threads']:
+            tf.config.threading.set_intra_op_parallelism_threads(config['intra_op_threads'])
+        if config['inter_op_threads']:
+            tf.config.threading.set_inter_op_parallelism_threads(config['inter_op_threads'])
+    except RuntimeError as e:
+        # Context TensorFlow sudah berjalan - setting thread pool tidak bisa diubah lagi
+        logger.warning(f"TensorFlow runtime already initialized, threading config ignored: {e}")
+    _tf_applied = True
+
+
+def configure_runtime(overrides=None):
+    """
+    Terapkan konfigurasi threading sebelum runtime TensorFlow dimulai
+
+    Aman dipanggil berkali-kali: env var dan CPU pinning hanya diterapkan
+    pada panggilan pertama. TensorFlow tidak pernah di-import di sini
+    (post_fork gunicorn memanggil fungsi ini di setiap worker); thread pool
+    TF diatur lewat TF_NUM_*_THREADS, dan setter tf.config.threading
+    dipanggil pada panggilan pertama setelah TF di-load (mis. CNNModel()).
+
+    Returns:
+        dict: Konfigurasi yang diterapkan
+    """
+    global _applied
+    if _applied is not None:
+        _apply_tensorflow_threading(_applied)
+        return _applied
+
+    config = load_runtime_config(overrides)
+
+    # OMP/MKL membaca env saat library pertama kali di-load
+    if config['omp_threads']:
+        os.environ['OMP_NUM_THREADS'] = str(config['omp_threads'])
+        os.environ['MKL_NUM_THREADS'] = str(config['omp_threads'])
+    if config['intra_op_threads']:
+        os.environ['TF_NUM_INTRAOP_THREADS'] = str(config['intra_op_threads'])
+    if config['inter_op_threads']:
+        os.environ['TF_NUM_INTEROP_THREADS'] = str(config['inter_op_threads'])
+
+    # CPU pinning (Linux only)
+    cpus = resolve_cpu_affinity(config['cpu_affinity'])
+    if cpus and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, cpus)
+            logger.info(f"Worker pinned to CPUs {cpus}")
+        except OSError as e:
+            logger.warning(f"Could not set CPU affinity: {e}")
+    config['pinned_cpus'] = cpus
+
+    _apply_tensorflow_threading(config)
+
+    _applied = config
+    logger.info(f"Runtime config applied: {config}")
+    return config
@@ -0,0 +1,212 @@
+# Sequence Dataset berbasis memmap untuk training RNN di luar RAM
+# Feature matrix disimpan sekali di disk; window hanya berupa offset
+
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+
+FEATURES_FILE = 'features.f32'
+TARGETS_FILE = 'targets.npy'
+STARTS_FILE = 'window_starts.npy'
+META_FILE = 'meta.json'
+
+
+def build_sequence_memmap(chunks, output_dir, feature_names, target_column='disease_class', sequence_length=7):
+    """
+    Tulis feature matrix (rows, F) ke disk dan index offset awal window
+
+    Args:
+        chunks: DataFrame atau iterable DataFrame; setiap plant harus utuh
+            dalam satu chunk (seperti output iter_mock_temporal_data)
+        output_dir: Direktori output
+
+    Returns:
+        dict: Metadata dataset (jumlah baris, window, feature)
+
+    Raises:
+        ValueError: Jika tidak ada plant dengan minimal sequence_length observasi
+    """
+    try:
+        if hasattr(chunks, 'columns'):
+            chunks = [chunks]
+
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        import pandas as pd
+
+        total_rows = 0
+        targets, starts = [], []
+        with open(output_dir / FEATURES_FILE, 'wb') as f:
+            for chunk in chunks:
+                plant_codes = pd.factorize(chunk['plant_id'])[0]
+                order = np.lexsort((chunk['date'].to_numpy(), plant_codes))
+                features = chunk[feature_names].to_numpy(dtype=np.float32)[order]
+
+                counts = np.bincount(plant_codes[order])
+                group_ends = np.repeat(np.cumsum(counts), counts)
+                window_starts = np.nonzero(group_ends - np.arange(len(features)) >= sequence_length)[0]
+
+                f.write(np.ascontiguousarray(features).tobytes())
+                targets.append(chunk[target_column].to_numpy()[order].astype(np.int64))
+                starts.append(window_starts + total_rows)
+                total_rows += len(features)
+
+        num_windows = int(sum(len(s) for s in starts))
+        if num_windows == 0:
+            raise ValueError(
+                f"No windows of length {sequence_length} in {total_rows} rows: "
+                f"every plant needs at least {sequence_length} observations"
+            )
+
+        np.save(output_dir / TARGETS_FILE, np.concatenate(targets) if targets else np.empty(0, dtype=np.int64))
+        np.save(output_dir / STARTS_FILE, np.concatenate(starts) if starts else np.empty(0, dtype=np.int64))
+
+        meta = {
+            'rows': total_rows,
+            'num_windows': num_windows,
+            'feature_names': list(feature_names),
+            'sequence_length': sequence_length
+        }
+        with open(output_dir / META_FILE, 'w') as f:
+            json.dump(meta, f, indent=2)
+
+        logging.info(f"Sequence memmap built: {meta['rows']} rows, {meta['num_windows']} windows -> {output_dir}")
+        return meta
+
+    except Exception as e:
+        logging.error(f"Error building sequence memmap: {str(e)}")
+        raise
+
+
+class SequenceMemmapDataset:
+    """
+    Dataset window RNN di atas feature matrix memmap
+
+    Window tidak pernah diduplikasi di disk maupun memory: sliding window
+    adalah strided view atas memmap, dan hanya batch yang sedang dipakai
+    yang di-copy ke RAM.
+    """
+
+    def __init__(self, data_dir, num_classes=5, indices=None):
+        self.data_dir = Path(data_dir)
+        with open(self.data_dir / META_FILE) as f:
+            self.meta = json.load(f)
+
+        self.num_classes = num_classes
+        self.sequence_length = self.meta['sequence_length']
+        self.num_features = len(self.meta['feature_names'])
+        if not self.meta['rows'] or not self.meta['num_windows']:
+            raise ValueError(f"Sequence dataset {self.data_dir} is empty (no windows)")
+
+        self.features = np.memmap(self.data_dir / FEATURES_FILE, dtype=np.float32, mode='r',
+                                  shape=(self.meta['rows'], self.num_features))
+        self.targets = np.load(self.data_dir / TARGETS_FILE, mmap_mode='r')
+        self.window_starts = np.load(self.data_dir / STARTS_FILE, mmap_mode='r')
+
+        # Subset (mis. hasil split) hanya berupa index ke window_starts
+        self.indices = np.arange(len(self.window_starts)) if indices is None else np.asarray(indices)
+
+        # View (num_rows - T + 1, T, F) tanpa copy
+        self._windows = np.lib.stride_tricks.sliding_window_view(
+            self.features, self.sequence_length, axis=0
+        ).transpose(0, 2, 1)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def window_series(self):
+        """
+        Id series (plant) untuk setiap window di subset ini
+
+        Dalam satu plant, offset window berurutan (selisih 1). Antar plant
+        selisihnya >= sequence_length karena T-1 baris terakhir setiap plant
+        tidak punya window. Untuk T = 1 semua window dianggap satu series
+        (window tidak pernah overlap).
+        """
+        starts = np.asarray(self.window_starts)
+        series = np.concatenate([[0], np.cumsum(np.diff(starts) != 1)])
+        return series[self.indices]
+
+    def split(self, val_fraction=0.2, seed=42, by='series'):
+        """
+        Split train/val tanpa baris yang dipakai kedua split (tanpa copy data)
+
+        Window yang bertetangga berbagi T-1 baris, jadi split acak per window
+        membocorkan data val ke train.
+
+        Args:
+            by: 'series' - plant dibagi acak (seed) ke train atau val.
+                'time' - per plant, window terakhir (val_fraction) menjadi val;
+                window train harus berakhir sebelum window val pertama dimulai
+                (gap sequence_length), window di celah itu dibuang.
+
+        Raises:
+            ValueError: Jika train (atau val, untuk val_fraction > 0) kosong
+        """
+        series = self.window_series()
+        starts = np.asarray(self.window_starts)[self.indices]
+
+        if by == 'series':
+            plants = np.random.default_rng(seed).permutation(np.unique(series))
+            is_val = np.isin(series, plants[:int(len(plants) * val_fraction)])
+            train_positions, val_positions = np.flatnonzero(~is_val), np.flatnonzero(is_val)
+        elif by == 'time':
+            # Urut per plant lalu per waktu; rank = posisi window di dalam plant-nya
+            order = np.lexsort((starts, series))
+            _, first, counts = np.unique(series[order], return_index=True, return_counts=True)
+            n_train = counts - (counts * val_fraction).astype(np.int64)
+            rank = np.arange(len(order)) - np.repeat(first, counts)
+            is_val = rank >= np.repeat(n_train, counts)
+
+            # Offset window val pertama per plant (tak hingga jika plant itu tidak punya val)
+            sorted_starts = starts[order].astype(np.float64)
+            val_begin = np.where(counts > n_train, sorted_starts[np.minimum(first + n_train, len(order) - 1)], np.inf)
+            is_train = ~is_val & (sorted_starts <= np.repeat(val_begin, counts) - self.sequence_length)
+            train_positions, val_positions = order[is_train], order[is_val]
+        else:
+            raise ValueError(f"Unknown split mode: {by} (use 'series' or 'time')")
+
+        if not len(train_positions) or (val_fraction > 0 and not len(val_positions)):
+            raise ValueError(
+                f"Split by {by} with val_fraction={val_fraction} leaves {len(train_positions)} train / "
+                f"{len(val_positions)} val windows; use more plants or longer series"
+            )
+
+        train = SequenceMemmapDataset(self.data_dir, self.num_classes, self.indices[np.sort(train_positions)])
+        val = SequenceMemmapDataset(self.data_dir, self.num_classes, self.indices[np.sort(val_positions)])
+        return train, val
+
+    def get_batch(self, positions):
+        """Ambil batch (X, y) untuk posisi window tertentu"""
+        starts = np.sort(self.window_starts[self.indices[positions]])  # akses disk berurutan
+        X = self._windows[starts]
+        labels = self.targets[starts + self.sequence_length - 1]
+        y = np.eye(self.num_classes, dtype=np.float32)[labels]
+        return X, y
+
+    def batches(self, batch_size=32, shuffle=True, seed=None):
+        """Generator batch (X, y)"""
+        order = np.random.default_rng(seed).permutation(len(self)) if shuffle else np.arange(len(self))
+        for first in range(0, len(order), batch_size):
+            yield self.get_batch(order[first:first + batch_size])
+
+    def to_tf_dataset(self, batch_size=32, shuffle=True, seed=None):
+        """tf.data source dari generator batch, dengan prefetch"""
+        import tensorflow as tf
+
+        signature = (
+            tf.TensorSpec(shape=(None, self.sequence_length, self.num_features), dtype=tf.float32),
+            tf.TensorSpec(shape=(None, self.num_classes), dtype=tf.float32)
+        )
+        epoch = [0]
+
+        def generator():
+            # Seed berbeda tiap epoch agar urutan berubah tapi tetap reproducible
+            epoch_seed = None if seed is None else seed + epoch[0]
+            epoch[0] += 1
+            yield from self.batches(batch_size, shuffle, epoch_seed)
+
+        return tf.data.Dataset.from_generator(generator, output_signature=signature).prefetch(tf.data.AUTOTUNE)
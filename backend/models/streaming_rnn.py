@@ -0,0 +1,183 @@
+# Streaming (stateful) RNN inference per plant
+# State LSTM disimpan per plant; satu hari data baru = satu step recurrent
+
+import logging
+from pathlib import Path
+
+import numpy as np
+from tensorflow.keras import layers
+
+
+class PlantStateStore:
+    """
+    Penyimpanan state (h, c) LSTM per plant dalam array float32 yang padat
+
+    Setiap plant mendapat satu baris di setiap array state; kapasitas
+    digandakan saat penuh. Tidak ada objek per plant selain index dict.
+    """
+
+    def __init__(self, state_sizes, initial_capacity=1024):
+        self.state_sizes = list(state_sizes)
+        self.index = {}
+        self.steps = np.zeros(initial_capacity, dtype=np.int64)
+        self.states = [
+            (np.zeros((initial_capacity, units), dtype=np.float32),
+             np.zeros((initial_capacity, units), dtype=np.float32))
+            for units in self.state_sizes
+        ]
+
+    @property
+    def capacity(self):
+        return len(self.steps)
+
+    def _grow(self, min_capacity):
+        new_capacity = max(min_capacity, self.capacity * 2)
+        extra = new_capacity - self.capacity
+        self.steps = np.concatenate([self.steps, np.zeros(extra, dtype=np.int64)])
+        self.states = [
+            (np.concatenate([h, np.zeros((extra, h.shape[1]), dtype=np.float32)]),
+             np.concatenate([c, np.zeros((extra, c.shape[1]), dtype=np.float32)]))
+            for h, c in self.states
+        ]
+
+    def rows_for(self, plant_ids):
+        """Index baris untuk setiap plant (plant baru dialokasikan dengan state nol)"""
+        rows = np.empty(len(plant_ids), dtype=np.int64)
+        for i, plant_id in enumerate(plant_ids):
+            row = self.index.get(plant_id)
+            if row is None:
+                row = len(self.index)
+                if row >= self.capacity:
+                    self._grow(row + 1)
+                self.index[plant_id] = row
+            rows[i] = row
+        return rows
+
+    def reset(self, plant_id):
+        row = self.index.get(plant_id)
+        if row is None:
+            return
+        self.steps[row] = 0
+        for h, c in self.states:
+            h[row] = 0
+            c[row] = 0
+
+    def save(self, filepath):
+        arrays = {'steps': self.steps[:len(self.index)]}
+        for layer_index, (h, c) in enumerate(self.states):
+            arrays[f'h{layer_index}'] = h[:len(self.index)]
+            arrays[f'c{layer_index}'] = c[:len(self.index)]
+        plant_ids = np.empty(len(self.index), dtype=object)
+        for plant_id, row in self.index.items():
+            plant_ids[row] = plant_id
+        np.savez(filepath, plant_ids=plant_ids, **arrays)
+
+    def load(self, filepath):
+        with np.load(filepath, allow_pickle=True) as data:
+            plant_ids = list(data['plant_ids'])
+            self.index = {plant_id: row for row, plant_id in enumerate(plant_ids)}
+            capacity = max(len(plant_ids), 1)
+            self.steps = np.zeros(capacity, dtype=np.int64)
+            self.steps[:len(plant_ids)] = data['steps']
+            self.states = []
+            for layer_index, units in enumerate(self.state_sizes):
+                h = np.zeros((capacity, units), dtype=np.float32)
+                c = np.zeros((capacity, units), dtype=np.float32)
+                h[:len(plant_ids)] = data[f'h{layer_index}']
+                c[:len(plant_ids)] = data[f'c{layer_index}']
+                self.states.append((h, c))
+
+
+class StreamingRNN:
+    """
+    Inferensi incremental untuk RNNModel
+
+    ingest() menerima satu hari features untuk sekumpulan plant, menjalankan
+    satu step pada setiap LSTM cell (bukan seluruh window 7 hari), lalu
+    Dense head untuk prediksi terbaru. Biaya per update O(1) terhadap
+    panjang riwayat, jadi riwayat bisa jauh lebih panjang dari
+    sequence_length.
+
+    Catatan: state mengakumulasi seluruh riwayat sejak plant pertama kali
+    di-ingest, bukan window 7 hari terakhir seperti predict_sequence.
+    """
+
+    def __init__(self, rnn_model, initial_capacity=1024):
+        if rnn_model.model is None:
+            raise ValueError("Model not loaded")
+
+        self.rnn_model = rnn_model
+        self.logger = logging.getLogger(__name__)
+
+        model_layers = rnn_model.model.layers
+        lstm_indices = [i for i, layer in enumerate(model_layers) if isinstance(layer, layers.LSTM)]
+        if not lstm_indices:
+            raise ValueError("Streaming inference requires an LSTM-based model (build_model)")
+
+        self.lstm_layers = [model_layers[i] for i in lstm_indices]
+        self.head_layers = model_layers[lstm_indices[-1] + 1:]
+        self.store = PlantStateStore([layer.units for layer in self.lstm_layers], initial_capacity)
+
+    def ingest(self, plant_ids, features):
+        """
+        Tambahkan satu hari data untuk setiap plant dan update prediksi
+
+        Args:
+            plant_ids: List plant ID (panjang N)
+            features: Array (N, num_features) untuk hari terbaru
+
+        Returns:
+            np.ndarray: Probabilitas kelas (N, num_classes)
+        """
+        try:
+            features = np.asarray(features, dtype=np.float32).reshape(len(plant_ids), -1)
+            rows = self.store.rows_for(plant_ids)
+
+            x = features
+            for layer, (h_store, c_store) in zip(self.lstm_layers, self.store.states):
+                output, (h, c) = layer.cell(x, states=[h_store[rows], c_store[rows]], training=False)
+                h_store[rows] = np.asarray(h)
+                c_store[rows] = np.asarray(c)
+                x = output
+
+            for layer in self.head_layers:
+                x = layer(x, training=False)
+
+            self.store.steps[rows] += 1
+            return np.asarray(x)
+
+        except Exception as e:
+            self.logger.error(f"Error in streaming ingest: {str(e)}")
+            raise
+
+    def ingest_one(self, plant_id, features):
+        """Ingest satu plant dan kembalikan dict hasil prediksi"""
+        probabilities = self.ingest([plant_id], np.expand_dims(features, axis=0))[0]
+        predicted_class_idx = int(np.argmax(probabilities))
+        return {
+            'plant_id': plant_id,
+            'days_observed': int(self.store.steps[self.store.index[plant_id]]),
+            'predicted_class': self.rnn_model.class_names[predicted_class_idx],
+            'confidence': float(probabilities[predicted_class_idx]) * 100,
+            'all_probabilities': {
+                class_name: float(prob) * 100
+                for class_name, prob in zip(self.rnn_model.class_names, probabilities)
+            }
+        }
+
+    def warm_start(self, plant_ids, sequences):
+        """Isi state dari riwayat (N, T, F) dengan T kali ingest"""
+        sequences = np.asarray(sequences, dtype=np.float32)
+        probabilities = None
+        for step in range(sequences.shape[1]):
+            probabilities = self.ingest(plant_ids, sequences[:, step])
+        return probabilities
+
+    def save_state(self, filepath):
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+        self.store.save(filepath)
+        self.logger.info(f"Streaming state saved: {len(self.store.index)} plants -> {filepath}")
+
+    def load_state(self, filepath):
+        self.store.load(filepath)
+        self.logger.info(f"Streaming state loaded: {len(self.store.index)} plants")
@@ -0,0 +1,239 @@
+# Training Callbacks untuk CNN/RNN
+# Instrumentasi throughput + checkpoint full-state yang bisa di-resume
+
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+STATE_FILE = 'training_state.json'
+BEST_WEIGHTS_FILE = 'best_weights_{index}.npz'
+
+
+def peak_memory_mb():
+    """Peak RSS proses ini dalam MB (None jika modul resource tidak tersedia, mis. Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss dalam KB di Linux, byte di macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def dataset_batch_size(dataset):
+    """
+    Ukuran batch dari tf.data.Dataset: dimensi pertama element_spec, atau
+    batch pertama jika dimensi itu tidak statis (drop_remainder=False).
+    None jika input bukan Dataset atau dataset kosong.
+    """
+    if not isinstance(dataset, tf.data.Dataset):
+        return None
+
+    spec = tf.nest.flatten(dataset.element_spec)[0]
+    if spec.shape.rank and spec.shape[0] is not None:
+        return int(spec.shape[0])
+
+    for element in dataset.take(1):
+        return int(tf.nest.flatten(element)[0].shape[0])
+    return None
+
+
+def _to_json_number(value):
+    return int(value) if isinstance(value, int) else float(value)
+
+
+class ThroughputLogger(keras.callbacks.Callback):
+    """
+    Catat throughput training ke file JSON-lines
+
+    Setiap step dibagi menjadi:
+        - data_wait: waktu dari akhir step sebelumnya sampai step dimulai
+          (menunggu input pipeline)
+        - compute: waktu forward/backward step itu sendiri
+
+    Throughput dihitung atas window training saja (sampai akhir batch
+    training terakhir), jadi waktu validasi di akhir epoch tidak ikut.
+    Jika batch_size None, dipakai key `size` dari batch logs bila ada.
+    """
+
+    def __init__(self, log_path, batch_size=None, log_every=50):
+        super().__init__()
+        self.log_path = Path(log_path)
+        self.batch_size = batch_size
+        self.log_every = log_every
+        self._epoch = None
+        self._reset_window()
+
+    def _reset_window(self):
+        self._window_start = time.perf_counter()
+        self._steps = 0
+        self._data_wait = 0.0
+        self._compute = 0.0
+
+    def _write(self, record):
+        with open(self.log_path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+    def _summary(self, event, **extra):
+        # Akhir window = akhir batch training terakhir, bukan akhir validasi
+        elapsed = self._last_batch_end - self._window_start
+        steps_per_sec = self._steps / elapsed if elapsed > 0 else 0.0
+        record = {
+            'event': event,
+            'time': time.time(),
+            'steps': self._steps,
+            'steps_per_sec': round(steps_per_sec, 3),
+            'data_wait_sec': round(self._data_wait, 4),
+            'compute_sec': round(self._compute, 4),
+            'data_wait_fraction': round(self._data_wait / elapsed, 4) if elapsed > 0 else 0.0,
+            'peak_memory_mb': None
+        }
+        peak_memory = peak_memory_mb()
+        if peak_memory is not None:
+            record['peak_memory_mb'] = round(peak_memory, 1)
+        if self.batch_size:
+            record['images_per_sec'] = round(steps_per_sec * self.batch_size, 2)
+        record.update(extra)
+        return record
+
+    def on_train_begin(self, logs=None):
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._last_batch_end = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._reset_window()
+        self._epoch = epoch
+        self._last_batch_end = time.perf_counter()
+
+    def on_train_batch_begin(self, batch, logs=None):
+        now = time.perf_counter()
+        if self._last_batch_end is not None:
+            self._data_wait += now - self._last_batch_end
+        self._batch_start = now
+
+    def on_train_batch_end(self, batch, logs=None):
+        now = time.perf_counter()
+        self._compute += now - self._batch_start
+        self._last_batch_end = now
+        self._steps += 1
+        if not self.batch_size and logs and logs.get('size'):
+            self.batch_size = int(logs['size'])
+
+        if self.log_every and self._steps % self.log_every == 0:
+            self._write(self._summary('step', epoch=self._epoch, batch=batch))
+
+    def on_epoch_end(self, epoch, logs=None):
+        metrics = {key: float(value) for key, value in (logs or {}).items()}
+        self._write(self._summary('epoch', epoch=epoch, metrics=metrics))
+
+
+class FullStateCheckpoint(keras.callbacks.Callback):
+    """
+    Checkpoint full-state tiap N epoch: bobot model, state optimizer,
+    epoch terakhir, learning rate, dan state callback (ReduceLROnPlateau,
+    EarlyStopping, ModelCheckpoint) agar training bisa dilanjutkan setelah
+    crash/pre-emption. Tanpa `best` milik ModelCheckpoint, epoch pertama
+    setelah resume selalu menimpa file model terbaik.
+    best_weights EarlyStopping (restore_best_weights=True) disimpan sebagai
+    .npz agar bobot terbaik sebelum crash tetap bisa di-restore di akhir.
+
+    Letakkan callback ini SETELAH callback yang di-track, karena state
+    mereka di-restore di on_train_begin setelah mereka me-reset diri.
+    """
+
+    TRACKED_ATTRIBUTES = ('wait', 'best', 'best_epoch', 'cooldown_counter', 'stopped_epoch')
+
+    def __init__(self, checkpoint_dir, tracked_callbacks=None, save_every=1, max_to_keep=3):
+        super().__init__()
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.tracked_callbacks = tracked_callbacks or []
+        self.save_every = save_every
+        self.max_to_keep = max_to_keep
+        self.logger = logging.getLogger(__name__)
+        self._pending_state = None
+        self._manager = None
+
+    def _checkpoint_manager(self, model):
+        if self._manager is None:
+            self.epoch_var = tf.Variable(0, dtype=tf.int64, trainable=False)
+            checkpoint = tf.train.Checkpoint(model=model, optimizer=model.optimizer, epoch=self.epoch_var)
+            self._manager = tf.train.CheckpointManager(checkpoint, str(self.checkpoint_dir), max_to_keep=self.max_to_keep)
+        return self._manager
+
+    def restore(self, model):
+        """
+        Restore checkpoint terakhir (jika ada)
+
+        Returns:
+            int: initial_epoch untuk model.fit (0 jika tidak ada checkpoint)
+        """
+        manager = self._checkpoint_manager(model)
+        if manager.latest_checkpoint is None:
+            self.logger.info("No checkpoint found, starting from scratch")
+            return 0
+
+        manager.checkpoint.restore(manager.latest_checkpoint)
+
+        state_path = self.checkpoint_dir / STATE_FILE
+        if state_path.exists():
+            with open(state_path) as f:
+                self._pending_state = json.load(f)
+            if self._pending_state.get('learning_rate') is not None:
+                keras.backend.set_value(model.optimizer.learning_rate, self._pending_state['learning_rate'])
+
+        initial_epoch = int(self.epoch_var.numpy())
+        self.logger.info(f"Resumed from {manager.latest_checkpoint} (epoch {initial_epoch})")
+        return initial_epoch
+
+    def on_train_begin(self, logs=None):
+        self._checkpoint_manager(self.model)
+        if not self._pending_state:
+            return
+        for index, (callback, state) in enumerate(zip(self.tracked_callbacks, self._pending_state.get('callbacks', []))):
+            for attribute, value in state.items():
+                setattr(callback, attribute, value)
+
+            best_weights_path = self.checkpoint_dir / BEST_WEIGHTS_FILE.format(index=index)
+            if hasattr(callback, 'best_weights') and best_weights_path.exists():
+                with np.load(best_weights_path) as data:
+                    callback.best_weights = [data[f'arr_{i}'] for i in range(len(data.files))]
+        self._pending_state = None
+
+    def on_epoch_end(self, epoch, logs=None):
+        if (epoch + 1) % self.save_every != 0:
+            return
+
+        self.epoch_var.assign(epoch + 1)
+        self._manager.save(checkpoint_number=epoch + 1)
+
+        state = {
+            'epoch': epoch + 1,
+            'learning_rate': float(keras.backend.get_value(self.model.optimizer.learning_rate)),
+            'callbacks': [
+                {
+                    attribute: _to_json_number(getattr(callback, attribute))
+                    for attribute in self.TRACKED_ATTRIBUTES if hasattr(callback, attribute)
+                }
+                for callback in self.tracked_callbacks
+            ]
+        }
+        for index, callback in enumerate(self.tracked_callbacks):
+            best_weights = getattr(callback, 'best_weights', None)
+            if best_weights is not None:
+                # np.savez menambah .npz jika tidak ada, jadi nama tmp sudah berakhiran .npz
+                best_weights_path = self.checkpoint_dir / BEST_WEIGHTS_FILE.format(index=index)
+                tmp_weights_path = best_weights_path.with_name('tmp_' + best_weights_path.name)
+                np.savez(tmp_weights_path, *best_weights)
+                tmp_weights_path.replace(best_weights_path)
+
+        tmp_path = self.checkpoint_dir / (STATE_FILE + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        tmp_path.replace(self.checkpoint_dir / STATE_FILE)
@@ -0,0 +1,59 @@
+# Trend Analysis untuk data temporal tanaman
+# Hanya NumPy (tanpa TensorFlow): dipakai RNNModel saat training dan
+# NumpyLSTMModel saat serving
+
+import numpy as np
+
+
+def compute_trend_slopes(sequences):
+    """
+    Slope least-squares linear untuk semua feature di semua sequence
+
+    Closed-form: slope = sum(w_t * x_t) dengan w_t = (t - t_mean) / sum((t - t_mean)^2),
+    dihitung sebagai satu einsum atas array (N, T, F). Hasil sama dengan
+    np.polyfit(range(T), x, 1)[0] per feature.
+
+    Returns:
+        np.ndarray: Slope dengan shape (N, F)
+    """
+    sequences = np.asarray(sequences, dtype=np.float64)
+    steps = np.arange(sequences.shape[1], dtype=np.float64)
+    centered = steps - steps.mean()
+    weights = centered / np.dot(centered, centered)
+    return np.einsum('t,ntf->nf', weights, sequences)
+
+
+def analyze_trends_batch(sequences, feature_names):
+    """
+    Analisis trend untuk banyak sequence sekaligus
+
+    Args:
+        sequences: Array (N, T, F)
+        feature_names: Nama F feature
+
+    Returns:
+        list: Satu dict per sequence {feature: {slope, direction, current_value, change_rate}}
+    """
+    sequences = np.asarray(sequences, dtype=np.float64)
+    if sequences.shape[1] < 2:
+        return [{} for _ in range(len(sequences))]
+
+    num_steps = sequences.shape[1]
+    slopes = compute_trend_slopes(sequences)
+    current_values = sequences[:, -1, :]
+    change_rates = slopes * num_steps
+
+    directions = np.where(slopes > 0, 'increasing', np.where(slopes < 0, 'decreasing', 'stable'))
+
+    return [
+        {
+            feature_name: {
+                'slope': float(slopes[n, i]),
+                'direction': str(directions[n, i]),
+                'current_value': float(current_values[n, i]),
+                'change_rate': float(change_rates[n, i])
+            }
+            for i, feature_name in enumerate(feature_names)
+        }
+        for n in range(len(sequences))
+    ]
@@ -0,0 +1,155 @@
+# Dataset Audit untuk dataset gambar bawang merah
+# Cek file corrupt, dimensi/mode warna, duplikat persis dan near-duplicate
+#
+# Contoh:
+#   python -m backend.utils.dataset_audit data/train --report audit_report.json --workers 8
+
+import hashlib
+import json
+import logging
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from .hash_index import PerceptualHashIndex
+from .image_processor import ImageProcessor
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp'}
+
+
+def scan_file(entry):
+    """
+    Periksa satu file (dijalankan di proses worker)
+
+    Returns:
+        dict: Info file; 'error' terisi jika file tidak bisa di-decode
+    """
+    path, class_name = entry
+    record = {'path': path, 'class': class_name}
+    try:
+        with open(path, 'rb') as f:
+            content = f.read()
+        record['sha256'] = hashlib.sha256(content).hexdigest()
+        record['bytes'] = len(content)
+
+        # verify() cek struktur file, load() memastikan seluruh pixel bisa di-decode
+        with Image.open(path) as image:
+            image.verify()
+        with Image.open(path) as image:
+            image.load()
+            record['width'], record['height'] = image.size
+            record['mode'] = image.mode
+            record['format'] = image.format
+            record['phash'] = ImageProcessor().compute_perceptual_hash(image)
+    except Exception as e:
+        record['error'] = f'{type(e).__name__}: {e}'
+    return record
+
+
+def list_dataset_files(data_dir):
+    """Daftar (path, class_name) dari struktur folder per kelas"""
+    data_dir = Path(data_dir)
+    entries = []
+    for class_dir in sorted(p for p in data_dir.iterdir() if p.is_dir()):
+        for path in sorted(class_dir.rglob('*')):
+            if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS:
+                entries.append((str(path), class_dir.name))
+    return entries
+
+
+def audit_dataset(data_dir, workers=None, near_duplicate_distance=4, chunksize=32):
+    """
+    Audit dataset dengan process pool
+
+    Returns:
+        dict: Laporan audit (corrupt, statistik, duplikat, leakage)
+    """
+    logger = logging.getLogger(__name__)
+    entries = list_dataset_files(data_dir)
+    logger.info(f"Auditing {len(entries)} files with {workers or os.cpu_count()} workers")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        records = list(executor.map(scan_file, entries, chunksize=chunksize))
+
+    corrupt = [{'path': r['path'], 'class': r['class'], 'error': r['error']} for r in records if 'error' in r]
+    valid = [r for r in records if 'error' not in r]
+
+    # Duplikat persis berdasarkan hash konten
+    by_content = defaultdict(list)
+    for record in valid:
+        by_content[record['sha256']].append(record)
+    exact_duplicates = [
+        {
+            'sha256': digest,
+            'files': [r['path'] for r in group],
+            'classes': sorted({r['class'] for r in group}),
+            'cross_class': len({r['class'] for r in group}) > 1
+        }
+        for digest, group in by_content.items() if len(group) > 1
+    ]
+
+    # Near-duplicate berdasarkan perceptual hash (satu representatif per konten unik)
+    index = PerceptualHashIndex(max_distance=near_duplicate_distance)
+    near_duplicates = []
+    for group in by_content.values():
+        record = group[0]
+        for distance, _, other in index.search(record['phash']):
+            near_duplicates.append({
+                'files': [other['path'], record['path']],
+                'classes': [other['class'], record['class']],
+                'distance': distance,
+                'cross_class': other['class'] != record['class']
+            })
+        index.add(record['phash'], record)
+
+    class_counts = Counter(r['class'] for r in valid)
+    report = {
+        'data_dir': str(data_dir),
+        'total_files': len(records),
+        'valid_files': len(valid),
+        'class_counts': dict(class_counts),
+        'corrupt_files': corrupt,
+        'modes': dict(Counter(r['mode'] for r in valid)),
+        'formats': dict(Counter(r['format'] for r in valid)),
+        'dimensions': {
+            'min_width': min((r['width'] for r in valid), default=None),
+            'min_height': min((r['height'] for r in valid), default=None),
+            'max_width': max((r['width'] for r in valid), default=None),
+            'max_height': max((r['height'] for r in valid), default=None),
+            'most_common': [[f'{w}x{h}', n] for (w, h), n in
+                            Counter((r['width'], r['height']) for r in valid).most_common(5)]
+        },
+        'exact_duplicates': exact_duplicates,
+        'near_duplicates': near_duplicates,
+        'label_leakage': {
+            'exact': sum(1 for d in exact_duplicates if d['cross_class']),
+            'near': sum(1 for d in near_duplicates if d['cross_class'])
+        }
+    }
+    return report
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Audit class-folder image dataset before training')
+    parser.add_argument('data_dir')
+    parser.add_argument('--report', default='audit_report.json')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--distance', type=int, default=4, help='Max Hamming distance untuk near-duplicate')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    audit = audit_dataset(args.data_dir, workers=args.workers, near_duplicate_distance=args.distance)
+
+    with open(args.report, 'w') as f:
+        json.dump(audit, f, indent=2)
+
+    print(f"📊 {audit['valid_files']}/{audit['total_files']} valid files, classes: {audit['class_counts']}")
+    print(f"❌ Corrupt files: {len(audit['corrupt_files'])}")
+    print(f"🔁 Exact duplicate groups: {len(audit['exact_duplicates'])}, near-duplicate pairs: {len(audit['near_duplicates'])}")
+    print(f"⚠️ Cross-class leakage: {audit['label_leakage']}")
+    print(f"📄 Report saved to {args.report}")
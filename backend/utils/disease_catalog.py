@@ -0,0 +1,333 @@
+# Disease Catalog untuk penyakit bawang merah
+# Satu sumber metadata penyakit: dimuat sekali per proses, immutable,
+# dan dipakai bersama oleh DiseaseClassifier dan endpoint API
+
+import json
+import threading
+
+# Urutan index kelas, sama dengan CNNModel/RNNModel.class_names
+CLASS_ORDER = ('healthy', 'purple_blotch', 'downy_mildew', 'leaf_blight', 'anthracnose')
+
+DEFAULT_LANGUAGE = 'id'
+
+_DISEASE_DATA = {
+    'purple_blotch': {
+        'name': 'Bercak Ungu (Purple Blotch)',
+        'scientific_name': 'Alternaria porri',
+        'summary': {
+            'symptoms': 'Bercak ungu pada daun, dapat menyebar ke seluruh tanaman',
+            'conditions': 'Kelembaban tinggi, suhu 20-30°C'
+        },
+        'type': 'Fungal',
+        'description': 'Penyakit jamur yang menyebabkan bercak ungu pada daun bawang merah. Dapat menyebar dengan cepat dalam kondisi lembab.',
+        'symptoms': [
+            'Bercak kecil berwarna putih dengan tepi ungu',
+            'Bercak membesar dan bergabung',
+            'Daun menguning dan mengering',
+            'Pertumbuhan tanaman terhambat'
+        ],
+        'conditions': {
+            'temperature': '20-30°C',
+            'humidity': 'Tinggi (>80%)',
+            'weather': 'Cuaca lembab, hujan berkepanjangan'
+        },
+        'severity_levels': {
+            'ringan': 'Bercak sedikit, belum menyebar',
+            'sedang': 'Bercak mulai menyebar, beberapa daun terinfeksi',
+            'berat': 'Sebagian besar daun terinfeksi, pertumbuhan terhambat'
+        },
+        'treatments': [
+            'Semprot fungisida berbahan aktif mankozeb atau klorotalonil',
+            'Perbaiki drainase untuk mengurangi kelembaban',
+            'Buang dan musnahkan bagian tanaman yang terinfeksi',
+            'Berikan jarak tanam yang cukup untuk sirkulasi udara',
+            'Aplikasi pupuk kalium untuk meningkatkan daya tahan'
+        ],
+        'prevention': [
+            'Gunakan benih sehat dan bersertifikat',
+            'Rotasi tanaman dengan tanaman non-allium',
+            'Jaga kebersihan lahan dari sisa tanaman',
+            'Hindari penyiraman berlebihan',
+            'Monitoring rutin kondisi tanaman'
+        ]
+    },
+    'downy_mildew': {
+        'name': 'Embun Bulu (Downy Mildew)',
+        'scientific_name': 'Peronospora destructor',
+        'summary': {
+            'symptoms': 'Lapisan putih keabu-abuan pada permukaan daun',
+            'conditions': 'Kelembaban sangat tinggi, suhu dingin'
+        },
+        'type': 'Oomycete',
+        'description': 'Penyakit yang menyebabkan lapisan putih keabu-abuan pada permukaan daun, terutama pada kondisi lembab.',
+        'symptoms': [
+            'Lapisan putih keabu-abuan pada permukaan daun',
+            'Daun menguning dari ujung',
+            'Pertumbuhan kerdil',
+            'Daun melengkung dan mengering'
+        ],
+        'conditions': {
+            'temperature': '15-20°C',
+            'humidity': 'Sangat tinggi (>90%)',
+            'weather': 'Embun pagi, kelembaban tinggi'
+        },
+        'severity_levels': {
+            'ringan': 'Lapisan putih tipis pada beberapa daun',
+            'sedang': 'Lapisan putih menyebar, daun mulai menguning',
+            'berat': 'Seluruh tanaman terinfeksi, pertumbuhan sangat terhambat'
+        },
+        'treatments': [
+            'Aplikasi fungisida sistemik (metalaksil + mankozeb)',
+            'Perbaiki ventilasi dan drainase',
+            'Kurangi kelembaban dengan mulsa plastik',
+            'Semprot pada pagi hari sebelum embun terbentuk'
+        ],
+        'prevention': [
+            'Pilih varietas tahan penyakit',
+            'Atur jarak tanam yang optimal',
+            'Hindari penyiraman di sore hari',
+            'Gunakan mulsa untuk mengurangi kelembaban tanah'
+        ]
+    },
+    'leaf_blight': {
+        'name': 'Busuk Daun (Leaf Blight)',
+        'scientific_name': 'Botrytis squamosa',
+        'summary': {
+            'symptoms': 'Bercak putih kecil yang membesar dan mengering',
+            'conditions': 'Kelembaban tinggi, angin kencang'
+        },
+        'type': 'Fungal',
+        'description': 'Penyakit jamur yang menyebabkan bercak putih kecil yang membesar dan mengering pada daun.',
+        'symptoms': [
+            'Bercak putih kecil dengan halo kuning',
+            'Bercak membesar dan mengering',
+            'Daun patah pada bagian yang terinfeksi',
+            'Ujung daun mengering dan mati'
+        ],
+        'conditions': {
+            'temperature': '18-24°C',
+            'humidity': 'Tinggi dengan angin kencang',
+            'weather': 'Cuaca berubah-ubah, angin kencang'
+        },
+        'severity_levels': {
+            'ringan': 'Beberapa bercak kecil pada daun tua',
+            'sedang': 'Bercak menyebar ke daun muda',
+            'berat': 'Sebagian besar daun rusak dan patah'
+        },
+        'treatments': [
+            'Fungisida berbahan aktif iprodion atau vinclozolin',
+            'Buang daun yang terinfeksi',
+            'Kurangi kelembaban daun',
+            'Aplikasi pupuk berimbang'
+        ],
+        'prevention': [
+            'Hindari luka mekanis pada tanaman',
+            'Jaga kebersihan alat pertanian',
+            'Monitoring cuaca dan kelembaban',
+            'Aplikasi fungisida preventif'
+        ]
+    },
+    'anthracnose': {
+        'name': 'Antraknosa',
+        'scientific_name': 'Colletotrichum gloeosporioides',
+        'summary': {
+            'symptoms': 'Bercak coklat dengan tepi gelap pada daun',
+            'conditions': 'Curah hujan tinggi, suhu hangat'
+        },
+        'type': 'Fungal',
+        'description': 'Penyakit jamur yang menyebabkan bercak coklat dengan tepi gelap pada daun dan dapat menyerang umbi.',
+        'symptoms': [
+            'Bercak coklat dengan tepi gelap',
+            'Bercak cekung pada umbi',
+            'Daun layu dan mengering',
+            'Pertumbuhan terhambat'
+        ],
+        'conditions': {
+            'temperature': '25-30°C',
+            'humidity': 'Tinggi dengan hujan',
+            'weather': 'Curah hujan tinggi, suhu hangat'
+        },
+        'severity_levels': {
+            'ringan': 'Bercak sedikit pada daun',
+            'sedang': 'Bercak menyebar, mulai menyerang umbi',
+            'berat': 'Umbi busuk, tanaman mati'
+        },
+        'treatments': [
+            'Fungisida berbahan aktif azoksistrobin',
+            'Perbaiki drainase lahan',
+            'Buang tanaman yang terinfeksi berat',
+            'Aplikasi kapur untuk menetralkan pH tanah'
+        ],
+        'prevention': [
+            'Gunakan benih bebas penyakit',
+            'Rotasi tanaman 2-3 tahun',
+            'Jaga pH tanah 6.0-7.0',
+            'Hindari genangan air'
+        ]
+    },
+    'healthy': {
+        'name': 'Sehat',
+        'scientific_name': None,
+        'summary': {
+            'symptoms': 'Daun hijau segar, pertumbuhan normal',
+            'conditions': 'Kondisi optimal untuk pertumbuhan'
+        },
+        'type': 'Normal',
+        'description': 'Tanaman bawang merah dalam kondisi sehat tanpa tanda-tanda penyakit.',
+        'symptoms': [
+            'Daun hijau segar',
+            'Pertumbuhan normal',
+            'Tidak ada bercak atau kelainan',
+            'Umbi berkembang baik'
+        ],
+        'conditions': {
+            'temperature': 'Optimal untuk pertumbuhan',
+            'humidity': 'Seimbang',
+            'weather': 'Kondisi cuaca mendukung'
+        },
+        'treatments': [
+            'Lanjutkan perawatan rutin',
+            'Monitoring berkala',
+            'Pemupukan sesuai jadwal',
+            'Penyiraman yang tepat'
+        ],
+        'prevention': [
+            'Pertahankan kondisi optimal',
+            'Monitoring rutin',
+            'Sanitasi lahan',
+            'Nutrisi seimbang'
+        ]
+    }
+}
+
+# Override per bahasa; field yang tidak ada memakai teks bahasa Indonesia
+_TRANSLATIONS = {
+    'en': {
+        'purple_blotch': {'name': 'Purple Blotch'},
+        'downy_mildew': {'name': 'Downy Mildew'},
+        'leaf_blight': {'name': 'Leaf Blight'},
+        'anthracnose': {'name': 'Anthracnose'},
+        'healthy': {'name': 'Healthy'}
+    }
+}
+
+
+class FrozenDict(dict):
+    """dict read-only; tetap subclass dict sehingga bisa langsung di-jsonify"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('Disease catalog is immutable')
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __hash__(self):
+        return id(self)
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return FrozenDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class DiseaseCatalog:
+    """
+    Katalog penyakit immutable dengan index key, nama tampilan, dan index kelas
+
+    Body JSON untuk /api/diseases diserialisasi sekali per bahasa saat
+    katalog dibuat, jadi request hanya mengirim bytes yang sudah ada.
+    """
+
+    def __init__(self, data=None, translations=None, class_order=CLASS_ORDER):
+        data = data or _DISEASE_DATA
+        translations = translations or _TRANSLATIONS
+
+        self.class_order = tuple(class_order)
+        self.languages = (DEFAULT_LANGUAGE,) + tuple(lang for lang in translations if lang != DEFAULT_LANGUAGE)
+
+        entries = {}
+        for class_index, key in enumerate(self.class_order):
+            entry = dict(data[key], key=key, class_index=class_index)
+            entries[key] = _freeze(entry)
+
+        self.by_key = FrozenDict(entries)
+        self.by_index = tuple(entries[key] for key in self.class_order)
+        self._localized = {DEFAULT_LANGUAGE: self.by_key}
+        for lang, overrides in translations.items():
+            self._localized[lang] = FrozenDict(
+                (key, _freeze(dict(entry, **overrides.get(key, {}))))
+                for key, entry in self.by_key.items()
+            )
+
+        # Nama tampilan semua bahasa bisa dipakai untuk lookup
+        self.by_name = FrozenDict(
+            (entry['name'], self.by_key[entry['key']])
+            for localized in self._localized.values() for entry in localized.values()
+        )
+
+        self._json_bodies = {lang: self._serialize(lang) for lang in self.languages}
+
+    def _serialize(self, lang):
+        """Body /api/diseases (format lama: name, pathogen, symptoms, conditions)"""
+        diseases = [
+            {
+                'key': entry['key'],
+                'class_index': entry['class_index'],
+                'name': entry['name'],
+                'pathogen': entry['scientific_name'],
+                'symptoms': entry['summary']['symptoms'],
+                'conditions': entry['summary']['conditions']
+            }
+            for entry in self.localized(lang).values() if entry['key'] != 'healthy'
+        ]
+        return json.dumps({'diseases': diseases, 'language': lang}, ensure_ascii=False).encode('utf-8')
+
+    def resolve_language(self, lang):
+        lang = (lang or DEFAULT_LANGUAGE).split('-')[0].lower()
+        return lang if lang in self._localized else DEFAULT_LANGUAGE
+
+    def localized(self, lang=DEFAULT_LANGUAGE):
+        return self._localized[self.resolve_language(lang)]
+
+    def json_body(self, lang=DEFAULT_LANGUAGE):
+        """Bytes JSON yang sudah diserialisasi untuk bahasa tertentu"""
+        return self._json_bodies[self.resolve_language(lang)]
+
+    def get(self, key):
+        entry = self.by_key.get(key)
+        if entry is None:
+            raise ValueError(f"Disease key '{key}' not found in database")
+        return entry
+
+    def get_by_name(self, name):
+        return self.by_name[name]
+
+    def get_by_index(self, class_index):
+        return self.by_index[class_index]
+
+    def __contains__(self, key):
+        return key in self.by_key
+
+    def __iter__(self):
+        return iter(self.by_index)
+
+    def __len__(self):
+        return len(self.by_index)
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_disease_catalog():
+    """Katalog singleton per proses (dibuat sekali saat pertama dipakai)"""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = DiseaseCatalog()
+    return _catalog
@@ -6,6 +6,8 @@ import logging
 from datetime import datetime
 from typing import Dict, List, Tuple
 
+from .disease_catalog import get_disease_catalog
+
 class DiseaseClassifier:
     """
     Class untuk mengklasifikasi penyakit bawang merah berdasarkan hasil prediksi model
@@ -13,181 +15,10 @@ class DiseaseClassifier:
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.disease_database = self._initialize_disease_database()
+        self.catalog = get_disease_catalog()
+        self.disease_database = self.catalog.by_key  # read-only, dipakai bersama seluruh proses
         self.confidence_threshold = 0.7  # Minimum confidence untuk diagnosis
     
-    def _initialize_disease_database(self) -> Dict:
-        """Inisialisasi database penyakit bawang merah"""
-        return {
-            'purple_blotch': {
-                'name': 'Bercak Ungu (Purple Blotch)',
-                'scientific_name': 'Alternaria porri',
-                'type': 'Fungal',
-                'description': 'Penyakit jamur yang menyebabkan bercak ungu pada daun bawang merah. Dapat menyebar dengan cepat dalam kondisi lembab.',
-                'symptoms': [
-                    'Bercak kecil berwarna putih dengan tepi ungu',
-                    'Bercak membesar dan bergabung',
-                    'Daun menguning dan mengering',
-                    'Pertumbuhan tanaman terhambat'
-                ],
-                'conditions': {
-                    'temperature': '20-30°C',
-                    'humidity': 'Tinggi (>80%)',
-                    'weather': 'Cuaca lembab, hujan berkepanjangan'
-                },
-                'severity_levels': {
-                    'ringan': 'Bercak sedikit, belum menyebar',
-                    'sedang': 'Bercak mulai menyebar, beberapa daun terinfeksi',
-                    'berat': 'Sebagian besar daun terinfeksi, pertumbuhan terhambat'
-                },
-                'treatments': [
-                    'Semprot fungisida berbahan aktif mankozeb atau klorotalonil',
-                    'Perbaiki drainase untuk mengurangi kelembaban',
-                    'Buang dan musnahkan bagian tanaman yang terinfeksi',
-                    'Berikan jarak tanam yang cukup untuk sirkulasi udara',
-                    'Aplikasi pupuk kalium untuk meningkatkan daya tahan'
-                ],
-                'prevention': [
-                    'Gunakan benih sehat dan bersertifikat',
-                    'Rotasi tanaman dengan tanaman non-allium',
-                    'Jaga kebersihan lahan dari sisa tanaman',
-                    'Hindari penyiraman berlebihan',
-                    'Monitoring rutin kondisi tanaman'
-                ]
-            },
-            'downy_mildew': {
-                'name': 'Embun Bulu (Downy Mildew)',
-                'scientific_name': 'Peronospora destructor',
-                'type': 'Oomycete',
-                'description': 'Penyakit yang menyebabkan lapisan putih keabu-abuan pada permukaan daun, terutama pada kondisi lembab.',
-                'symptoms': [
-                    'Lapisan putih keabu-abuan pada permukaan daun',
-                    'Daun menguning dari ujung',
-                    'Pertumbuhan kerdil',
-                    'Daun melengkung dan mengering'
-                ],
-                'conditions': {
-                    'temperature': '15-20°C',
-                    'humidity': 'Sangat tinggi (>90%)',
-                    'weather': 'Embun pagi, kelembaban tinggi'
-                },
-                'severity_levels': {
-                    'ringan': 'Lapisan putih tipis pada beberapa daun',
-                    'sedang': 'Lapisan putih menyebar, daun mulai menguning',
-                    'berat': 'Seluruh tanaman terinfeksi, pertumbuhan sangat terhambat'
-                },
-                'treatments': [
-                    'Aplikasi fungisida sistemik (metalaksil + mankozeb)',
-                    'Perbaiki ventilasi dan drainase',
-                    'Kurangi kelembaban dengan mulsa plastik',
-                    'Semprot pada pagi hari sebelum embun terbentuk'
-                ],
-                'prevention': [
-                    'Pilih varietas tahan penyakit',
-                    'Atur jarak tanam yang optimal',
-                    'Hindari penyiraman di sore hari',
-                    'Gunakan mulsa untuk mengurangi kelembaban tanah'
-                ]
-            },
-            'leaf_blight': {
-                'name': 'Busuk Daun (Leaf Blight)',
-                'scientific_name': 'Botrytis squamosa',
-                'type': 'Fungal',
-                'description': 'Penyakit jamur yang menyebabkan bercak putih kecil yang membesar dan mengering pada daun.',
-                'symptoms': [
-                    'Bercak putih kecil dengan halo kuning',
-                    'Bercak membesar dan mengering',
-                    'Daun patah pada bagian yang terinfeksi',
-                    'Ujung daun mengering dan mati'
-                ],
-                'conditions': {
-                    'temperature': '18-24°C',
-                    'humidity': 'Tinggi dengan angin kencang',
-                    'weather': 'Cuaca berubah-ubah, angin kencang'
-                },
-                'severity_levels': {
-                    'ringan': 'Beberapa bercak kecil pada daun tua',
-                    'sedang': 'Bercak menyebar ke daun muda',
-                    'berat': 'Sebagian besar daun rusak dan patah'
-                },
-                'treatments': [
-                    'Fungisida berbahan aktif iprodion atau vinclozolin',
-                    'Buang daun yang terinfeksi',
-                    'Kurangi kelembaban daun',
-                    'Aplikasi pupuk berimbang'
-                ],
-                'prevention': [
-                    'Hindari luka mekanis pada tanaman',
-                    'Jaga kebersihan alat pertanian',
-                    'Monitoring cuaca dan kelembaban',
-                    'Aplikasi fungisida preventif'
-                ]
-            },
-            'anthracnose': {
-                'name': 'Antraknosa',
-                'scientific_name': 'Colletotrichum gloeosporioides',
-                'type': 'Fungal',
-                'description': 'Penyakit jamur yang menyebabkan bercak coklat dengan tepi gelap pada daun dan dapat menyerang umbi.',
-                'symptoms': [
-                    'Bercak coklat dengan tepi gelap',
-                    'Bercak cekung pada umbi',
-                    'Daun layu dan mengering',
-                    'Pertumbuhan terhambat'
-                ],
-                'conditions': {
-                    'temperature': '25-30°C',
-                    'humidity': 'Tinggi dengan hujan',
-                    'weather': 'Curah hujan tinggi, suhu hangat'
-                },
-                'severity_levels': {
-                    'ringan': 'Bercak sedikit pada daun',
-                    'sedang': 'Bercak menyebar, mulai menyerang umbi',
-                    'berat': 'Umbi busuk, tanaman mati'
-                },
-                'treatments': [
-                    'Fungisida berbahan aktif azoksistrobin',
-                    'Perbaiki drainase lahan',
-                    'Buang tanaman yang terinfeksi berat',
-                    'Aplikasi kapur untuk menetralkan pH tanah'
-                ],
-                'prevention': [
-                    'Gunakan benih bebas penyakit',
-                    'Rotasi tanaman 2-3 tahun',
-                    'Jaga pH tanah 6.0-7.0',
-                    'Hindari genangan air'
-                ]
-            },
-            'healthy': {
-                'name': 'Sehat',
-                'scientific_name': None,
-                'type': 'Normal',
-                'description': 'Tanaman bawang merah dalam kondisi sehat tanpa tanda-tanda penyakit.',
-                'symptoms': [
-                    'Daun hijau segar',
-                    'Pertumbuhan normal',
-                    'Tidak ada bercak atau kelainan',
-                    'Umbi berkembang baik'
-                ],
-                'conditions': {
-                    'temperature': 'Optimal untuk pertumbuhan',
-                    'humidity': 'Seimbang',
-                    'weather': 'Kondisi cuaca mendukung'
-                },
-                'treatments': [
-                    'Lanjutkan perawatan rutin',
-                    'Monitoring berkala',
-                    'Pemupukan sesuai jadwal',
-                    'Penyiraman yang tepat'
-                ],
-                'prevention': [
-                    'Pertahankan kondisi optimal',
-                    'Monitoring rutin',
-                    'Sanitasi lahan',
-                    'Nutrisi seimbang'
-                ]
-            }
-        }
-    
     def classify(self, prediction_result: np.ndarray, image_features: Dict = None) -> Dict:
         """
         Klasifikasi penyakit berdasarkan hasil prediksi model
@@ -276,34 +107,191 @@ class DiseaseClassifier:
     
     def get_disease_info(self, disease_key: str) -> Dict:
         """Get informasi lengkap tentang penyakit tertentu"""
-        if disease_key in self.disease_database:
-            return self.disease_database[disease_key]
-        else:
-            raise ValueError(f"Disease key '{disease_key}' not found in database")
+        return self.catalog.get(disease_key)
     
     def get_all_diseases(self) -> Dict:
         """Get informasi semua penyakit"""
         return self.disease_database
     
+    # Tabel risk score; index = kode integer untuk scoring vectorized
+    RISK_BASE_SCORES = {
+        'healthy': 0.0,
+        'purple_blotch': 0.6,
+        'downy_mildew': 0.7,
+        'leaf_blight': 0.5,
+        'anthracnose': 0.8
+    }
+    SEVERITY_MULTIPLIERS = {
+        'ringan': 1.0,
+        'sedang': 1.5,
+        'berat': 2.0
+    }
+    DEFAULT_BASE_SCORE = 0.5
+    DEFAULT_SEVERITY_MULTIPLIER = 1.0
+    HIGH_RISK_THRESHOLD = 0.7
+    
     def calculate_risk_score(self, disease_key: str, severity: str, confidence: float) -> float:
         """Hitung risk score berdasarkan penyakit, severity, dan confidence"""
-        base_scores = {
-            'healthy': 0.0,
-            'purple_blotch': 0.6,
-            'downy_mildew': 0.7,
-            'leaf_blight': 0.5,
-            'anthracnose': 0.8
-        }
-        
-        severity_multipliers = {
-            'ringan': 1.0,
-            'sedang': 1.5,
-            'berat': 2.0
-        }
-        
-        base_score = base_scores.get(disease_key, 0.5)
-        severity_mult = severity_multipliers.get(severity, 1.0)
+        base_score = self.RISK_BASE_SCORES.get(disease_key, self.DEFAULT_BASE_SCORE)
+        severity_mult = self.SEVERITY_MULTIPLIERS.get(severity, self.DEFAULT_SEVERITY_MULTIPLIER)
         confidence_factor = confidence / 100.0
         
         risk_score = base_score * severity_mult * confidence_factor
-        return min(risk_score, 1.0)  # Cap at 1.0
\ No newline at end of file
+        return min(risk_score, 1.0)  # Cap at 1.0
+    
+    @staticmethod
+    def encode_labels(values, vocabulary) -> np.ndarray:
+        """
+        Encode label string ke kode integer sesuai urutan vocabulary
+        
+        Label di luar vocabulary mendapat kode len(vocabulary). Hanya nilai
+        unik yang di-lookup ke dict; sisanya murni operasi array.
+        """
+        if hasattr(values, 'cat'):  # pandas categorical: pakai codes yang sudah ada
+            uniques, inverse = np.asarray(values.cat.categories), np.asarray(values.cat.codes)
+        else:
+            values = np.asarray(values)
+            if values.dtype.kind in 'iu':
+                return values.astype(np.int64)  # sudah berupa kode
+            uniques, inverse = np.unique(values.astype(str), return_inverse=True)
+        
+        index = {label: code for code, label in enumerate(vocabulary)}
+        unique_codes = np.array([index.get(label, len(index)) for label in uniques], dtype=np.int64)
+        codes = unique_codes[inverse]
+        if hasattr(values, 'cat'):
+            codes[np.asarray(values.cat.codes) < 0] = len(index)  # NaN categorical
+        return codes
+    
+    def calculate_risk_scores(self, disease_keys, severities, confidences) -> np.ndarray:
+        """
+        Risk score vectorized untuk banyak deteksi sekaligus
+        
+        Args:
+            disease_keys: Array/list disease key (string) atau kode integer
+                sesuai urutan RISK_BASE_SCORES
+            severities: Array/list severity (string) atau kode integer
+                sesuai urutan SEVERITY_MULTIPLIERS
+            confidences: Array confidence (0-100)
+            
+        Returns:
+            np.ndarray: Risk score float64, sama dengan calculate_risk_score per baris
+        """
+        try:
+            base_table = np.append(np.fromiter(self.RISK_BASE_SCORES.values(), dtype=np.float64),
+                                   self.DEFAULT_BASE_SCORE)
+            multiplier_table = np.append(np.fromiter(self.SEVERITY_MULTIPLIERS.values(), dtype=np.float64),
+                                         self.DEFAULT_SEVERITY_MULTIPLIER)
+            
+            disease_codes = self.encode_labels(disease_keys, self.RISK_BASE_SCORES)
+            severity_codes = self.encode_labels(severities, self.SEVERITY_MULTIPLIERS)
+            confidences = np.asarray(confidences, dtype=np.float64)
+            
+            # Kode di luar tabel (mis. integer tak dikenal) memakai nilai default
+            disease_codes = np.where((disease_codes >= 0) & (disease_codes < len(base_table)),
+                                     disease_codes, len(base_table) - 1)
+            severity_codes = np.where((severity_codes >= 0) & (severity_codes < len(multiplier_table)),
+                                      severity_codes, len(multiplier_table) - 1)
+            
+            risk_scores = base_table[disease_codes] * multiplier_table[severity_codes]
+            risk_scores *= confidences / 100.0
+            return np.minimum(risk_scores, 1.0, out=risk_scores)
+            
+        except Exception as e:
+            self.logger.error(f"Error calculating bulk risk scores: {str(e)}")
+            raise
+    
+    def aggregate_risk_by_region(self, regions, risk_scores, disease_keys=None) -> Dict:
+        """
+        Agregasi risk score per region (mis. kecamatan/desa) dengan bincount
+        
+        Returns:
+            Dict: {region: {count, mean_risk, max_risk, high_risk_count, diseases}}
+        """
+        try:
+            risk_scores = np.asarray(risk_scores, dtype=np.float64)
+            region_names, region_codes = np.unique(np.asarray(regions).astype(str), return_inverse=True)
+            num_regions = len(region_names)
+            
+            counts = np.bincount(region_codes, minlength=num_regions)
+            sums = np.bincount(region_codes, weights=risk_scores, minlength=num_regions)
+            high_risk = np.bincount(region_codes, weights=risk_scores >= self.HIGH_RISK_THRESHOLD,
+                                    minlength=num_regions)
+            maxima = np.full(num_regions, -np.inf)
+            np.maximum.at(maxima, region_codes, risk_scores)
+            
+            disease_counts = None
+            disease_labels = list(self.RISK_BASE_SCORES) + ['unknown']
+            if disease_keys is not None:
+                disease_codes = self.encode_labels(disease_keys, self.RISK_BASE_SCORES)
+                # Sama dengan calculate_risk_scores: kode di luar tabel masuk bucket 'unknown'
+                disease_codes = np.where((disease_codes >= 0) & (disease_codes < len(disease_labels)),
+                                         disease_codes, len(disease_labels) - 1)
+                disease_counts = np.bincount(region_codes * len(disease_labels) + disease_codes,
+                                             minlength=num_regions * len(disease_labels)
+                                             ).reshape(num_regions, len(disease_labels))
+            
+            summary = {}
+            for i, region in enumerate(region_names):
+                summary[str(region)] = {
+                    'count': int(counts[i]),
+                    'mean_risk': float(sums[i] / counts[i]),
+                    'max_risk': float(maxima[i]),
+                    'high_risk_count': int(high_risk[i])
+                }
+                if disease_counts is not None:
+                    summary[str(region)]['diseases'] = {
+                        label: int(n) for label, n in zip(disease_labels, disease_counts[i]) if n
+                    }
+            
+            return summary
+            
+        except Exception as e:
+            self.logger.error(f"Error aggregating risk by region: {str(e)}")
+            raise
+    
+    def score_dataframe(self, df, disease_column='disease_key', severity_column='severity',
+                        confidence_column='confidence', region_column=None) -> Dict:
+        """
+        Bulk scoring untuk pandas DataFrame
+        
+        Returns:
+            Dict: {'risk_scores': np.ndarray, 'regions': agregasi per region atau None}
+        """
+        risk_scores = self.calculate_risk_scores(df[disease_column], df[severity_column], df[confidence_column])
+        regions = None
+        if region_column is not None:
+            regions = self.aggregate_risk_by_region(df[region_column], risk_scores, df[disease_column])
+        return {'risk_scores': risk_scores, 'regions': regions}
+    
+    def score_sqlite_query(self, db_path: str, query: str, params: Tuple = ()) -> Dict:
+        """
+        Bulk scoring dari query SQLite
+        
+        Query harus mengembalikan kolom (disease_key, severity, confidence)
+        dan opsional kolom keempat region.
+        
+        Returns:
+            Dict: {'risk_scores': np.ndarray, 'regions': agregasi per region (dict, kosong jika
+            tidak ada baris) jika query punya kolom region, selain itu None}
+        """
+        import sqlite3
+        
+        try:
+            with sqlite3.connect(db_path) as conn:
+                cursor = conn.execute(query, params)
+                rows = cursor.fetchall()
+                has_region = len(cursor.description) > 3
+            
+            if not rows:
+                return {'risk_scores': np.empty(0, dtype=np.float64), 'regions': {} if has_region else None}
+            
+            columns = list(zip(*rows))
+            risk_scores = self.calculate_risk_scores(columns[0], columns[1], columns[2])
+            regions = None
+            if has_region:
+                regions = self.aggregate_risk_by_region(columns[3], risk_scores, columns[0])
+            return {'risk_scores': risk_scores, 'regions': regions}
+            
+        except Exception as e:
+            self.logger.error(f"Error scoring SQLite query: {str(e)}")
+            raise
@@ -0,0 +1,88 @@
+# Perceptual Hash Index untuk mencari gambar near-duplicate
+# BK-tree berbasis Hamming distance
+
+import logging
+import threading
+from typing import Any, List, Optional, Tuple
+
+
+def hamming_distance(hash_a: int, hash_b: int) -> int:
+    """Hitung jumlah bit yang berbeda antara dua hash integer"""
+    return bin(hash_a ^ hash_b).count('1')
+
+
+class PerceptualHashIndex:
+    """
+    BK-tree untuk lookup perceptual hash (dHash 64-bit) berdasarkan Hamming distance
+
+    Setiap node menyimpan hash, list payload (misal hasil deteksi sebelumnya;
+    beberapa gambar bisa punya hash yang sama persis), dan children yang
+    di-index oleh jarak ke node tersebut. Query dengan radius kecil hanya
+    mengunjungi sebagian kecil tree.
+    """
+
+    def __init__(self, max_distance: int = 6):
+        self.max_distance = max_distance
+        self.logger = logging.getLogger(__name__)
+        self._root = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, image_hash: int, payload: Any) -> None:
+        """Tambahkan hash ke index; hash yang sama persis menambah payload ke node yang ada"""
+        with self._lock:
+            self._size += 1
+            if self._root is None:
+                self._root = [image_hash, [payload], {}]
+                return
+
+            node = self._root
+            while True:
+                distance = hamming_distance(image_hash, node[0])
+                if distance == 0:
+                    node[1].append(payload)
+                    return
+                child = node[2].get(distance)
+                if child is None:
+                    node[2][distance] = [image_hash, [payload], {}]
+                    return
+                node = child
+
+    def search(self, image_hash: int, max_distance: Optional[int] = None) -> List[Tuple[int, int, Any]]:
+        """
+        Cari semua entry dengan jarak <= max_distance
+
+        Returns:
+            List[(distance, hash, payload)] terurut dari yang paling mirip;
+            payload dengan hash yang sama muncul terbaru dulu
+        """
+        radius = self.max_distance if max_distance is None else max_distance
+        results = []
+
+        with self._lock:
+            if self._root is None:
+                return results
+
+            stack = [self._root]
+            while stack:
+                node = stack.pop()
+                distance = hamming_distance(image_hash, node[0])
+                if distance <= radius:
+                    results.extend((distance, node[0], payload) for payload in reversed(node[1]))
+
+                # Triangle inequality: hanya child dengan jarak di [d-r, d+r] yang relevan
+                low, high = distance - radius, distance + radius
+                for child_distance, child in node[2].items():
+                    if low <= child_distance <= high:
+                        stack.append(child)
+
+        results.sort(key=lambda item: item[0])
+        return results
+
+    def find_nearest(self, image_hash: int, max_distance: Optional[int] = None) -> Optional[Tuple[int, int, Any]]:
+        """Return entry paling mirip (terbaru jika hash sama) dalam radius, atau None"""
+        results = self.search(image_hash, max_distance)
+        return results[0] if results else None
@@ -62,7 +62,24 @@ class ImageProcessor:
             self.logger.error(f"Error loading image: {str(e)}")
             raise
     
-    def resize_image(self, image):
+    def prepare_model_input(self, image_path):
+        """
+        Input untuk model CNN saat serving: piksel RGB [0, 255] float32 yang
+        di-resize bilinear ke target_size, dengan batch dimension
+
+        Sama dengan input training (image_dataset_from_directory /
+        dataset_pipeline): tanpa normalisasi dan tanpa enhancement, karena
+        graph model sendiri menjalankan mobilenet_v2.preprocess_input.
+        """
+        try:
+            image = self.resize_image(self.load_image(image_path), resample=Image.Resampling.BILINEAR)
+            return self.prepare_for_model(image.astype(np.float32))
+
+        except Exception as e:
+            self.logger.error(f"Error preparing model input: {str(e)}")
+            raise
+
+    def resize_image(self, image, resample=Image.Resampling.LANCZOS):
         """Resize gambar ke ukuran target"""
         try:
             # Convert numpy array to PIL Image
@@ -72,7 +89,7 @@ class ImageProcessor:
                 pil_image = image
             
             # Resize using PIL
-            resized_pil = pil_image.resize(self.target_size, Image.Resampling.LANCZOS)
+            resized_pil = pil_image.resize(self.target_size, resample)
             
             # Convert back to numpy array
             resized = np.array(resized_pil)
@@ -139,7 +156,13 @@ class ImageProcessor:
             raise
     
     def extract_color_features(self, image):
-        """Extract basic color features yang berguna untuk deteksi penyakit"""
+        """
+        Extract basic color features yang berguna untuk deteksi penyakit
+
+        color_fractions: proporsi piksel per hue bin kasar (hijau/kuning/
+        coklat/ungu/putih) yang relevan dengan gejala penyakit bawang,
+        dihitung pada skala [0, 1] tanpa konversi HSV penuh.
+        """
         try:
             # Calculate basic color statistics
             features = {
@@ -148,13 +171,73 @@ class ImageProcessor:
                 'brightness': np.mean(image),
                 'contrast': np.std(image)
             }
-            
+
+            pixels = np.asarray(image, dtype=np.float32).reshape(-1, 3)
+            if pixels.max() > 1.0:
+                pixels = pixels / 255.0
+            red, green, blue = pixels[:, 0], pixels[:, 1], pixels[:, 2]
+            brightness = pixels.mean(axis=1)
+
+            features['color_fractions'] = {
+                'green': np.mean((green > red) & (green > blue)),
+                'yellow': np.mean((red > blue) & (green > blue) & (np.abs(red - green) < 0.1)),
+                'brown': np.mean((red > green) & (green > blue) & (brightness < 0.5)),
+                'purple': np.mean((red > green) & (blue > green)),
+                'white': np.mean((brightness > 0.8) & (pixels.std(axis=1) < 0.05))
+            }
+
             return features
             
         except Exception as e:
             self.logger.error(f"Error extracting color features: {str(e)}")
             raise
     
+    def compute_perceptual_hash(self, image, hash_size=8):
+        """
+        Hitung difference hash (dHash) 64-bit untuk deteksi near-duplicate
+
+        Tahan terhadap re-kompresi, resize, dan perubahan brightness ringan
+        (misal foto yang dikirim ulang lewat WhatsApp).
+
+        Args:
+            image: Path file, PIL Image, atau numpy array
+            hash_size: Ukuran grid hash (default 8 -> 64 bit)
+
+        Returns:
+            int: Perceptual hash
+        """
+        try:
+            if isinstance(image, np.ndarray):
+                if image.dtype != np.uint8:
+                    image = (np.clip(image, 0, 1) * 255).astype(np.uint8)
+                small = self._hash_thumbnail(Image.fromarray(image), hash_size)
+            elif isinstance(image, Image.Image):
+                small = self._hash_thumbnail(image, hash_size)
+            else:
+                # File dibuka di sini, jadi juga ditutup di sini
+                with Image.open(image) as pil_image:
+                    small = self._hash_thumbnail(pil_image, hash_size)
+
+            pixels = np.asarray(small, dtype=np.int16)
+
+            # Bandingkan piksel bertetangga secara horizontal
+            bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+            return int(np.packbits(bits).tobytes().hex(), 16)
+
+        except Exception as e:
+            self.logger.error(f"Error computing perceptual hash: {str(e)}")
+            raise
+
+    def _hash_thumbnail(self, pil_image, hash_size):
+        """Grayscale (hash_size + 1) x hash_size untuk dHash"""
+        # draft() membuat decoder JPEG langsung men-decode pada skala kecil
+        if hasattr(pil_image, 'draft'):
+            pil_image.draft('L', (hash_size * 16, hash_size * 16))
+
+        return pil_image.convert('L').resize(
+            (hash_size + 1, hash_size), Image.Resampling.BILINEAR
+        )
+
     def validate_image_quality(self, image):
         """Validasi kualitas gambar sebelum processing"""
         try:
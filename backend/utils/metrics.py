@@ -0,0 +1,88 @@
+# Metrics sederhana (counter + latency) untuk monitoring inferensi
+# In-process, thread-safe, tanpa dependency eksternal
+
+import threading
+from collections import deque
+
+
+class LatencyTracker:
+    """Simpan N sampel latency terakhir dan hitung statistik persentil"""
+
+    def __init__(self, window=1000):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, value_ms):
+        self.samples.append(value_ms)
+        self.count += 1
+        self.total_ms += value_ms
+
+    def percentile(self, q):
+        """Persentil (0-100) dari sampel di window, None jika belum ada sampel"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else None,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99)
+        }
+
+
+class MetricsRegistry:
+    """Registry counter, gauge, dan latency tracker per nama metric"""
+
+    def __init__(self, latency_window=1000):
+        self.latency_window = latency_window
+        self._counters = {}
+        self._gauges = {}
+        self._latencies = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name, value_ms):
+        with self._lock:
+            tracker = self._latencies.get(name)
+            if tracker is None:
+                tracker = self._latencies[name] = LatencyTracker(self.latency_window)
+            tracker.observe(value_ms)
+
+    def counter(self, name):
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def gauge(self, name, default=None):
+        with self._lock:
+            return self._gauges.get(name, default)
+
+    def latency(self, name):
+        """Snapshot statistik latency untuk satu metric"""
+        with self._lock:
+            tracker = self._latencies.get(name)
+            return tracker.snapshot() if tracker else LatencyTracker().snapshot()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'latency': {name: tracker.snapshot() for name, tracker in self._latencies.items()}
+            }
+
+
+# Registry global per proses (per gunicorn worker)
+metrics = MetricsRegistry()
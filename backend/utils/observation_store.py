@@ -0,0 +1,158 @@
+# Observation Store untuk data harian per tanaman (input model temporal RNN)
+# SQLite time-series: satu baris per (plant_id, date)
+
+import json
+import logging
+import sqlite3
+from datetime import date as date_type
+
+import numpy as np
+
+# Harus sama urutannya dengan RNNModel.feature_names
+FEATURE_NAMES = [
+    'temperature',
+    'humidity',
+    'rainfall',
+    'wind_speed',
+    'disease_severity',
+    'leaf_health',
+    'growth_rate',
+    'treatment_applied',
+    'fertilizer_applied',
+    'irrigation_amount'
+]
+
+
+class ObservationStore:
+    """
+    Penyimpanan observasi harian per plant
+
+    Tabel WITHOUT ROWID dengan primary key (plant_id, date), jadi data
+    tersimpan terurut per plant lalu tanggal dan insert ulang untuk
+    tanggal yang sama bersifat idempotent (upsert).
+    """
+
+    def __init__(self, db_path, feature_names=None):
+        self.db_path = db_path
+        self.feature_names = list(feature_names or FEATURE_NAMES)
+        self.logger = logging.getLogger(__name__)
+        self.init_schema()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_schema(self):
+        columns = ',\n'.join(f'{name} REAL' for name in self.feature_names)
+        with self._connect() as conn:
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS plant_observations (
+                    plant_id TEXT NOT NULL,
+                    date DATE NOT NULL,
+                    {columns},
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (plant_id, date)
+                ) WITHOUT ROWID
+            ''')
+
+    def validate(self, observation):
+        """
+        Validasi dan normalisasi satu observasi
+
+        Returns:
+            tuple: (date_iso, [nilai feature...])
+        """
+        if 'date' not in observation:
+            raise ValueError("Observation missing 'date'")
+        observation_date = date_type.fromisoformat(str(observation['date'])[:10]).isoformat()
+
+        missing = [name for name in self.feature_names if observation.get(name) is None]
+        if missing:
+            raise ValueError(f"Observation {observation_date} missing features: {', '.join(missing)}")
+
+        return observation_date, [float(observation[name]) for name in self.feature_names]
+
+    def upsert(self, plant_id, observations):
+        """
+        Simpan banyak observasi dalam satu transaksi (batched insert)
+
+        Returns:
+            int: Jumlah observasi yang ditulis
+        """
+        rows = []
+        for observation in observations:
+            observation_date, values = self.validate(observation)
+            rows.append((str(plant_id), observation_date, *values))
+        if not rows:
+            return 0
+
+        columns = ', '.join(self.feature_names)
+        placeholders = ', '.join('?' for _ in range(len(self.feature_names) + 2))
+        updates = ', '.join(f'{name} = excluded.{name}' for name in self.feature_names)
+
+        with self._connect() as conn:
+            conn.executemany(f'''
+                INSERT INTO plant_observations (plant_id, date, {columns})
+                VALUES ({placeholders})
+                ON CONFLICT (plant_id, date) DO UPDATE SET {updates}, updated_at = CURRENT_TIMESTAMP
+            ''', rows)
+
+        return len(rows)
+
+    def get_observations(self, plant_id, limit=30):
+        """Observasi terbaru satu plant (terurut naik per tanggal)"""
+        columns = ', '.join(self.feature_names)
+        with self._connect() as conn:
+            rows = conn.execute(f'''
+                SELECT date, {columns} FROM plant_observations
+                WHERE plant_id = ? ORDER BY date DESC LIMIT ?
+            ''', (str(plant_id), limit)).fetchall()
+
+        return [
+            {'date': row[0], **dict(zip(self.feature_names, row[1:]))}
+            for row in reversed(rows)
+        ]
+
+    def latest_windows(self, plant_ids, window=7):
+        """
+        Window N hari terbaru untuk banyak plant dalam satu query
+
+        Window harus N hari berturut-turut sampai observasi terakhir; plant
+        dengan tanggal yang hilang di dalam window dianggap tidak lengkap
+        (model temporal mengasumsikan satu langkah = satu hari).
+
+        Returns:
+            tuple: (array (M, window, num_features) untuk plant dengan data lengkap,
+                    list plant_id sesuai urutan array, list plant_id yang datanya kurang)
+        """
+        plant_ids = [str(plant_id) for plant_id in plant_ids]
+        if not plant_ids:
+            return np.empty((0, window, len(self.feature_names)), dtype=np.float32), [], []
+
+        columns = ', '.join(self.feature_names)
+        with self._connect() as conn:
+            # Daftar plant dikirim sebagai satu parameter JSON (tidak terkena batas jumlah parameter SQLite)
+            rows = conn.execute(f'''
+                SELECT plant_id, rn, age, {columns} FROM (
+                    SELECT plant_id, {columns},
+                           ROW_NUMBER() OVER (PARTITION BY plant_id ORDER BY date DESC) AS rn,
+                           CAST(julianday(MAX(date) OVER (PARTITION BY plant_id)) - julianday(date) AS INTEGER) AS age
+                    FROM plant_observations
+                    WHERE plant_id IN (SELECT value FROM json_each(?))
+                )
+                WHERE rn <= ?
+            ''', (json.dumps(plant_ids), window)).fetchall()
+
+        position = {plant_id: i for i, plant_id in enumerate(plant_ids)}
+        windows = np.zeros((len(plant_ids), window, len(self.feature_names)), dtype=np.float32)
+        counts = np.zeros(len(plant_ids), dtype=np.int64)
+        for row in rows:
+            i = position[row[0]]
+            # rn = 1 adalah hari terbaru -> posisi terakhir di window
+            windows[i, window - row[1]] = row[3:]
+            # Hanya dihitung jika tidak ada hari yang terlewat sejak observasi terakhir (age == rn - 1)
+            counts[i] += row[2] == row[1] - 1
+
+        complete = counts == window
+        ready_ids = [plant_id for plant_id, ok in zip(plant_ids, complete) if ok]
+        incomplete_ids = [plant_id for plant_id, ok in zip(plant_ids, complete) if not ok]
+        return windows[complete], ready_ids, incomplete_ids
@@ -0,0 +1,119 @@
+# Startup Profile untuk entry point aplikasi (wsgi:app / run.py)
+# Mengukur cold start di proses Python baru: waktu import per modul
+# (python -X importtime) dan waktu tiap tahap inisialisasi OnionDiseaseAPI
+#
+# Contoh:
+#   python wsgi.py --startup-profile
+#   python wsgi.py --startup-profile --budget 3.0   # exit 1 jika melebihi budget
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Dijalankan di proses anak: import target lalu laporkan hasilnya sebagai JSON
+_CHILD_SCRIPT = '''
+import importlib, json, sys, time
+start = time.perf_counter()
+module_name, _, attribute = sys.argv[1].partition(':')
+module = importlib.import_module(module_name)
+target = getattr(module, attribute) if attribute else module
+elapsed = time.perf_counter() - start
+api = getattr(module, 'api', None)
+print(json.dumps({
+    'cold_start_seconds': elapsed,
+    'tensorflow_loaded': 'tensorflow' in sys.modules,
+    'modules_loaded': len(sys.modules),
+    'init_timings_ms': getattr(api, 'startup_timings', {})
+}))
+'''
+
+
+def parse_importtime(stderr, top=20):
+    """
+    Parse output `python -X importtime`
+
+    Returns:
+        list: [{module, self_ms, cumulative_ms}] terurut cumulative terbesar
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, module = line[len('import time:'):].split('|')
+            entries.append({
+                'module': module.strip(),
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000
+            })
+        except ValueError:
+            continue
+    entries.sort(key=lambda entry: entry['cumulative_ms'], reverse=True)
+    return entries[:top]
+
+
+def measure_cold_start(target='wsgi:app', top=20, cwd=PROJECT_ROOT):
+    """
+    Import target di interpreter baru dan ukur waktu startup
+
+    Returns:
+        dict: cold_start_seconds, tensorflow_loaded, init_timings_ms, slowest_imports
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _CHILD_SCRIPT, target],
+        cwd=str(cwd), env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        errors = '\n'.join(line for line in completed.stderr.splitlines() if not line.startswith('import time:'))
+        raise RuntimeError(f"Startup of {target} failed:\n{errors[-2000:]}")
+
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    report['target'] = target
+    report['slowest_imports'] = parse_importtime(completed.stderr, top=top)
+    return report
+
+
+def print_startup_profile(report):
+    print(f"🚀 Cold start {report['target']}: {report['cold_start_seconds']:.2f}s "
+          f"({report['modules_loaded']} modules loaded)")
+    print(f"🧠 TensorFlow loaded at startup: {'YES ⚠️' if report['tensorflow_loaded'] else 'no'}")
+
+    if report['init_timings_ms']:
+        print("\n⚙️ OnionDiseaseAPI init:")
+        for step, ms in report['init_timings_ms'].items():
+            print(f"   {step:<22} {ms:>9.1f} ms")
+
+    print("\n📦 Slowest imports (cumulative):")
+    for entry in report['slowest_imports']:
+        print(f"   {entry['module']:<40} {entry['cumulative_ms']:>9.1f} ms  (self {entry['self_ms']:.1f} ms)")
+
+
+def run_startup_check(target='wsgi:app', budget_seconds=None, top=20):
+    """
+    Profil startup dan cek budget cold start
+
+    Returns:
+        int: Exit code (0 = OK, 1 = melebihi budget atau TF ter-load saat startup)
+    """
+    if budget_seconds is None:
+        budget_seconds = float(os.environ.get('STARTUP_BUDGET_SECONDS', 0)) or None
+
+    report = measure_cold_start(target, top=top)
+    print_startup_profile(report)
+
+    failed = False
+    if budget_seconds is not None:
+        within_budget = report['cold_start_seconds'] <= budget_seconds
+        print(f"\n{'✅' if within_budget else '❌'} Budget {budget_seconds:.2f}s: "
+              f"{'OK' if within_budget else 'EXCEEDED'}")
+        failed = not within_budget
+        if report['tensorflow_loaded']:
+            print("❌ TensorFlow must not be imported during startup")
+            failed = True
+
+    return 1 if failed else 0
@@ -0,0 +1,23 @@
+# Konfigurasi Gunicorn (otomatis dibaca dari working directory)
+# Memberi setiap worker index agar threading/CPU pinning bisa dibagi per worker
+
+import os
+
+
+def pre_fork(server, worker):
+    """Pilih index terkecil yang tidak dipakai worker hidup (di proses master)"""
+    used = {getattr(live, 'inference_index', None) for live in server.WORKERS.values()}
+    worker.inference_index = next(index for index in range(len(used) + 1) if index not in used)
+
+
+def post_fork(server, worker):
+    """Set index worker lalu terapkan konfigurasi runtime sebelum TF di-load"""
+    num_workers = server.num_workers or 1
+    os.environ['INFERENCE_WORKERS'] = str(num_workers)
+    os.environ['INFERENCE_WORKER_INDEX'] = str(getattr(worker, 'inference_index', 0) % num_workers)
+
+    try:
+        from backend.models.runtime_config import configure_runtime
+        configure_runtime()
+    except Exception as e:
+        server.log.warning(f"Could not apply runtime config: {e}")
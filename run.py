@@ -104,7 +104,23 @@ def main():
     # Start backend (blocking)
     start_backend()
 
+def startup_profile(budget=None, top=20):
+    """Laporkan waktu import dan inisialisasi per modul untuk wsgi:app"""
+    sys.path.insert(0, str(Path(__file__).parent))
+    from backend.utils.startup_profile import run_startup_check
+
+    return run_startup_check("wsgi:app", budget_seconds=budget, top=top)
+
 if __name__ == "__main__":
+    if "--startup-profile" in sys.argv:
+        import argparse
+
+        parser = argparse.ArgumentParser(description="Profile cold start of wsgi:app")
+        parser.add_argument("--startup-profile", action="store_true")
+        parser.add_argument("--budget", type=float, help="Gagal (exit 1) jika cold start melebihi N detik")
+        parser.add_argument("--top", type=int, default=20)
+        args = parser.parse_args()
+        sys.exit(startup_profile(budget=args.budget, top=args.top))
     try:
         main()
     except KeyboardInterrupt:
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Sweep konfigurasi threading TensorFlow untuk inference di mesin ini
+
+Setiap kombinasi intra-op/inter-op threads dijalankan di proses terpisah
+(TF tidak bisa mengubah thread pool setelah runtime dimulai), lalu
+throughput (gambar/detik) dilaporkan per kombinasi.
+
+Contoh:
+    python sweep_threads.py --intra 1 2 4 --inter 1 2 --batch-size 1 8
+    python sweep_threads.py --model rnn --workers 2
+"""
+
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+def run_child(args):
+    """Benchmark satu kombinasi (dijalankan di subprocess)"""
+    from backend.models.runtime_config import configure_runtime
+
+    config = configure_runtime({
+        'intra_op_threads': args.intra[0],
+        'inter_op_threads': args.inter[0],
+        'omp_threads': args.intra[0],
+        'cpu_affinity': args.cpu_affinity
+    })
+
+    import numpy as np
+
+    if args.model == 'cnn':
+        from backend.models.cnn_model import CNNModel
+        model = CNNModel(runtime_config=config)
+        if args.model_path:
+            model.load_model(args.model_path)
+        else:
+            model.build_model()
+        batch = np.random.rand(args.batch_size[0], *model.input_shape).astype(np.float32)
+    else:
+        from backend.models.rnn_model import RNNModel
+        model = RNNModel(runtime_config=config)
+        if args.model_path:
+            model.load_model(args.model_path)
+        else:
+            model.build_model()
+        batch = np.random.rand(args.batch_size[0], model.sequence_length, model.num_features).astype(np.float32)
+
+    # Warmup
+    for _ in range(args.warmup):
+        model.model(batch, training=False)
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        model.model(batch, training=False)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        'intra_op_threads': args.intra[0],
+        'inter_op_threads': args.inter[0],
+        'batch_size': args.batch_size[0],
+        'items_per_second': round(args.iterations * args.batch_size[0] / elapsed, 2),
+        'latency_ms': round(elapsed / args.iterations * 1000, 3)
+    }))
+
+
+def run_combination(args, intra, inter, batch_size):
+    """Jalankan `workers` subprocess paralel untuk satu kombinasi, return hasil gabungan"""
+    command = [
+        sys.executable, __file__, '--child',
+        '--model', args.model,
+        '--intra', str(intra), '--inter', str(inter),
+        '--batch-size', str(batch_size),
+        '--iterations', str(args.iterations), '--warmup', str(args.warmup)
+    ]
+    if args.model_path:
+        command += ['--model-path', args.model_path]
+
+    processes = []
+    for worker_index in range(args.workers):
+        env = dict(os.environ, INFERENCE_WORKERS=str(args.workers), INFERENCE_WORKER_INDEX=str(worker_index),
+                   TF_CPP_MIN_LOG_LEVEL='2')
+        worker_command = command + (['--cpu-affinity', args.cpu_affinity] if args.cpu_affinity else [])
+        processes.append(subprocess.Popen(worker_command, env=env, stdout=subprocess.PIPE,
+                                          stderr=subprocess.DEVNULL, text=True))
+
+    results = []
+    for process in processes:
+        output, _ = process.communicate()
+        lines = [line for line in output.splitlines() if line.startswith('{')]
+        if process.returncode != 0 or not lines:
+            return None
+        results.append(json.loads(lines[-1]))
+
+    return {
+        'intra_op_threads': intra,
+        'inter_op_threads': inter,
+        'batch_size': batch_size,
+        'workers': args.workers,
+        'items_per_second': round(sum(r['items_per_second'] for r in results), 2),
+        'latency_ms': round(max(r['latency_ms'] for r in results), 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep TensorFlow threading configuration')
+    parser.add_argument('--model', choices=['cnn', 'rnn'], default='cnn')
+    parser.add_argument('--model-path', help='Path model tersimpan (default: build arsitektur baru)')
+    parser.add_argument('--intra', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--inter', type=int, nargs='+', default=[1, 2])
+    parser.add_argument('--batch-size', type=int, nargs='+', default=[1])
+    parser.add_argument('--workers', type=int, default=2, help='Jumlah worker paralel (seperti gunicorn --workers)')
+    parser.add_argument('--cpu-affinity', help="'auto' atau daftar CPU, misal '0-3'")
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--output', help='Simpan hasil ke file JSON')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    print(f"🧵 Thread sweep: model={args.model}, workers={args.workers}, CPUs={os.cpu_count()}")
+    print("=" * 60)
+    print(f"{'intra':>6} {'inter':>6} {'batch':>6} {'items/s':>10} {'latency ms':>11}")
+
+    results = []
+    for intra, inter, batch_size in itertools.product(args.intra, args.inter, args.batch_size):
+        result = run_combination(args, intra, inter, batch_size)
+        if result is None:
+            print(f"{intra:>6} {inter:>6} {batch_size:>6} {'FAILED':>10}")
+            continue
+        results.append(result)
+        print(f"{intra:>6} {inter:>6} {batch_size:>6} {result['items_per_second']:>10} {result['latency_ms']:>11}")
+
+    if results:
+        best = max(results, key=lambda r: r['items_per_second'])
+        print("=" * 60)
+        print(f"✅ Best: TF_INTRA_OP_THREADS={best['intra_op_threads']} "
+              f"TF_INTER_OP_THREADS={best['inter_op_threads']} ({best['items_per_second']} items/s)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"📄 Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+# Test validasi parameter API Flask (tanpa model terlatih dan tanpa TensorFlow)
+#
+# App dibuat di direktori sementara (app.log, database.db, uploads/). Model
+# registry diganti handle palsu yang mencatat argumen predict.
+#
+#   python -m pytest -q tests
+
+import io
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'backend'))
+
+
+class RecordingModel:
+    """Pengganti CNNModel/InferenceCascade: selalu 'healthy', catat kwargs predict"""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, image, **kwargs):
+        self.calls.append(kwargs)
+        result = {
+            'predicted_class': 'healthy',
+            'confidence': 97.0,
+            'all_probabilities': {'healthy': 97.0},
+            'stage': 'cnn'
+        }
+        if kwargs.get('tta'):
+            result['tta'] = {'variants': min(kwargs.get('tta_k', 8), 8), 'latency_ms': 1.0, 'agreement': 1.0}
+        return result
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from app import OnionDiseaseAPI
+
+    api = OnionDiseaseAPI()
+    api.model_manager = SimpleNamespace(current=SimpleNamespace(version='v-test', model=RecordingModel()))
+    return api
+
+
+def leaf_upload():
+    buffer = io.BytesIO()
+    Image.fromarray(np.full((64, 64, 3), (40, 160, 60), dtype=np.uint8)).save(buffer, format='PNG')
+    buffer.seek(0)
+    return (buffer, 'leaf.png')
+
+
+def detect(api, query='', **form):
+    form['image'] = leaf_upload()
+    return api.app.test_client().post(f'/api/detect{query}', data=form, content_type='multipart/form-data')
+
+
+@pytest.mark.parametrize('params', [
+    {'tta_k': 'abc'}, {'tta_k': '-1'}, {'tta_k': '2.5'}, {'tta_k': '17'},
+    {'latency_budget_ms': '0'}, {'latency_budget_ms': 'fast'}
+])
+def test_detect_rejects_invalid_tta_params(api, params):
+    response = detect(api, **params)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == f'Invalid {next(iter(params))}'
+    assert api.model_manager.current.model.calls == []
+
+
+def test_detect_passes_tta_params_to_model(api):
+    response = detect(api, query='?latency_budget_ms=250', tta_k='3')
+    assert response.status_code == 200
+    assert api.model_manager.current.model.calls == [{'tta': True, 'tta_k': 3, 'latency_budget_ms': 250}]
+    assert response.get_json()['tta']['variants'] == 3
+
+
+def test_detect_without_tta_params_uses_plain_predict(api):
+    for params in ({}, {'tta_k': '0'}):
+        response = detect(api, reuse='false', **params)
+        assert response.status_code == 200
+        assert 'tta' not in response.get_json()
+    assert api.model_manager.current.model.calls == [{}, {}]
+
+
+def test_cascade_skips_early_exit_when_tta_requested():
+    from models.cascade_model import ColorFeatureClassifier, InferenceCascade
+
+    cnn_model = RecordingModel()
+    cnn_model.num_classes = 5
+    cnn_model.class_names = ['healthy', 'purple_blotch', 'downy_mildew', 'leaf_blight', 'anthracnose']
+    cnn_model.format_prediction = lambda probabilities: {'predicted_class': 'healthy'}
+
+    # Stage 1 yang selalu yakin (confidence ~1.0) -> early exit tanpa TTA
+    first_stage = ColorFeatureClassifier()
+    first_stage.bias[0] = 50.0
+    first_stage.is_trained = True
+    cascade = InferenceCascade(cnn_model, first_stage=first_stage, threshold=0.9)
+    image = np.full((1, 32, 32, 3), 120.0, dtype=np.float32)
+
+    assert cascade.predict(image)['stage'] == 'color'
+    assert cascade.predict(image, tta=True, tta_k=0)['stage'] == 'color'
+
+    result = cascade.predict(image, tta=True, tta_k=4)
+    assert result['stage'] == 'cnn'
+    assert result['tta']['variants'] == 4
+    assert cnn_model.calls == [{'tta': True, 'tta_k': 4}]
+
+
+@pytest.mark.parametrize('limit', ['-1', '0', 'abc', '1.5'])
+def test_observations_rejects_invalid_limit(api, limit):
+    response = api.app.test_client().get(f'/api/plants/p1/observations?limit={limit}')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid limit'
+
+
+def observation(date, value=1.0):
+    from utils.observation_store import FEATURE_NAMES
+    return dict({name: value for name in FEATURE_NAMES}, date=date)
+
+
+def test_observations_limit_is_applied(api):
+    observations = [observation(f'2024-06-{day:02d}') for day in range(1, 6)]
+    client = api.app.test_client()
+    assert client.post('/api/plants/p1/observations', json={'observations': observations}).status_code == 200
+
+    response = client.get('/api/plants/p1/observations?limit=2')
+    assert response.status_code == 200
+    assert len(response.get_json()['observations']) == 2
+
+
+def test_windows_require_consecutive_days(api):
+    client = api.app.test_client()
+    consecutive = [observation(f'2024-06-{day:02d}', day) for day in range(1, 8)]
+    # 7 observasi, tetapi 2024-06-04 hilang di dalam window
+    gapped = [observation(f'2024-06-{day:02d}', day) for day in range(1, 9) if day != 4]
+    client.post('/api/plants/a/observations', json=consecutive)
+    client.post('/api/plants/b/observations', json=gapped)
+
+    response = client.get('/api/plants/windows?ids=a,b&days=7')
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['plant_ids'] == ['a']
+    assert body['incomplete'] == ['b']
+    assert [step[0] for step in body['windows'][0]] == [float(day) for day in range(1, 8)]
+
+    # Window yang lebih pendek dan tidak melewati gap tetap valid
+    body = client.get('/api/plants/windows?ids=b&days=4').get_json()
+    assert body['plant_ids'] == ['b']
@@ -0,0 +1,56 @@
+# Regression test: input model saat serving harus sama dengan input training
+#
+# Training memberi model piksel RGB [0, 255] (image_dataset_from_directory /
+# dataset_pipeline) dan graph model menjalankan mobilenet_v2.preprocess_input.
+# Serving (ImageProcessor.prepare_model_input) tidak boleh menormalisasi ulang.
+#
+#   python -m pytest -q tests
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'backend'))
+
+from utils.image_processor import ImageProcessor
+
+TARGET_SIZE = (224, 224)
+
+
+@pytest.fixture
+def leaf_image(tmp_path):
+    rng = np.random.RandomState(0)
+    pixels = rng.randint(0, 256, (300, 400, 3)).astype(np.uint8)
+    pixels[:, :40] = 255  # pastikan rentang penuh ada di gambar
+    pixels[:, -40:] = 0
+    path = tmp_path / 'leaf.png'
+    Image.fromarray(pixels).save(path)
+    return path
+
+
+def test_serving_input_uses_raw_pixel_range(leaf_image):
+    served = ImageProcessor(target_size=TARGET_SIZE).prepare_model_input(str(leaf_image))
+
+    assert served.shape == (1, *TARGET_SIZE, 3)
+    assert served.dtype == np.float32
+    assert served.min() >= 0.0
+    assert served.max() > 1.0 and served.max() <= 255.0
+
+
+def test_serving_input_matches_training_pipeline(leaf_image):
+    tf = pytest.importorskip('tensorflow')
+
+    # Sama dengan dataset_pipeline.create_dataset_from_files (decode + resize bilinear)
+    trained = tf.image.resize(
+        tf.io.decode_image(tf.io.read_file(str(leaf_image)), channels=3, expand_animations=False),
+        TARGET_SIZE
+    ).numpy()
+    served = ImageProcessor(target_size=TARGET_SIZE).prepare_model_input(str(leaf_image))[0]
+
+    assert served.min() >= 0.0 and served.max() <= 255.0
+    assert trained.min() >= 0.0 and trained.max() <= 255.0
+    # Resampler berbeda (PIL vs TF), tetapi skala dan isi gambar harus sama
+    assert abs(float(served.mean()) - float(trained.mean())) < 2.0
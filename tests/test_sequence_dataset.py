@@ -0,0 +1,83 @@
+# Test split SequenceMemmapDataset: tidak ada baris yang dipakai train dan val
+#
+# Window bertetangga berbagi sequence_length - 1 baris, jadi split harus per
+# plant (series) atau per waktu dengan gap sequence_length.
+#
+#   python -m pytest -q tests
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'backend'))
+
+from models.sequence_dataset import SequenceMemmapDataset, build_sequence_memmap
+
+SEQUENCE_LENGTH = 7
+FEATURE_NAMES = ['temperature', 'humidity']
+
+
+def make_observations(days_per_plant):
+    frames = []
+    for plant, days in enumerate(days_per_plant):
+        frames.append(pd.DataFrame({
+            'plant_id': f'plant_{plant}',
+            'date': pd.date_range('2024-06-01', periods=days),
+            'temperature': np.arange(days, dtype=np.float32),
+            'humidity': np.full(days, plant, dtype=np.float32),
+            'disease_class': np.arange(days) % 5
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    build_sequence_memmap(make_observations([30, 25, 20, 40, 12, 33]), tmp_path, FEATURE_NAMES,
+                          sequence_length=SEQUENCE_LENGTH)
+    return SequenceMemmapDataset(tmp_path)
+
+
+def rows_used(subset):
+    starts = np.asarray(subset.window_starts)[subset.indices]
+    return set((starts[:, None] + np.arange(SEQUENCE_LENGTH)).ravel().tolist())
+
+
+@pytest.mark.parametrize('by', ['series', 'time'])
+def test_split_has_no_shared_rows(dataset, by):
+    train, val = dataset.split(val_fraction=0.3, seed=0, by=by)
+
+    assert len(train) and len(val)
+    assert not rows_used(train) & rows_used(val)
+    assert len(train) + len(val) <= len(dataset)
+
+
+def test_time_split_keeps_gap_per_plant(dataset):
+    train, val = dataset.split(val_fraction=0.3, by='time')
+
+    train_series, val_series = train.window_series(), val.window_series()
+    train_starts = np.asarray(train.window_starts)[train.indices]
+    val_starts = np.asarray(val.window_starts)[val.indices]
+    # Plant pendek (12 hari) bisa seluruhnya masuk val karena window train-nya jatuh di gap
+    for plant in np.intersect1d(train_series, val_series):
+        last_train = train_starts[train_series == plant].max()
+        assert val_starts[val_series == plant].min() - last_train >= SEQUENCE_LENGTH
+
+
+def test_series_split_keeps_plants_whole(dataset):
+    train, val = dataset.split(val_fraction=0.3, seed=1, by='series')
+    assert not set(train.window_series()) & set(val.window_series())
+
+
+def test_split_rejects_unknown_mode(dataset):
+    with pytest.raises(ValueError):
+        dataset.split(by='window')
+
+
+def test_build_rejects_dataset_without_windows(tmp_path):
+    with pytest.raises(ValueError, match='at least 7 observations'):
+        build_sequence_memmap(make_observations([3, 6]), tmp_path, FEATURE_NAMES, sequence_length=SEQUENCE_LENGTH)
+    with pytest.raises(ValueError, match='in 0 rows'):
+        build_sequence_memmap([], tmp_path, FEATURE_NAMES, sequence_length=SEQUENCE_LENGTH)
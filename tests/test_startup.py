@@ -0,0 +1,83 @@
+# Regression test: startup app dan post_fork gunicorn tidak boleh mengimport TensorFlow
+#
+# Dijalankan di interpreter baru (sys.modules bersih). Import hook mencatat
+# setiap percobaan import tensorflow, jadi test ini tetap bermakna walaupun
+# TensorFlow tidak ter-install di mesin CI. Cold start wsgi:app juga harus
+# di bawah STARTUP_BUDGET_SECONDS (default 10 detik).
+#
+#   python -m pytest -q tests
+#   STARTUP_BUDGET_SECONDS=3 python -m pytest -q tests
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_STARTUP_BUDGET_SECONDS = 10.0
+
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.utils.startup_profile import measure_cold_start
+
+_CHILD_SCRIPT = '''
+import importlib.util, json, sys
+from types import SimpleNamespace
+
+attempts = []
+
+class RecordTensorFlowImports:
+    def find_spec(self, name, path=None, target=None):
+        if name == 'tensorflow' or name.startswith('tensorflow.'):
+            attempts.append(name)
+        return None
+
+sys.meta_path.insert(0, RecordTensorFlowImports())
+sys.path.insert(0, sys.argv[1])
+
+import wsgi
+after_app_start = {'imported': 'tensorflow' in sys.modules, 'attempts': list(attempts)}
+
+spec = importlib.util.spec_from_file_location('gunicorn_conf', sys.argv[1] + '/gunicorn.conf.py')
+gunicorn_conf = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(gunicorn_conf)
+
+server = SimpleNamespace(WORKERS={}, num_workers=2, log=SimpleNamespace(warning=print))
+worker = SimpleNamespace()
+gunicorn_conf.pre_fork(server, worker)
+gunicorn_conf.post_fork(server, worker)
+after_post_fork = {'imported': 'tensorflow' in sys.modules, 'attempts': list(attempts)}
+
+print(json.dumps({'app_start': after_app_start, 'post_fork': after_post_fork, 'worker_index': worker.inference_index}))
+'''
+
+
+def run_child(tmp_path):
+    completed = subprocess.run(
+        [sys.executable, '-c', _CHILD_SCRIPT, str(PROJECT_ROOT)],
+        cwd=str(tmp_path), capture_output=True, text=True, timeout=120
+    )
+    assert completed.returncode == 0, completed.stderr[-2000:]
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_app_start_does_not_import_tensorflow(tmp_path):
+    report = run_child(tmp_path)
+    assert report['app_start'] == {'imported': False, 'attempts': []}
+
+
+def test_gunicorn_post_fork_does_not_import_tensorflow(tmp_path):
+    report = run_child(tmp_path)
+    assert report['post_fork'] == {'imported': False, 'attempts': []}
+    assert report['worker_index'] == 0
+
+
+def test_cold_start_within_budget(tmp_path, monkeypatch):
+    # cwd sementara agar app.log/database.db tidak ditulis ke root project
+    monkeypatch.setenv('PYTHONPATH', str(PROJECT_ROOT))
+    report = measure_cold_start('wsgi:app', cwd=tmp_path)
+
+    budget = float(os.environ.get('STARTUP_BUDGET_SECONDS', DEFAULT_STARTUP_BUDGET_SECONDS))
+    assert report['tensorflow_loaded'] is False
+    assert report['cold_start_seconds'] <= budget, report['slowest_imports'][:5]
@@ -0,0 +1,60 @@
+# Regression test: ThroughputLogger mengukur window training saja
+#
+# images/sec per epoch tidak boleh ikut menghitung waktu validasi, dan batch
+# size diambil dari dataset jika tidak diberikan (CNNModel.train(batch_size=None)).
+# Butuh TensorFlow; di-skip jika tidak ter-install.
+#
+#   python -m pytest -q tests
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+from tensorflow import keras
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.models.training_callbacks import ThroughputLogger, dataset_batch_size
+
+BATCH_SIZE = 8
+
+
+def make_dataset(num_samples, delay=0.0):
+    rng = np.random.RandomState(0)
+    x = rng.randn(num_samples, 4).astype(np.float32)
+    dataset = tf.data.Dataset.from_tensor_slices((x, x.sum(axis=1, keepdims=True))).batch(BATCH_SIZE)
+    if delay:
+        def slow(features, target):
+            time.sleep(delay)
+            return features, target
+        dataset = dataset.map(lambda x, y: tf.numpy_function(slow, [x, y], (tf.float32, tf.float32)))
+    return dataset
+
+
+def test_dataset_batch_size_without_static_batch_dimension():
+    assert dataset_batch_size(make_dataset(20)) == BATCH_SIZE
+    assert dataset_batch_size(np.zeros((4, 4))) is None
+
+
+def test_epoch_throughput_excludes_validation(tmp_path):
+    train_set = make_dataset(32)
+    log_path = tmp_path / 'training_log.jsonl'
+
+    model = keras.Sequential([keras.Input(shape=(4,)), keras.layers.Dense(1)])
+    model.compile(optimizer='sgd', loss='mse')
+    logger = ThroughputLogger(log_path, batch_size=dataset_batch_size(train_set), log_every=0)
+    # Validasi sengaja lambat (4 batch x 0.25 detik)
+    model.fit(train_set, validation_data=make_dataset(32, delay=0.25), epochs=2, callbacks=[logger], verbose=0)
+
+    # Epoch kedua: tanpa waktu tracing graph
+    record = json.loads(log_path.read_text().splitlines()[-1])
+    assert record['event'] == 'epoch'
+    assert record['images_per_sec'] == pytest.approx(record['steps_per_sec'] * BATCH_SIZE, rel=0.01)
+    training_seconds = record['steps'] / record['steps_per_sec']
+    assert training_seconds < 1.0
+    assert record['data_wait_fraction'] <= 1.0
@@ -0,0 +1,64 @@
+# Regression test: resume dari FullStateCheckpoint tidak boleh menimpa model terbaik
+#
+# Konfigurasi callback sama dengan CNNModel.train / RNNModel.train: semua
+# callback stateful (EarlyStopping, ReduceLROnPlateau, ModelCheckpoint) di-track.
+# Butuh TensorFlow; di-skip jika tidak ter-install.
+#
+#   python -m pytest -q tests
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+from tensorflow import keras
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.models.training_callbacks import STATE_FILE, FullStateCheckpoint
+
+
+def build_model():
+    model = keras.Sequential([keras.Input(shape=(4,)), keras.layers.Dense(1)])
+    model.compile(optimizer='adam', loss='mse')
+    return model
+
+
+def build_callbacks(tmp_path):
+    callbacks = [
+        keras.callbacks.EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True),
+        keras.callbacks.ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5),
+        keras.callbacks.ModelCheckpoint(str(tmp_path / 'best.weights.h5'), monitor='val_loss',
+                                        save_best_only=True, save_weights_only=True)
+    ]
+    state_checkpoint = FullStateCheckpoint(tmp_path / 'checkpoints', tracked_callbacks=list(callbacks))
+    return callbacks + [state_checkpoint], state_checkpoint
+
+
+def test_resume_does_not_overwrite_best_model(tmp_path):
+    rng = np.random.RandomState(0)
+    x = rng.randn(64, 4).astype(np.float32)
+    y = x.sum(axis=1, keepdims=True)
+
+    callbacks, _ = build_callbacks(tmp_path)
+    keras.utils.set_random_seed(0)
+    build_model().fit(x, y, validation_data=(x, y), epochs=2, callbacks=callbacks, verbose=0)
+
+    best_path = tmp_path / 'best.weights.h5'
+    best_mtime = best_path.stat().st_mtime_ns
+    with open(tmp_path / 'checkpoints' / STATE_FILE) as f:
+        saved_best = json.load(f)['callbacks'][2]['best']
+
+    # Resume (proses baru: callback dan model dibuat ulang) dengan validasi yang jauh lebih buruk
+    callbacks, state_checkpoint = build_callbacks(tmp_path)
+    model = build_model()
+    initial_epoch = state_checkpoint.restore(model)
+    assert initial_epoch == 2
+    model.fit(x, y, validation_data=(x, y * 1000), epochs=3, initial_epoch=initial_epoch,
+              callbacks=callbacks, verbose=0)
+
+    assert callbacks[2].best == pytest.approx(saved_best)
+    assert best_path.stat().st_mtime_ns == best_mtime
@@ -7,6 +7,19 @@ import os
 import sys
 from pathlib import Path
 
+if __name__ == "__main__" and "--startup-profile" in sys.argv:
+    # Profil cold start di proses baru (sebelum app di-import di proses ini)
+    import argparse
+    sys.path.insert(0, str(Path(__file__).parent))
+    from backend.utils.startup_profile import run_startup_check
+
+    parser = argparse.ArgumentParser(description="Profile cold start of wsgi:app")
+    parser.add_argument("--startup-profile", action="store_true")
+    parser.add_argument("--budget", type=float, help="Gagal (exit 1) jika cold start melebihi N detik")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+    sys.exit(run_startup_check("wsgi:app", budget_seconds=args.budget, top=args.top))
+
 # Add backend directory to Python path
 backend_path = Path(__file__).parent / "backend"
 sys.path.insert(0, str(backend_path))